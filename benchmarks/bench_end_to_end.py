@@ -0,0 +1,729 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of registration and invocation against local stand-ins
+
+Runs register_prefix_workflow.py and invoke_workflow.py (their main(), in this
+process) on synthetic workflows from workflow_generator.py, whose actions are
+spread over GitHub Actions, Lambda and OpenWhisk, against:
+    - a fake GitHub REST API (repository, Actions variables and secrets, the
+      Git Data API used to publish workflow files, workflow_dispatch)
+    - moto for Lambda and for S3 (deployment manifest, offloaded payloads)
+    - a fake OpenWhisk controller over HTTPS with a self-signed certificate
+
+Every stand-in can add latency and answer a share of requests with a
+transient error (503 / TooManyRequestsException / SlowDown), which the
+scripts have to retry.
+
+For every workflow size the phases are:
+    register            first deployment, with --incremental so the manifest is saved
+    register-unchanged  the same deployment again, which should skip everything
+    invoke              trigger of the workflow's FunctionInvoke action
+    invoke-bulk         invoke_workflow.py --bulk with one invocation per action
+and each reports wall time, API calls per stand-in and operation, bytes sent
+to and received from the stand-ins, injected errors, and the timing spans of
+tracing.py by name. --output writes the results as JSON; --compare checks
+them against an earlier --output and exits 1 on a regression: any extra API
+call, or a phase slower than the baseline by more than --tolerance.
+
+moto keeps its state in this process, so every phase runs here as well; the
+module caches of the scripts (pooled connections, boto3 clients, ETag cache)
+stay warm across phases as they would in the invoke service.
+
+Usage:
+    python benchmarks/bench_end_to_end.py --sizes 10,100,1000 --output e2e.json
+    python benchmarks/bench_end_to_end.py --sizes 100 --latency github=40,lambda=20 \\
+        --errors openwhisk=0.05 --compare e2e.json
+"""
+
+import argparse
+import base64
+import datetime
+import hashlib
+import importlib
+import json
+import logging
+import os
+import random
+import re
+import ssl
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import warnings
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+from workflow_generator import generate_workflow
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SCRIPTS = os.path.join(ROOT, 'scripts')
+sys.path.insert(0, SCRIPTS)
+
+# Platforms the synthetic actions are spread over
+PLATFORMS = ('githubactions', 'lambda', 'openwhisk')
+
+STAND_INS = ('github', 'lambda', 's3', 'openwhisk')
+
+REPOSITORY = 'bench/faasr-workflows'
+BUCKET = 'faasr-bench'
+NAMESPACE = 'bench'
+REGION = 'us-east-1'
+
+# Shape of the synthetic workflows: most children per action, and the shares
+# of ranked actions and of actions with a conditional branch
+FAN_OUT = 3
+RANKED = 0.05
+CONDITIONAL = 0.1
+
+# Wall time differences below this many seconds are never reported as regressions
+NOISE_FLOOR = 0.05
+
+
+class Injector:
+    """Latency, error injection and per-operation counters of one stand-in."""
+
+    def __init__(self, name, latency=0.0, error_rate=0.0, seed=0):
+        self.name = name
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(f"{seed}:{name}")
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.calls = {}
+            self.request_bytes = 0
+            self.response_bytes = 0
+            self.injected_errors = 0
+
+    def delay_or_fail(self):
+        """Waits the configured latency; returns True if the request should fail."""
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.injected_errors += 1
+            return failed
+
+    def count(self, operation, request_bytes, response_bytes):
+        with self.lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+            self.request_bytes += request_bytes
+            self.response_bytes += response_bytes
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'Calls': dict(sorted(self.calls.items())),
+                'TotalCalls': sum(self.calls.values()),
+                'RequestBytes': self.request_bytes,
+                'ResponseBytes': self.response_bytes,
+                'InjectedErrors': self.injected_errors,
+            }
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Routes requests to handle_* methods by (method, path pattern) and counts
+    them under the route's operation name; subclasses set routes and injector
+    """
+    protocol_version = 'HTTP/1.1'
+    routes = ()
+    injector = None
+    error_status = 503
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def _dispatch(self, method):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        url = urlsplit(self.path)
+        self.query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        for route_method, pattern, operation, handler in self.routes:
+            match = re.fullmatch(pattern, url.path) if route_method == method else None
+            if match:
+                break
+        else:
+            operation, handler, match = f"{method} (unknown)", None, None
+
+        if self.injector.delay_or_fail():
+            status, headers, payload = self.error_status, {}, b'{"message": "Injected transient error"}'
+            operation += ' (injected error)'
+        elif handler is None:
+            status, headers, payload = 404, {}, b'{"message": "Not Found"}'
+        else:
+            status, headers, payload = handler(self, json.loads(body) if body else None, *match.groups())
+            if not isinstance(payload, bytes):
+                payload = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        self.injector.count(operation, len(body), len(payload))
+        self.send_response(status)
+        headers.setdefault('Content-Type', 'application/json')
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeGitHub:
+    """
+    State of the fake GitHub repository: Actions variables and secrets, and a
+    content-addressed Git history of {path: (blob sha, size)} trees
+    """
+
+    def __init__(self, base_url, repository):
+        self.base_url = base_url
+        self.repository = repository
+        self.variables = {}
+        self.secrets = {}
+        self.trees = {}
+        self.commits = {}
+        self.refs = {}
+        self.dispatches = 0
+        self.lock = threading.Lock()
+        self.public_key = base64.b64encode(os.urandom(32)).decode('ascii')
+        # An empty repository has no branch to commit to; start from an initial commit
+        tree = self.add_tree({'README.md': (hashlib.sha1(b'bench').hexdigest(), 5)})
+        self.refs['main'] = self.add_commit('Initial commit', tree, [])
+
+    def repo_url(self):
+        return f"{self.base_url}/repos/{self.repository}"
+
+    def add_tree(self, files):
+        sha = hashlib.sha1(json.dumps(sorted(files.items())).encode('utf-8')).hexdigest()
+        self.trees[sha] = files
+        return sha
+
+    def add_commit(self, message, tree, parents):
+        sha = hashlib.sha1(json.dumps([message, tree, parents, uuid.uuid4().hex]).encode('utf-8')).hexdigest()
+        self.commits[sha] = {'message': message, 'tree': tree, 'parents': parents}
+        return sha
+
+    def resolve_tree(self, ref):
+        """Returns the tree sha of a branch, commit or tree sha, or None."""
+        if ref in self.refs:
+            ref = self.refs[ref]
+        if ref in self.commits:
+            return self.commits[ref]['tree']
+        return ref if ref in self.trees else None
+
+    def commit_json(self, sha):
+        commit = self.commits[sha]
+        return {
+            'sha': sha,
+            'url': f"{self.repo_url()}/git/commits/{sha}",
+            'message': commit['message'],
+            'tree': {'sha': commit['tree'], 'url': f"{self.repo_url()}/git/trees/{commit['tree']}"},
+            'parents': [{'sha': parent, 'url': f"{self.repo_url()}/git/commits/{parent}"}
+                        for parent in commit['parents']],
+        }
+
+    def tree_json(self, sha):
+        return {
+            'sha': sha,
+            'url': f"{self.repo_url()}/git/trees/{sha}",
+            'truncated': False,
+            'tree': [{'path': path, 'mode': '100644', 'type': 'blob', 'sha': blob, 'size': size,
+                      'url': f"{self.repo_url()}/git/blobs/{blob}"}
+                     for path, (blob, size) in sorted(self.trees[sha].items())],
+        }
+
+    def ref_json(self, branch):
+        sha = self.refs[branch]
+        return {
+            'ref': f"refs/heads/{branch}",
+            'url': f"{self.repo_url()}/git/refs/heads/{branch}",
+            'object': {'sha': sha, 'type': 'commit', 'url': f"{self.repo_url()}/git/commits/{sha}"},
+        }
+
+
+def git_blob_sha(content):
+    data = content.encode('utf-8')
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+
+class FakeGitHubHandler(StandInHandler):
+    github = None
+    rate_limit_headers = {'X-RateLimit-Limit': '5000', 'X-RateLimit-Remaining': '4999'}
+
+    def handle_repo(self, body, repository):
+        github = self.github
+        if repository != github.repository:
+            return 404, {}, {'message': 'Not Found'}
+        owner, name = repository.split('/')
+        return 200, self._headers(), {
+            'id': 1, 'name': name, 'full_name': repository, 'private': False,
+            'owner': {'login': owner}, 'default_branch': 'main', 'url': github.repo_url(),
+        }
+
+    def handle_list_variables(self, body, repository):
+        per_page = int(self.query.get('per_page', 30))
+        page = int(self.query.get('page', 1))
+        with self.github.lock:
+            variables = [{'name': name, 'value': value} for name, value in sorted(self.github.variables.items())]
+        payload = json.dumps({'total_count': len(variables),
+                              'variables': variables[(page - 1) * per_page:page * per_page]}).encode('utf-8')
+        etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+        if self.headers.get('If-None-Match') == etag:
+            return 304, {'ETag': etag}, b''
+        return 200, self._headers(ETag=etag), payload
+
+    def handle_update_variable(self, body, repository, name):
+        with self.github.lock:
+            if name not in self.github.variables:
+                return 404, self._headers(), {'message': 'Not Found'}
+            self.github.variables[name] = body['value']
+        return 204, self._headers(), None
+
+    def handle_create_variable(self, body, repository):
+        with self.github.lock:
+            if body['name'] in self.github.variables:
+                return 409, self._headers(), {'message': 'Already exists'}
+            self.github.variables[body['name']] = body['value']
+        return 201, self._headers(), {}
+
+    def handle_public_key(self, body, repository):
+        return 200, self._headers(), {'key_id': 'bench-key', 'key': self.github.public_key}
+
+    def handle_put_secret(self, body, repository, name):
+        with self.github.lock:
+            created = name not in self.github.secrets
+            self.github.secrets[name] = body['encrypted_value']
+        return (201 if created else 204), self._headers(), None
+
+    def handle_get_tree(self, body, repository, ref):
+        with self.github.lock:
+            sha = self.github.resolve_tree(ref)
+            if sha is None:
+                return 404, self._headers(), {'message': 'Not Found'}
+            return 200, self._headers(), self.github.tree_json(sha)
+
+    def handle_create_tree(self, body, repository):
+        with self.github.lock:
+            files = dict(self.github.trees.get(body.get('base_tree'), {}))
+            for element in body['tree']:
+                files[element['path']] = (git_blob_sha(element['content']), len(element['content'].encode('utf-8')))
+            return 201, self._headers(), self.github.tree_json(self.github.add_tree(files))
+
+    def handle_get_ref(self, body, repository, branch):
+        with self.github.lock:
+            if branch not in self.github.refs:
+                return 404, self._headers(), {'message': 'Not Found'}
+            return 200, self._headers(), self.github.ref_json(branch)
+
+    def handle_update_ref(self, body, repository, branch):
+        with self.github.lock:
+            head = self.github.refs.get(branch)
+            commit = self.github.commits.get(body['sha'])
+            if commit is None or (not body.get('force') and head not in commit['parents']):
+                return 422, self._headers(), {'message': 'Update is not a fast forward'}
+            self.github.refs[branch] = body['sha']
+            return 200, self._headers(), self.github.ref_json(branch)
+
+    def handle_get_commit(self, body, repository, sha):
+        with self.github.lock:
+            if sha not in self.github.commits:
+                return 404, self._headers(), {'message': 'Not Found'}
+            return 200, self._headers(), self.github.commit_json(sha)
+
+    def handle_create_commit(self, body, repository):
+        with self.github.lock:
+            sha = self.github.add_commit(body['message'], body['tree'], body.get('parents', []))
+            return 201, self._headers(), self.github.commit_json(sha)
+
+    def handle_dispatch(self, body, repository, workflow):
+        with self.github.lock:
+            self.github.dispatches += 1
+        return 204, self._headers(), None
+
+    def _headers(self, **extra):
+        headers = dict(self.rate_limit_headers, **{'X-RateLimit-Reset': str(int(time.time()) + 3600)})
+        headers.update(extra)
+        return headers
+
+    routes = (
+        ('GET', r'/repos/([^/]+/[^/]+)', 'GET repository', handle_repo),
+        ('GET', r'/repos/([^/]+/[^/]+)/actions/variables', 'GET variables', handle_list_variables),
+        ('PATCH', r'/repos/([^/]+/[^/]+)/actions/variables/([^/]+)', 'PATCH variable', handle_update_variable),
+        ('POST', r'/repos/([^/]+/[^/]+)/actions/variables', 'POST variable', handle_create_variable),
+        ('GET', r'/repos/([^/]+/[^/]+)/actions/secrets/public-key', 'GET secrets public key', handle_public_key),
+        ('PUT', r'/repos/([^/]+/[^/]+)/actions/secrets/([^/]+)', 'PUT secret', handle_put_secret),
+        ('GET', r'/repos/([^/]+/[^/]+)/git/trees/(.+)', 'GET tree', handle_get_tree),
+        ('POST', r'/repos/([^/]+/[^/]+)/git/trees', 'POST tree', handle_create_tree),
+        ('GET', r'/repos/([^/]+/[^/]+)/git/ref/heads/(.+)', 'GET ref', handle_get_ref),
+        ('PATCH', r'/repos/([^/]+/[^/]+)/git/refs/heads/(.+)', 'PATCH ref', handle_update_ref),
+        ('GET', r'/repos/([^/]+/[^/]+)/git/commits/([0-9a-f]+)', 'GET commit', handle_get_commit),
+        ('POST', r'/repos/([^/]+/[^/]+)/git/commits', 'POST commit', handle_create_commit),
+        ('POST', r'/repos/([^/]+/[^/]+)/actions/workflows/([^/]+)/dispatches', 'POST dispatch', handle_dispatch),
+    )
+
+
+class FakeOpenWhiskHandler(StandInHandler):
+    actions = None
+    lock = threading.Lock()
+
+    def handle_list(self, body, namespace):
+        limit = int(self.query.get('limit', 30))
+        skip = int(self.query.get('skip', 0))
+        with self.lock:
+            names = sorted(self.actions)
+        return 200, {}, [{'name': name, 'namespace': namespace} for name in names[skip:skip + limit]]
+
+    def handle_put(self, body, namespace, name):
+        with self.lock:
+            if name in self.actions and self.query.get('overwrite') != 'true':
+                return 409, {}, {'error': 'resource already exists'}
+            self.actions[name] = body['exec']
+        return 200, {}, {'name': name, 'namespace': namespace, 'exec': body['exec']}
+
+    def handle_invoke(self, body, namespace, name):
+        with self.lock:
+            if name not in self.actions:
+                return 404, {}, {'error': 'The requested resource does not exist.'}
+        return 202, {}, {'activationId': uuid.uuid4().hex}
+
+    routes = (
+        ('GET', r'/api/v1/namespaces/([^/]+)/actions', 'GET actions', handle_list),
+        ('PUT', r'/api/v1/namespaces/([^/]+)/actions/([^/]+)', 'PUT action', handle_put),
+        ('POST', r'/api/v1/namespaces/([^/]+)/actions/([^/]+)', 'POST activation', handle_invoke),
+    )
+
+
+def self_signed_context(directory):
+    """Returns a server SSLContext with a fresh self-signed certificate for 127.0.0.1."""
+    import ipaddress
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, '127.0.0.1')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (x509.CertificateBuilder()
+                   .subject_name(name).issuer_name(name).public_key(key.public_key())
+                   .serial_number(x509.random_serial_number())
+                   .not_valid_before(now - datetime.timedelta(minutes=5))
+                   .not_valid_after(now + datetime.timedelta(days=1))
+                   .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address('127.0.0.1'))]),
+                                  critical=False)
+                   .sign(key, hashes.SHA256()))
+    cert_path = os.path.join(directory, 'openwhisk-cert.pem')
+    key_path = os.path.join(directory, 'openwhisk-key.pem')
+    with open(cert_path, 'wb') as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, 'wb') as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    return context
+
+def start_server(handler, context=None):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    if context is not None:
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    scheme = 'https' if context is not None else 'http'
+    return server, f"{scheme}://127.0.0.1:{server.server_address[1]}"
+
+def instrument_aws(injectors):
+    """Adds latency, injected errors and call counting to the Lambda, tagging and S3 clients of aws_clients."""
+    import aws_clients
+
+    errors = {
+        'lambda': (429, 'TooManyRequestsException', 'Rate exceeded'),
+        's3': (503, 'SlowDown', 'Please reduce your request rate.'),
+    }
+    # The Lambda backend lists its functions through the Resource Groups Tagging API
+    stand_ins = {'lambda': 'lambda', 'tagging': 'lambda', 's3': 's3'}
+
+    def before_call(model, context, **kwargs):
+        service = stand_ins.get(model.service_model.endpoint_prefix)
+        injector = injectors.get(service)
+        if injector is None or not injector.delay_or_fail():
+            return None
+        status, code, message = errors[service]
+        injector.count(f"{model.name} (injected error)", 0, 0)
+        context['bench_injected'] = True
+        response = {'Error': {'Code': code, 'Message': message},
+                    'ResponseMetadata': {'HTTPStatusCode': status, 'HTTPHeaders': {}}}
+        return SimpleNamespace(status_code=status, headers={}, content=b''), response
+
+    def request_created(request, **kwargs):
+        body = request.body
+        request.context['bench_request_bytes'] = len(body) if isinstance(body, (bytes, str)) else 0
+
+    def after_call(http_response, model, context, **kwargs):
+        injector = injectors.get(stand_ins.get(model.service_model.endpoint_prefix))
+        if injector is None or context.get('bench_injected'):
+            return
+        # Streaming bodies (S3 GetObject) must stay unread for the caller
+        length = http_response.headers.get('content-length')
+        if length is None and not model.has_streaming_output:
+            length = len(http_response.content)
+        injector.count(model.name, context.get('bench_request_bytes', 0), int(length or 0))
+
+    aws_clients.register_event_handler('before-call', before_call)
+    aws_clients.register_event_handler('request-created', request_created)
+    aws_clients.register_event_handler('after-call', after_call)
+
+def synthetic_workflow(name, size, openwhisk_url, seed):
+    """
+    Returns a valid workflow of size actions from workflow_generator.py, with
+    its ComputeServers and DataStore pointed at the stand-ins
+    """
+    workflow = generate_workflow(actions=size, fan_out=FAN_OUT, ranked=RANKED, conditional=CONDITIONAL,
+                                 platforms=PLATFORMS, seed=seed, name=name)
+    owner, repository = REPOSITORY.split('/')
+    stand_ins = {
+        'GitHubActions': {'UserName': owner, 'ActionRepoName': repository},
+        'Lambda': {'Region': REGION},
+        'OpenWhisk': {'Endpoint': openwhisk_url, 'Namespace': NAMESPACE, 'SSL': 'false'},
+    }
+    for server in workflow['ComputeServers'].values():
+        server.update(stand_ins[server['FaaSType']])
+    for store in workflow['DataStores'].values():
+        store.update(Bucket=BUCKET, Region=REGION)
+    return workflow
+
+def parse_settings(value, name, cast):
+    """Parses 'stand-in=value,...' into a dict over STAND_INS, 0 for the ones not given."""
+    settings = dict.fromkeys(STAND_INS, cast(0))
+    for item in filter(None, value.split(',')):
+        stand_in, _, amount = item.partition('=')
+        if stand_in not in settings:
+            raise SystemExit(f"Error: invalid {name} setting '{item}', expected one of {', '.join(STAND_INS)}")
+        settings[stand_in] = cast(amount)
+    return settings
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='End-to-end benchmark of FaaSr registration and invocation')
+    parser.add_argument('--sizes', default='10,100,1000',
+                      help='Comma-separated numbers of actions per synthetic workflow')
+    parser.add_argument('--latency', default='',
+                      help='Milliseconds added to every request, per stand-in: github=40,lambda=20,s3=5,openwhisk=30')
+    parser.add_argument('--errors', default='',
+                      help='Share of requests answered with a transient error, per stand-in: openwhisk=0.05')
+    parser.add_argument('--seed', type=int, default=42,
+                      help='Seed of the error injection and of the synthetic workflows')
+    parser.add_argument('--concurrency', default='',
+                      help='Bulk invocation threads per platform, as invoke_workflow.py --concurrency')
+    parser.add_argument('--work-dir',
+                      help='Directory for workflow files, specs and traces (default: a temporary one)')
+    parser.add_argument('--output',
+                      help='Write the results as JSON to this file')
+    parser.add_argument('--compare',
+                      help='JSON results of an earlier run to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                      help='Allowed relative wall time increase over --compare')
+    parser.add_argument('--verbose', action='store_true',
+                      help='Show the output of the scripts')
+    return parser.parse_args()
+
+def run_script(module, argv, verbose):
+    """Runs module.main() with argv; returns (exit code, seconds)."""
+    saved_argv = sys.argv
+    sys.argv = [f"{module.__name__}.py"] + argv
+    start = time.perf_counter()
+    try:
+        with open(os.devnull, 'w') as devnull, redirect_stdout(sys.stdout if verbose else devnull):
+            module.main()
+        code = 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 1
+    finally:
+        sys.argv = saved_argv
+    return code, time.perf_counter() - start
+
+def summarize_spans(finished):
+    """Returns {span name: {Count, TotalMs, Bytes}} of finished spans."""
+    summary = {}
+    for span in finished:
+        entry = summary.setdefault(span.name, {'Count': 0, 'TotalMs': 0.0, 'Bytes': 0})
+        entry['Count'] += 1
+        entry['TotalMs'] += span.duration * 1000
+        entry['Bytes'] += span.attributes.get('bytes', 0) if isinstance(span.attributes.get('bytes'), int) else 0
+    return {name: dict(entry, TotalMs=round(entry['TotalMs'], 3)) for name, entry in sorted(summary.items())}
+
+def run_phase(phase, size, module, argv, injectors, verbose):
+    import tracing
+
+    for injector in injectors.values():
+        injector.reset()
+    first_span = len(tracing.spans())
+    code, seconds = run_script(module, argv, verbose)
+    stand_ins = {name: injector.snapshot() for name, injector in injectors.items()}
+    return {
+        'Actions': size,
+        'Phase': phase,
+        'ExitCode': code,
+        'WallSeconds': round(seconds, 4),
+        'ApiCalls': sum(stand_in['TotalCalls'] for stand_in in stand_ins.values()),
+        'RequestBytes': sum(stand_in['RequestBytes'] for stand_in in stand_ins.values()),
+        'ResponseBytes': sum(stand_in['ResponseBytes'] for stand_in in stand_ins.values()),
+        'InjectedErrors': sum(stand_in['InjectedErrors'] for stand_in in stand_ins.values()),
+        'StandIns': stand_ins,
+        'Spans': summarize_spans(tracing.spans()[first_span:]),
+    }
+
+def compare(results, baseline, tolerance):
+    """Returns a line per regression of results against baseline results."""
+    previous = {(result['Actions'], result['Phase']): result for result in baseline['Results']}
+    regressions = []
+    for result in results:
+        before = previous.get((result['Actions'], result['Phase']))
+        if before is None:
+            continue
+        label = f"{result['Actions']} actions, {result['Phase']}"
+        if result['ExitCode'] != 0 and before['ExitCode'] == 0:
+            regressions.append(f"{label}: exit code {result['ExitCode']}, was 0")
+        if result['ApiCalls'] > before['ApiCalls']:
+            regressions.append(f"{label}: {result['ApiCalls']} API calls, was {before['ApiCalls']}")
+        limit = before['WallSeconds'] * (1 + tolerance)
+        if result['WallSeconds'] > limit and result['WallSeconds'] - before['WallSeconds'] > NOISE_FLOOR:
+            regressions.append(f"{label}: {result['WallSeconds']:.2f}s, was {before['WallSeconds']:.2f}s "
+                               f"(+{tolerance:.0%} allowed)")
+    return regressions
+
+def print_results(results):
+    print(f"{'actions':>7} {'phase':<19} {'exit':>4} {'seconds':>8} {'calls':>6} "
+          + ' '.join(f"{name:>9}" for name in STAND_INS)
+          + f" {'sent KB':>9} {'recv KB':>9} {'errors':>6}")
+    for result in results:
+        calls = ' '.join(f"{result['StandIns'][name]['TotalCalls']:>9}" for name in STAND_INS)
+        print(f"{result['Actions']:>7} {result['Phase']:<19} {result['ExitCode']:>4} {result['WallSeconds']:>8.2f} "
+              f"{result['ApiCalls']:>6} {calls} {result['RequestBytes'] / 1024:>9.1f} "
+              f"{result['ResponseBytes'] / 1024:>9.1f} {result['InjectedErrors']:>6}")
+
+def main():
+    args = parse_arguments()
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    latency = parse_settings(args.latency, 'latency', float)
+    error_rates = parse_settings(args.errors, 'errors', float)
+    work_dir = os.path.abspath(args.work_dir or tempfile.mkdtemp(prefix='faasr-e2e-'))
+    os.makedirs(work_dir, exist_ok=True)
+    warnings.filterwarnings('ignore', message='Unverified HTTPS request')
+    # moto logs every request it lets through to the local stand-ins
+    for logger_name in ('responses', 'botocore'):
+        logging.getLogger(logger_name).setLevel(logging.WARNING)
+
+    injectors = {name: Injector(name, latency[name] / 1000, error_rates[name], args.seed) for name in STAND_INS}
+    FakeGitHubHandler.injector = injectors['github']
+    FakeOpenWhiskHandler.injector = injectors['openwhisk']
+    FakeOpenWhiskHandler.actions = {}
+    github_server, github_url = start_server(FakeGitHubHandler)
+    FakeGitHubHandler.github = FakeGitHub(github_url, REPOSITORY)
+    openwhisk_server, openwhisk_url = start_server(FakeOpenWhiskHandler, self_signed_context(work_dir))
+
+    # The scripts read these when they are imported
+    os.environ.update({
+        'GITHUB_API_URL': github_url,
+        'GITHUB_TOKEN': 'bench-token',
+        'GITHUB_REPOSITORY': REPOSITORY,
+        'OW_API_KEY': 'bench:bench',
+        'AWS_ACCESS_KEY_ID': 'testing',
+        'AWS_SECRET_ACCESS_KEY': 'testing',
+        'AWS_DEFAULT_REGION': REGION,
+        'MINIO_ACCESS_KEY': 'testing',
+        'MINIO_SECRET_KEY': 'testing',
+        # The stand-in has no rate limits, so do not pace dispatches to GitHub's
+        'FAASR_GITHUB_DISPATCH_PER_MINUTE': '0',
+    })
+    for name in ('FAASR_TRACE_FILE', 'FAASR_OTLP_ENDPOINT', 'FAASR_GITHUB_CACHE'):
+        os.environ.pop(name, None)
+
+    from moto import mock_aws
+
+    results = []
+    with mock_aws(config={'lambda': {'use_docker': False}}):
+        import aws_clients
+
+        instrument_aws(injectors)
+        iam = aws_clients.get_client('iam', REGION)
+        os.environ['AWS_LAMBDA_ROLE_ARN'] = iam.create_role(
+            RoleName='faasr-bench', AssumeRolePolicyDocument='{}')['Role']['Arn']
+        aws_clients.get_client('s3', REGION).create_bucket(Bucket=BUCKET)
+        register = importlib.import_module('register_prefix_workflow')
+        invoke = importlib.import_module('invoke_workflow')
+
+        saved_cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            for size in sizes:
+                name = f"bench{size}"
+                workflow_file = f"{name}.json"
+                with open(workflow_file, 'w') as f:
+                    json.dump(synthetic_workflow(name, size, openwhisk_url, args.seed), f, indent=2)
+                specs_file = f"{name}-specs.jsonl"
+                with open(specs_file, 'w') as f:
+                    for i in range(size):
+                        f.write(json.dumps({'workflow_file': workflow_file, 'action': f"action{i}",
+                                            'invocation_id': f"{name}-{i}"}) + '\n')
+                trace = ['--trace', f"{name}-trace.jsonl"]
+                register_argv = ['--workflow-file', workflow_file, '--incremental'] + trace
+                bulk_argv = ['--bulk', specs_file] + trace
+                if args.concurrency:
+                    bulk_argv += ['--concurrency', args.concurrency]
+                for phase, module, argv in (('register', register, register_argv),
+                                            ('register-unchanged', register, register_argv),
+                                            ('invoke', invoke, ['--workflow-file', workflow_file] + trace),
+                                            ('invoke-bulk', invoke, bulk_argv)):
+                    results.append(run_phase(phase, size, module, argv, injectors, args.verbose))
+                    print(f"{size} actions, {phase}: {results[-1]['WallSeconds']:.2f}s", file=sys.stderr)
+        finally:
+            os.chdir(saved_cwd)
+            github_server.shutdown()
+            openwhisk_server.shutdown()
+
+    print_results(results)
+    report = {
+        'Benchmark': 'end_to_end',
+        'Settings': {'Sizes': sizes, 'LatencyMs': latency, 'ErrorRates': error_rates, 'Seed': args.seed,
+                     'Concurrency': args.concurrency or None, 'Python': sys.version.split()[0]},
+        'Results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    failed = [f"{result['Actions']} actions, {result['Phase']}" for result in results if result['ExitCode'] != 0]
+    if failed:
+        print(f"Failed phases: {'; '.join(failed)}")
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        for setting in ('LatencyMs', 'ErrorRates', 'Seed', 'Concurrency'):
+            if baseline['Settings'].get(setting) != report['Settings'][setting]:
+                print(f"Note: {setting} differs from {args.compare}: {baseline['Settings'].get(setting)}")
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"Regression: {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the rate-limit handling in github_client.py
+
+Starts a local fake of the GitHub REST API that enforces, on a shortened
+clock:
+    - a primary limit of --primary-limit requests per --window seconds, with
+      X-RateLimit-Remaining/Reset headers (a 304 does not count)
+    - a secondary limit of --secondary-limit workflow_dispatch POSTs per
+      --window seconds, answered 403 with Retry-After
+    - ETags on GET /actions/variables, answered 304 on If-None-Match
+
+and sends the same burst of workflow_dispatch POSTs twice: plain http_pool
+POSTs, then github_client.dispatch() with its dispatch rate set just under
+the fake's secondary limit. Then it repeats a GET to show the conditional
+requests.
+
+Usage:
+    python benchmarks/bench_github_rate_limit.py --dispatches 100 --workers 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+import github_client
+import http_pool
+
+
+class FakeGitHub:
+    """Rate-limit bookkeeping of the fake API."""
+
+    def __init__(self, primary_limit, secondary_limit, window):
+        self.primary_limit = primary_limit
+        self.secondary_limit = secondary_limit
+        self.window = window
+        self.window_start = time.time()
+        self.used = 0
+        self.dispatches = deque()
+        self.counts = {'accepted': 0, 'primary_403': 0, 'secondary_403': 0, 'not_modified': 0}
+        self.lock = threading.Lock()
+
+    def charge(self, dispatch):
+        """Returns (status, headers) for a request that counts against the limits."""
+        with self.lock:
+            now = time.time()
+            if now - self.window_start >= self.window:
+                self.window_start, self.used = now, 0
+            reset = int(self.window_start + self.window) + 1
+            if self.used >= self.primary_limit:
+                self.counts['primary_403'] += 1
+                return 403, self._headers(reset)
+            self.used += 1
+            if dispatch:
+                while self.dispatches and now - self.dispatches[0] >= self.window:
+                    self.dispatches.popleft()
+                if len(self.dispatches) >= self.secondary_limit:
+                    self.counts['secondary_403'] += 1
+                    headers = self._headers(reset)
+                    headers['Retry-After'] = str(max(1, int(self.dispatches[0] + self.window - now) + 1))
+                    return 403, headers
+                self.dispatches.append(now)
+            self.counts['accepted'] += 1
+            return None, self._headers(reset)
+
+    def _headers(self, reset):
+        return {
+            'X-RateLimit-Limit': str(self.primary_limit),
+            'X-RateLimit-Remaining': str(max(0, self.primary_limit - self.used)),
+            'X-RateLimit-Reset': str(reset),
+        }
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    fake = None
+    variables = json.dumps({'total_count': 1, 'variables': [{'name': 'BENCH', 'value': '1'}]}).encode('utf-8')
+    etag = '"bench-variables-1"'
+
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == self.etag:
+            with self.fake.lock:
+                self.fake.counts['not_modified'] += 1
+            return self._send(304, {'ETag': self.etag})
+        status, headers = self.fake.charge(dispatch=False)
+        if status:
+            return self._send(status, headers, b'{"message": "API rate limit exceeded"}')
+        headers['ETag'] = self.etag
+        self._send(200, headers, self.variables)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        status, headers = self.fake.charge(dispatch=self.path.endswith('/dispatches'))
+        if status:
+            message = b'{"message": "You have exceeded a secondary rate limit"}'
+            if 'Retry-After' not in headers:
+                message = b'{"message": "API rate limit exceeded"}'
+            return self._send(status, headers, message)
+        self._send(204, headers)
+
+    def _send(self, status, headers, body=b''):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark github_client against a rate-limited fake GitHub API')
+    parser.add_argument('--dispatches', type=int, default=100,
+                      help='workflow_dispatch POSTs per mode')
+    parser.add_argument('--workers', type=int, default=8,
+                      help='concurrent dispatching threads')
+    parser.add_argument('--window', type=float, default=5,
+                      help='length in seconds of the fake rate-limit windows')
+    parser.add_argument('--primary-limit', type=int, default=500,
+                      help='requests allowed per window')
+    parser.add_argument('--secondary-limit', type=int, default=20,
+                      help='dispatch POSTs allowed per window')
+    parser.add_argument('--gets', type=int, default=20,
+                      help='repeated GETs for the conditional request check')
+    return parser.parse_args()
+
+def start_fake(args):
+    FakeGitHubHandler.fake = FakeGitHub(args.primary_limit, args.secondary_limit, args.window)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGitHubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def run_burst(send, count, workers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        statuses = list(executor.map(lambda i: send(i).status_code, range(count)))
+    return time.perf_counter() - start, statuses
+
+def main():
+    args = parse_arguments()
+    # Mirror the fake's secondary limit, as the defaults do for GitHub's
+    per_minute = args.secondary_limit * 60 / args.window * 0.9
+    github_client.configure(dispatch_per_minute=per_minute, dispatch_burst=args.secondary_limit // 2,
+                            dispatch_windows=((args.window, args.secondary_limit),))
+    body = {'ref': 'main', 'inputs': {'OVERWRITTEN': '{}', 'PAYLOAD_URL': 'bench'}}
+
+    print(f"{'mode':<22} {'calls':>6} {'seconds':>8} {'204':>6} {'403':>6} {'fake 403s':>10}")
+    for mode in ('http_pool.post', 'github_client'):
+        server, url = start_fake(args)
+        dispatch_url = f"{url}/repos/bench/repo/actions/workflows/bench.yml/dispatches"
+        if mode == 'http_pool.post':
+            send = lambda i: http_pool.post(dispatch_url, headers={'Authorization': 'Bearer bench'}, json=body)
+        else:
+            send = lambda i: github_client.dispatch(dispatch_url, 'bench', json=body)
+        seconds, statuses = run_burst(send, args.dispatches, args.workers)
+        counts = FakeGitHubHandler.fake.counts
+        print(f"{mode:<22} {len(statuses):>6} {seconds:>8.2f} {statuses.count(204):>6} {statuses.count(403):>6} "
+              f"{counts['primary_403'] + counts['secondary_403']:>10}")
+        server.shutdown()
+
+    server, url = start_fake(args)
+    variables_url = f"{url}/repos/bench/repo/actions/variables"
+    bodies = {github_client.get(variables_url, 'bench').text for _ in range(args.gets)}
+    counts = FakeGitHubHandler.fake.counts
+    print(f"Conditional GETs: {args.gets} calls, {counts['accepted']} counted against the limit, "
+          f"{counts['not_modified']} answered 304, {len(bodies)} distinct bodies")
+    print(f"github_client stats: {json.dumps(github_client.stats())}")
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the pooled HTTP sessions in http_pool.py
+
+Starts a local HTTPS stand-in (self-signed certificate generated with the
+openssl CLI) that answers every POST with 204, like a workflow_dispatch, then
+compares per-call latency of bare requests.post() (new TLS connection per call)
+with http_pool.post() (kept-alive pooled connection).
+
+Usage:
+    python benchmarks/bench_http_pool.py --calls 200
+"""
+
+import argparse
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+import requests
+import urllib3
+
+import http_pool
+
+
+class DispatchHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(204)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark pooled vs per-call HTTPS connections')
+    parser.add_argument('--calls', type=int, default=200,
+                      help='Requests per mode')
+    return parser.parse_args()
+
+def start_https_server(cert_dir):
+    cert_file = os.path.join(cert_dir, 'cert.pem')
+    key_file = os.path.join(cert_dir, 'key.pem')
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-subj', '/CN=localhost', '-keyout', key_file, '-out', cert_file],
+        check=True, capture_output=True
+    )
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_file, key_file)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), DispatchHandler)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def time_calls(send, url, calls):
+    latencies = []
+    body = {"ref": "main", "inputs": {"OVERWRITTEN": "{}", "PAYLOAD_URL": "x"}}
+    for _ in range(calls):
+        start = time.perf_counter()
+        response = send(url, json=body, verify=False)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 204:
+            print(f"Error: unexpected status {response.status_code}")
+            sys.exit(1)
+    latencies.sort()
+    return sum(latencies) / len(latencies), latencies[len(latencies) // 2]
+
+def main():
+    args = parse_arguments()
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    with tempfile.TemporaryDirectory() as cert_dir:
+        server = start_https_server(cert_dir)
+        url = f"https://127.0.0.1:{server.server_address[1]}/repos/o/r/actions/workflows/w.yml/dispatches"
+
+        bare_mean, bare_p50 = time_calls(requests.post, url, args.calls)
+        pooled_mean, pooled_p50 = time_calls(http_pool.post, url, args.calls)
+        server.shutdown()
+
+    print(f"{'mode':<16} {'mean ms':>9} {'p50 ms':>9}")
+    print(f"{'requests.post':<16} {bare_mean * 1000:>9.2f} {bare_p50 * 1000:>9.2f}")
+    print(f"{'http_pool.post':<16} {pooled_mean * 1000:>9.2f} {pooled_p50 * 1000:>9.2f}")
+    print(f"Per-call latency reduction: {(1 - pooled_mean / bare_mean) * 100:.0f}%")
+
+if __name__ == '__main__':
+    main()
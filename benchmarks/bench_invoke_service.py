@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the resident invoke service in invoke_service.py
+
+Starts a local stand-in for the GitHub workflow_dispatch endpoint (every POST
+answers 204) and compares trigger latency of a fresh
+`python scripts/invoke_workflow.py --workflow-file ...` process per trigger
+with POST /invoke to a running invoke_service.py, both dispatching the
+workflow's FunctionInvoke action to the stand-in via GITHUB_API_URL.
+
+Usage:
+    python benchmarks/bench_invoke_service.py --workflow-file project1.json --calls 200
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SCRIPTS = os.path.join(ROOT, 'scripts')
+
+
+class DispatchHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    dispatches = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        DispatchHandler.dispatches += 1
+        self.send_response(204)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark per-process vs resident FaaSr invocation')
+    parser.add_argument('--workflow-file', default='project1.json',
+                      help='Workflow whose FunctionInvoke runs on GitHub Actions')
+    parser.add_argument('--processes', type=int, default=10,
+                      help='invoke_workflow.py processes to time')
+    parser.add_argument('--calls', type=int, default=200,
+                      help='POST /invoke calls to time')
+    return parser.parse_args()
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def post_json(url, body):
+    request = urllib.request.Request(url, data=json.dumps(body).encode('utf-8'),
+                                     headers={'Content-Type': 'application/json'}, method='POST')
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+def wait_for_service(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/healthz"):
+                return
+        except OSError:
+            time.sleep(0.1)
+    print("Error: invoke service did not start")
+    sys.exit(1)
+
+def summarize(label, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"{label:<28} {len(latencies):>6} {statistics.median(latencies) * 1000:>10.1f} {p95 * 1000:>10.1f}")
+
+def main():
+    args = parse_arguments()
+    stand_in = ThreadingHTTPServer(('127.0.0.1', 0), DispatchHandler)
+    threading.Thread(target=stand_in.serve_forever, daemon=True).start()
+
+    env = dict(os.environ)
+    env.update({
+        'GITHUB_API_URL': f"http://127.0.0.1:{stand_in.server_address[1]}",
+        'GITHUB_TOKEN': 'bench-token',
+        # The stand-in has no rate limits, so do not pace dispatches to GitHub's
+        'FAASR_GITHUB_DISPATCH_PER_MINUTE': '0',
+        'PYTHONPATH': os.pathsep.join(filter(None, [SCRIPTS, env.get('PYTHONPATH')])),
+    })
+
+    process_latencies = []
+    for _ in range(args.processes):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(SCRIPTS, 'invoke_workflow.py'),
+                        '--workflow-file', args.workflow_file],
+                       cwd=ROOT, env=env, check=True, capture_output=True)
+        process_latencies.append(time.perf_counter() - start)
+
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    service = subprocess.Popen([sys.executable, os.path.join(SCRIPTS, 'invoke_service.py'),
+                                '--port', str(port), '--workflow-dir', ROOT, '--preload', args.workflow_file],
+                               env=env, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_service(url)
+        service_latencies = []
+        for i in range(args.calls):
+            start = time.perf_counter()
+            post_json(f"{url}/invoke", {'workflow_file': args.workflow_file, 'invocation_id': f"bench-{i}"})
+            service_latencies.append(time.perf_counter() - start)
+        with urllib.request.urlopen(f"{url}/admin/stats") as response:
+            stats = json.loads(response.read())
+    finally:
+        service.terminate()
+        service.wait()
+        stand_in.shutdown()
+
+    print(f"{'mode':<28} {'calls':>6} {'p50 ms':>10} {'p95 ms':>10}")
+    summarize('invoke_workflow.py process', process_latencies)
+    summarize('invoke service POST', service_latencies)
+    print(f"Dispatches received by the stand-in: {DispatchHandler.dispatches}")
+    print(f"Service stats: {json.dumps(stats['Platforms'])}")
+
+if __name__ == '__main__':
+    main()
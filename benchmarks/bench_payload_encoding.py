@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the compressed payload encoding in faasr_payload.py
+
+For each sample workflow in the repository root, and for synthetic workflows
+from workflow_generator.py, compares the bytes sent as OVERWRITTEN / Lambda
+Event payload / OpenWhisk body in the default form (json.dumps), compact form
+(no whitespace) and each encoded form, with encode and decode cost per payload.
+
+Usage:
+    python benchmarks/bench_payload_encoding.py --sizes 100,1000,10000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+from faasr_payload import decode_payload, encode_payload
+from workflow_generator import generate_workflow
+
+SAMPLE_WORKFLOWS = ('project1.json', 'test.json', 'cycled-workflow.json', 'tutorial.json')
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark FaaSr payload encodings')
+    parser.add_argument('--sizes', default='100,1000,10000',
+                      help='Comma-separated numbers of actions for synthetic workflows')
+    parser.add_argument('--repeat', type=int, default=5,
+                      help='Runs per measurement; the fastest is reported')
+    parser.add_argument('--seed', type=int, default=42,
+                      help='Seed of the synthetic workflows')
+    return parser.parse_args()
+
+def available_codecs():
+    codecs = ['gzip']
+    try:
+        import zstandard  # noqa: F401
+        codecs.append('zstd')
+    except ImportError:
+        print("Note: zstandard is not installed, skipping zstd")
+    return codecs
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def measure(label, payload, codecs, repeat):
+    default_size = len(json.dumps(payload).encode('utf-8'))
+    compact_size = len(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+    print(f"{label:<30} {'compact':<8} {compact_size:>10} {(1 - compact_size / default_size) * 100:>7.1f}%"
+          f" {'':>10} {'':>10}")
+    for codec in codecs:
+        encode_time, encoded = best_time(lambda: encode_payload(payload, codec), repeat)
+        decode_time, decoded = best_time(lambda: decode_payload(encoded), repeat)
+        if decoded != payload:
+            print(f"Error: {codec} round trip of {label} did not match")
+            sys.exit(1)
+        size = len(json.dumps(encoded).encode('utf-8'))
+        print(f"{'':<30} {codec:<8} {size:>10} {(1 - size / default_size) * 100:>7.1f}%"
+              f" {encode_time * 1e6:>10.0f} {decode_time * 1e6:>10.0f}")
+
+def main():
+    args = parse_arguments()
+    sizes = [int(size) for size in args.sizes.split(',')]
+    codecs = available_codecs()
+
+    print(f"{'payload (default bytes)':<30} {'form':<8} {'bytes':>10} {'saved':>8} "
+          f"{'enc us':>10} {'dec us':>10}")
+    for file_name in SAMPLE_WORKFLOWS:
+        with open(os.path.join(ROOT, file_name)) as f:
+            workflow = json.load(f)
+        label = f"{file_name} ({len(json.dumps(workflow))})"
+        measure(label, workflow, codecs, args.repeat)
+
+    for size in sizes:
+        workflow = generate_workflow(actions=size, ranked=0.05, conditional=0.1, joins=0.2, seed=args.seed)
+        label = f"synthetic {size} ({len(json.dumps(workflow))})"
+        measure(label, workflow, codecs, args.repeat)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the template-spliced payload rendering in invoke_workflow.py
+
+Compares per-dispatch CPU time of building a Lambda/OpenWhisk payload the old
+way (copy the workflow, apply the invocation's fields, substitute credentials
+with build_faasr_payload and json.dumps the whole document) with rendering it
+from the workflow's cached PayloadTemplate, for workflows with hundreds of
+actions. Workflows come from workflow_generator.py.
+
+Usage:
+    python benchmarks/bench_payload_template.py --sizes 10,100,500,1000
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+from invoke_workflow import build_faasr_payload, render_payload
+from workflow_generator import generate_workflow
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark FaaSr payload rendering')
+    parser.add_argument('--sizes', default='10,100,500,1000',
+                      help='Comma-separated numbers of actions')
+    parser.add_argument('--dispatches', type=int, default=500,
+                      help='Payloads rendered per size and mode')
+    parser.add_argument('--seed', type=int, default=42,
+                      help='Seed of the synthetic workflows')
+    return parser.parse_args()
+
+def rebuild_payload(workflow_data, action_name, invocation):
+    workflow_data = copy.deepcopy(workflow_data)
+    workflow_data['FunctionInvoke'] = action_name
+    workflow_data['InvocationID'] = invocation['InvocationID']
+    workflow_data['ActionList'][action_name].setdefault('Arguments', {}).update(invocation['Arguments'])
+    return json.dumps(build_faasr_payload(workflow_data))
+
+def spliced_payload(workflow_data, action_name, invocation):
+    return render_payload(workflow_data, action_name, 'lambda', invocation)
+
+def cpu_per_dispatch(render, workflow_data, action_name, dispatches):
+    start = time.process_time()
+    for i in range(dispatches):
+        render(workflow_data, action_name, {'InvocationID': f"run-{i}", 'Arguments': {'n': i}})
+    return (time.process_time() - start) / dispatches
+
+def main():
+    args = parse_arguments()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    print(f"{'actions':>8} {'bytes':>10} {'rebuild us':>11} {'spliced us':>11} {'speedup':>8}")
+    for size in sizes:
+        workflow_data = generate_workflow(actions=size, ranked=0.05, conditional=0.1, joins=0.2, seed=args.seed)
+        action_name = workflow_data['FunctionInvoke']
+        invocation = {'InvocationID': 'check', 'Arguments': {'n': 1}}
+        if json.loads(rebuild_payload(workflow_data, action_name, invocation)) != \
+                json.loads(spliced_payload(workflow_data, action_name, invocation)):
+            print(f"Error: spliced payload of {size} actions differs from the rebuilt one")
+            sys.exit(1)
+
+        rebuild = cpu_per_dispatch(rebuild_payload, workflow_data, action_name, args.dispatches)
+        spliced = cpu_per_dispatch(spliced_payload, workflow_data, action_name, args.dispatches)
+        size_bytes = len(spliced_payload(workflow_data, action_name, invocation))
+        print(f"{size:>8} {size_bytes:>10} {rebuild * 1e6:>11.1f} {spliced * 1e6:>11.1f} "
+              f"{rebuild / spliced:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
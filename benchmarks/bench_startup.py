@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the FaaSr scripts, based on python -X importtime
+
+Imports each script module in a fresh interpreter several times and reports
+the median cumulative import time of the module and the slowest imports it
+pulls in. With --history, each run is appended to a JSONL file (with the git
+commit it was measured at) and compared with the previous entry, so startup
+cost can be tracked over time.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5 --history startup_history.jsonl
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SCRIPTS = os.path.join(ROOT, 'scripts')
+
+MODULES = ('invoke_workflow', 'register_prefix_workflow', 'register_workflow')
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark FaaSr script startup time')
+    parser.add_argument('--modules', default=','.join(MODULES),
+                      help='Comma-separated script modules to import')
+    parser.add_argument('--runs', type=int, default=5,
+                      help='Fresh interpreters per module; the median is reported')
+    parser.add_argument('--top', type=int, default=5,
+                      help='Slowest direct imports to list per module')
+    parser.add_argument('--history', help='JSONL file to append results to and compare against')
+    return parser.parse_args()
+
+def import_times(module):
+    """
+    Imports module in a fresh interpreter
+
+    Returns:
+        list -- (name, depth, cumulative microseconds) per imported module, in
+                -X importtime order (a module's imports are listed before it)
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [SCRIPTS, env.get('PYTHONPATH')]))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"Error: importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+        sys.exit(1)
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        entries.append((name.strip(), (len(name) - len(name.lstrip()) - 1) // 2, int(cumulative)))
+    return entries
+
+def direct_imports(entries, module):
+    """Returns {name: cumulative} of the imports made directly by module."""
+    index = next(i for i, (name, _, _) in enumerate(entries) if name == module)
+    depth = entries[index][1]
+    imports = {}
+    for name, level, cumulative in reversed(entries[:index]):
+        if level <= depth:
+            break
+        if level == depth + 1:
+            imports[name] = cumulative
+    return imports
+
+def measure(module, runs, top):
+    samples = []
+    imports = {}
+    for _ in range(runs):
+        entries = import_times(module)
+        samples.append(next(cumulative for name, _, cumulative in entries if name == module))
+        for name, cumulative in direct_imports(entries, module).items():
+            imports.setdefault(name, []).append(cumulative)
+    slowest = sorted(((statistics.median(values), name) for name, values in imports.items()), reverse=True)
+    return statistics.median(samples), [(name, value) for value, name in slowest[:top]]
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def read_last_entry(path):
+    if not os.path.exists(path):
+        return None
+    last = None
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                last = json.loads(line)
+    return last
+
+def main():
+    args = parse_arguments()
+    modules = [module for module in args.modules.split(',') if module]
+    previous = read_last_entry(args.history) if args.history else None
+
+    results = {}
+    for module in modules:
+        total, slowest = measure(module, args.runs, args.top)
+        results[module] = total
+        change = ''
+        if previous and module in previous['results']:
+            before = previous['results'][module]
+            change = f" ({(total - before) / 1000:+.1f} ms vs {previous.get('commit') or 'previous run'})"
+        print(f"{module}: {total / 1000:.1f} ms{change}")
+        for name, value in slowest:
+            print(f"    {name:<32} {value / 1000:>8.1f} ms")
+
+    if args.history:
+        entry = {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'commit': git_commit(),
+            'python': sys.version.split()[0],
+            'runs': args.runs,
+            'results': results,
+        }
+        with open(args.history, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the workflow DAG validator in workflow_graph.py
+
+Builds synthetic workflows with workflow_generator.py: one chain through every
+action, so the DFS depth equals the workflow size, plus long-range joins,
+ranked actions and conditional {"True": [...], "False": [...]} InvokeNext
+branches. Then times build_adjacency_graph + validate_dag. Time per (action +
+edge) should stay roughly flat as the workflow grows if validation is linear.
+
+Usage:
+    python benchmarks/bench_validate_dag.py --sizes 1000,10000,100000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from workflow_generator import generate_workflow
+from workflow_graph import build_adjacency_graph, validate_dag
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark FaaSr workflow DAG validation')
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                      help='Comma-separated numbers of actions')
+    parser.add_argument('--joins', type=float, default=3,
+                      help='Extra predecessors per action on average')
+    parser.add_argument('--fan-out', type=int, default=8,
+                      help='Most actions one action invokes')
+    parser.add_argument('--ranked', type=float, default=0.05,
+                      help='Share of actions invoked with a rank')
+    parser.add_argument('--conditional', type=float, default=0.33,
+                      help='Share of actions with a conditional branch')
+    parser.add_argument('--repeat', type=int, default=3,
+                      help='Runs per size; the fastest is reported')
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    print(f"{'actions':>10} {'edges':>10} {'best (s)':>10} {'ns/(V+E)':>10}")
+    for size in sizes:
+        workflow = generate_workflow(actions=size, depth=size, fan_out=args.fan_out, ranked=args.ranked,
+                                     conditional=args.conditional, joins=args.joins, seed=args.seed)
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            adj_graph, _ = build_adjacency_graph(workflow)
+            report = validate_dag(workflow["ActionList"], adj_graph)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        if report.cycles or report.unreachable or report.undefined or len(report.roots) != 1:
+            print(f"Error: synthetic workflow of {size} actions did not validate")
+            sys.exit(1)
+
+        edges = sum(len(successors) for successors in adj_graph.values())
+        print(f"{size:>10} {edges:>10} {best:>10.3f} {best * 1e9 / (size + edges):>10.0f}")
+
+if __name__ == '__main__':
+    main()
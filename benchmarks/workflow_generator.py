@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Synthetic FaaSr workflow generator for scale and stress testing
+
+Builds a workflow of --actions actions rooted at action0 (the FunctionInvoke)
+whose longest path is --depth actions and where no action invokes more than
+--fan-out others. On top of that tree:
+    --ranked       share of actions invoked as ranked copies, e.g. "action7(3)"
+    --conditional  share of actions whose successors sit (partly) in a
+                   {"True": [...], "False": [...]} branch
+    --joins        extra predecessors per action on average, so actions wait
+                   for several others (0.2: one in five has a second one)
+    --platforms    FaaSTypes the actions are spread over at random; repeat one
+                   to weight it, e.g. githubactions,githubactions,lambda
+The result passes check_dag unless it is made invalid on purpose:
+    --cycles N       adds N back edges from an action to one of its ancestors
+    --unreachable N  adds a loop of N actions that no path from action0 reaches
+                     (check_dag only calls an action unreachable if no root
+                     leads to it, so such actions always hang off a cycle)
+
+The same options and seed give the same workflow. Every output records them
+under "SyntheticWorkflow", so generate_workflow(**workflow["SyntheticWorkflow"]["Options"])
+reproduces it; without --seed a random seed is picked and recorded.
+
+Usage:
+    python benchmarks/workflow_generator.py --actions 1000 --depth 12 --fan-out 4 \\
+        --ranked 0.05 --conditional 0.1 --seed 7 --output synthetic.json --check
+    python benchmarks/workflow_generator.py --actions 50 --cycles 2 --unreachable 3 --check
+"""
+
+import argparse
+import json
+import os
+import random
+import string
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+PLATFORMS = ('githubactions', 'lambda', 'openwhisk')
+
+# ComputeServer of each platform; callers point them at real or stand-in endpoints
+SERVERS = {
+    'githubactions': ('Synthetic_GitHub', {'FaaSType': 'GitHubActions', 'UserName': 'faasr-synthetic',
+                                           'ActionRepoName': 'synthetic-workflows', 'Branch': 'main'}),
+    'lambda': ('Synthetic_Lambda', {'FaaSType': 'Lambda', 'Region': 'us-east-1'}),
+    'openwhisk': ('Synthetic_OpenWhisk', {'FaaSType': 'OpenWhisk', 'Endpoint': 'https://openwhisk.example.com',
+                                          'Namespace': 'faasr', 'SSL': 'true'}),
+}
+
+DATA_STORE = ('Synthetic_Store', {'Bucket': 'faasr-synthetic', 'Endpoint': '', 'Region': 'us-east-1',
+                                  'Writable': 'TRUE'})
+
+# Distinct FunctionNames the actions share
+FUNCTIONS = 20
+
+
+def minimum_depth(actions, fan_out):
+    """Returns the depth of the shallowest tree of actions with at most fan_out children each."""
+    if fan_out == 1:
+        return actions
+    depth, capacity, level = 1, 1, 1
+    while capacity < actions:
+        level *= fan_out
+        capacity += level
+        depth += 1
+    return depth
+
+def generate_workflow(actions=100, depth=None, fan_out=3, ranked=0.0, max_rank=4, conditional=0.0,
+                      joins=0.0, platforms=PLATFORMS, cycles=0, unreachable=0, argument_bytes=64,
+                      seed=0, name='synthetic'):
+    """
+    Returns a synthetic workflow dict (see the module docstring)
+
+    Arguments:
+        actions: actions in the tree rooted at action0
+        depth: actions on the longest path (default: 2 more than the minimum)
+        fan_out: most actions one action invokes in the tree
+        ranked: share of actions invoked with a rank of 2 to max_rank
+        conditional: share of actions with a conditional branch in InvokeNext
+        joins: extra predecessors per action on average
+        platforms: FaaSTypes to choose from for every action
+        cycles: back edges to add
+        unreachable: actions to add in a loop nobody invokes
+        argument_bytes: size of the filler argument of every action
+        seed: random seed
+        name: WorkflowName
+    Raises:
+        ValueError: if the actions do not fit in depth with fan_out
+    """
+    if actions < 1 or fan_out < 1:
+        raise ValueError("actions and fan_out must be at least 1")
+    unknown = [platform for platform in platforms if platform not in SERVERS]
+    if unknown or not platforms:
+        raise ValueError(f"platforms must be among {', '.join(SERVERS)}, got {', '.join(unknown) or 'none'}")
+    depth = depth or min(actions, minimum_depth(actions, fan_out) + 2)
+    if not minimum_depth(actions, fan_out) <= depth <= actions:
+        raise ValueError(f"{actions} actions do not fit in depth {depth} with fan-out {fan_out}")
+    options = {
+        'actions': actions, 'depth': depth, 'fan_out': fan_out, 'ranked': ranked, 'max_rank': max_rank,
+        'conditional': conditional, 'joins': joins, 'platforms': list(platforms), 'cycles': cycles,
+        'unreachable': unreachable, 'argument_bytes': argument_bytes, 'seed': seed, 'name': name,
+    }
+    rng = random.Random(seed)
+
+    # A backbone chain gives the depth; the other actions hang off random
+    # actions that still have room for a child and are not on the last level
+    parent = [None] * actions
+    level = [0] * actions
+    successors = [[] for _ in range(actions)]
+    for i in range(1, depth):
+        parent[i], level[i] = i - 1, i
+        successors[i - 1].append(i)
+    open_parents = [i for i in range(depth - 1) if len(successors[i]) < fan_out]
+    for i in range(depth, actions):
+        k = rng.randrange(len(open_parents))
+        p = open_parents[k]
+        parent[i], level[i] = p, level[p] + 1
+        successors[p].append(i)
+        if len(successors[p]) >= fan_out:
+            open_parents[k] = open_parents[-1]
+            open_parents.pop()
+        if level[i] < depth - 1:
+            open_parents.append(i)
+
+    # A ranked action may have only one predecessor, so joins and back edges avoid them
+    rank = [1] * actions
+    for i in range(1, actions):
+        if rng.random() < ranked:
+            rank[i] = rng.randint(2, max(2, max_rank))
+
+    by_level = [[] for _ in range(depth)]
+    for i in range(actions):
+        by_level[level[i]].append(i)
+    edges = actions - 1
+    for i in range(1, actions):
+        if rank[i] > 1 or level[i] < 2:
+            continue
+        for _ in range(int(joins) + (rng.random() < joins % 1)):
+            # An action on a shallower level with room for a child; a few tries, then give up
+            for _ in range(8):
+                j = rng.choice(by_level[rng.randrange(level[i])])
+                if j != parent[i] and i not in successors[j] and len(successors[j]) < fan_out:
+                    successors[j].append(i)
+                    edges += 1
+                    break
+
+    for _ in range(cycles):
+        candidates = [i for i in range(actions) if level[i] >= 2] or list(range(1, actions)) or [0]
+        i = rng.choice(candidates)
+        ancestors = []
+        node = parent[i]
+        while node is not None:
+            if level[node] >= 1 and rank[node] == 1:
+                ancestors.append(node)
+            node = parent[node]
+        # Without another ancestor the edge goes to action0, which then is not a root any more
+        successors[i].append(rng.choice(ancestors) if ancestors else 0)
+        edges += 1
+
+    names = [f"action{i}" for i in range(actions)] + [f"unreachable{i}" for i in range(unreachable)]
+    successors += [[actions + (i + 1) % unreachable] for i in range(unreachable)]
+    rank += [1] * unreachable
+    edges += unreachable
+
+    servers = {}
+    action_list = {}
+    function_names = set()
+    for i, action_name in enumerate(names):
+        platform = rng.choice(platforms)
+        server_name, server_config = SERVERS[platform]
+        servers[server_name] = dict(server_config)
+        function_name = f"function{i % FUNCTIONS}"
+        function_names.add(function_name)
+        action_list[action_name] = {
+            'FunctionName': function_name,
+            'FaaSServer': server_name,
+            'Type': rng.choice(('R', 'Python')),
+            'Arguments': {
+                'folder': f"{name}/{action_name}",
+                'input': f"{action_name}.csv",
+                'filler': ''.join(rng.choices(string.ascii_letters, k=argument_bytes)),
+            },
+            'InvokeNext': invoke_next([names[j] + (f"({rank[j]})" if rank[j] > 1 else '') for j in successors[i]],
+                                      rng, conditional),
+        }
+
+    store_name, store_config = DATA_STORE
+    return {
+        'WorkflowName': name,
+        'ComputeServers': servers,
+        'DataStores': {store_name: dict(store_config)},
+        'ActionList': action_list,
+        'FunctionGitRepo': {function_name: 'faasr/synthetic-functions' for function_name in sorted(function_names)},
+        'FunctionInvoke': names[0],
+        'InvocationID': '',
+        'FaaSrLog': 'FaaSrLog',
+        'LoggingDataStore': store_name,
+        'DefaultDataStore': store_name,
+        'SyntheticWorkflow': {
+            'Generator': 'benchmarks/workflow_generator.py',
+            'Options': options,
+            'Edges': edges,
+            'Valid': not cycles and not unreachable,
+        },
+    }
+
+def invoke_next(targets, rng, conditional):
+    """Returns the InvokeNext list of targets, moving some into a conditional branch with probability conditional."""
+    if not targets or rng.random() >= conditional:
+        return targets
+    cut = rng.randrange(len(targets))
+    true_count = rng.randint(1, len(targets) - cut)
+    branch = {'True': targets[cut:cut + true_count]}
+    if targets[cut + true_count:]:
+        branch['False'] = targets[cut + true_count:]
+    return targets[:cut] + [branch]
+
+def check(workflow):
+    """Returns the DagReport of validate_dag for a workflow."""
+    from workflow_graph import build_adjacency_graph, validate_dag
+
+    adj_graph, _ = build_adjacency_graph(workflow)
+    return validate_dag(workflow['ActionList'], adj_graph)
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Generate a synthetic FaaSr workflow')
+    parser.add_argument('--actions', type=int, default=100,
+                      help='Actions reachable from action0')
+    parser.add_argument('--depth', type=int,
+                      help='Actions on the longest path (default: 2 more than the minimum)')
+    parser.add_argument('--fan-out', type=int, default=3,
+                      help='Most actions one action invokes')
+    parser.add_argument('--ranked', type=float, default=0.0,
+                      help='Share of actions invoked with a rank, e.g. "action7(3)"')
+    parser.add_argument('--max-rank', type=int, default=4,
+                      help='Highest rank of a ranked action')
+    parser.add_argument('--conditional', type=float, default=0.0,
+                      help='Share of actions with a {"True": [...], "False": [...]} branch')
+    parser.add_argument('--joins', type=float, default=0.0,
+                      help='Extra predecessors per action on average')
+    parser.add_argument('--platforms', default=','.join(PLATFORMS),
+                      help='Comma-separated FaaSTypes to spread the actions over')
+    parser.add_argument('--cycles', type=int, default=0,
+                      help='Back edges to add (makes the workflow invalid)')
+    parser.add_argument('--unreachable', type=int, default=0,
+                      help='Actions to add in a loop nobody invokes (makes the workflow invalid)')
+    parser.add_argument('--argument-bytes', type=int, default=64,
+                      help='Size of the filler argument of every action')
+    parser.add_argument('--seed', type=int,
+                      help='Random seed (default: a random one, recorded in the output)')
+    parser.add_argument('--name', default='synthetic',
+                      help='WorkflowName')
+    parser.add_argument('--output',
+                      help='Write the workflow to this file instead of stdout')
+    parser.add_argument('--check', action='store_true',
+                      help='Validate the workflow as check_dag does and print the findings')
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    try:
+        workflow = generate_workflow(
+            actions=args.actions, depth=args.depth, fan_out=args.fan_out, ranked=args.ranked,
+            max_rank=args.max_rank, conditional=args.conditional, joins=args.joins,
+            platforms=[platform for platform in args.platforms.split(',') if platform],
+            cycles=args.cycles, unreachable=args.unreachable, argument_bytes=args.argument_bytes,
+            seed=seed, name=args.name)
+    except ValueError as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(workflow, f, indent=2)
+    else:
+        json.dump(workflow, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+    info = workflow['SyntheticWorkflow']
+    print(f"Generated {len(workflow['ActionList'])} actions, {info['Edges']} edges, "
+          f"depth {info['Options']['depth']}, seed {seed}", file=sys.stderr)
+    if args.check:
+        report = check(workflow)
+        print(f"check: {len(report.roots)} root(s), {len(report.cycles)} cycle(s), "
+              f"{len(report.unreachable)} unreachable, {len(report.undefined)} undefined", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
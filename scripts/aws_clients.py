@@ -0,0 +1,109 @@
+"""
+Process-wide cache of boto3 clients for the FaaSr scripts
+
+Creating a boto3 client resolves endpoints and loads the botocore service model,
+which costs tens to hundreds of milliseconds. For a fire-and-forget Lambda
+'Event' invoke that setup dominates the call, so clients are built once per
+(service, region, credentials, endpoint) and reused by every later call in the
+process. All clients come from one botocore session, so each service model is
+loaded from disk only once.
+
+Client pool size can be tuned with FAASR_AWS_MAX_POOL_CONNECTIONS (default 32).
+
+boto3 is imported with the first session, so importing this module is cheap
+for scripts whose workflow never reaches AWS.
+"""
+
+import os
+import threading
+
+MAX_POOL_CONNECTIONS = int(os.getenv('FAASR_AWS_MAX_POOL_CONNECTIONS', '32'))
+
+_botocore_session = None
+_session = None
+_clients = {}
+# boto3 clients are thread-safe, but creating them from a shared session is not
+_lock = threading.Lock()
+
+def _get_session():
+    global _botocore_session, _session
+    if _session is None:
+        import boto3
+        import botocore.session
+        _botocore_session = botocore.session.get_session()
+        _session = boto3.session.Session(botocore_session=_botocore_session)
+    return _session
+
+def preload(service_name):
+    """Loads the botocore model of a service ahead of the first client creation."""
+    with _lock:
+        _get_session()
+        _botocore_session.get_service_model(service_name)
+
+def register_event_handler(event_name, handler):
+    """
+    Registers a botocore event handler (e.g. 'before-call.lambda') for the
+    clients created from now on, e.g. to instrument them in a benchmark
+    """
+    with _lock:
+        _get_session()
+        _botocore_session.register(event_name, handler)
+
+def get_client(service_name, region_name, access_key=None, secret_key=None,
+               endpoint_url=None, max_pool_connections=MAX_POOL_CONNECTIONS):
+    """
+    Returns a cached boto3 client, creating it on first use
+
+    Arguments:
+        service_name: AWS service, e.g. 'lambda' or 's3'
+        region_name: AWS region
+        access_key: access key id, None for the default credential chain
+        secret_key: secret access key
+        endpoint_url: custom endpoint (e.g. a MinIO server), None for AWS
+        max_pool_connections: size of the client's HTTP connection pool
+    """
+    key = (service_name, region_name, access_key, secret_key, endpoint_url, max_pool_connections)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                from botocore.config import Config
+                client = _get_session().client(
+                    service_name,
+                    region_name=region_name,
+                    aws_access_key_id=access_key,
+                    aws_secret_access_key=secret_key,
+                    endpoint_url=endpoint_url,
+                    config=Config(max_pool_connections=max_pool_connections)
+                )
+                _clients[key] = client
+    return client
+
+def get_lambda_client(region_name, access_key=None, secret_key=None,
+                      max_pool_connections=MAX_POOL_CONNECTIONS):
+    """Returns the cached Lambda client for a region and set of credentials."""
+    return get_client('lambda', region_name, access_key, secret_key,
+                      max_pool_connections=max_pool_connections)
+
+def get_datastore_client(workflow_data, store_name=None):
+    """
+    Returns an S3 client and bucket name for a DataStore of the workflow
+    (DefaultDataStore unless store_name is given), using the MinIO credentials
+    from the environment
+
+    Returns:
+        (botocore client, str) -- S3 client and bucket
+    """
+    store_name = store_name or workflow_data.get('DefaultDataStore')
+    store_config = workflow_data.get('DataStores', {}).get(store_name)
+    if not store_config:
+        raise ValueError(f"DataStore '{store_name}' not found in workflow data")
+    s3_client = get_client(
+        's3',
+        store_config.get('Region', 'us-east-1'),
+        os.getenv('MINIO_ACCESS_KEY'),
+        os.getenv('MINIO_SECRET_KEY'),
+        endpoint_url=store_config.get('Endpoint') or None
+    )
+    return s3_client, store_config['Bucket']
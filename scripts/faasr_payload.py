@@ -0,0 +1,305 @@
+"""
+Payload helpers shared by the FaaSr invoke paths
+
+slice_workflow() cuts a workflow down to what one dispatch needs: the invoked
+action, the actions reachable from it, and only the ComputeServers, DataStores
+and per-function tables those actions reference. The full document stays
+available by reference (the registered SECRET_PAYLOAD / PAYLOAD_URL workflow
+file), identified by the PayloadSlice marker added to every slice.
+
+prepare_transport_body() offloads a payload that does not fit its transport
+(GitHub OVERWRITTEN input, Lambda Event payload, OpenWhisk body) to the
+workflow's DefaultDataStore and returns a small pointer instead:
+
+    {"ComputeServers": {...}, "DataStores": {...}, "FunctionInvoke": "...",
+     "InvocationID": "...", "ActionArguments": {"action": {...}},
+     "FaaSrPayloadRef": {"Version": 1, "DataStore": "...", "Bucket": "...",
+                         "Key": "FaaSrPayloads/<sha256>.json", "SHA256": "...",
+                         "Size": 1234}}
+
+The receiving side loads the object, overlays the pointer's top-level fields on
+top of it and merges ActionArguments (the per-invocation Arguments overrides,
+present only if there are any) over the Arguments of those actions.
+Credentials (ComputeServers, DataStores) and per-invocation fields never leave
+the pointer, so the stored object holds no secrets and is identical for every
+invocation of the same workflow version; it is uploaded only once.
+
+encode_payload() is the opt-in compressed transport: compact JSON, compressed
+with gzip (or zstd when the zstandard package is installed), base64 encoded and
+wrapped with a version marker that decode_payload() (and faasr_entry.py) detect:
+
+    {"FaaSrEncoding": {"Version": 1, "Codec": "gzip"}, "Data": "H4sI..."}
+
+PayloadTemplate serializes a payload once and renders it per invocation by
+splicing in the few fields that change (FunctionInvoke, InvocationID and the
+invoked action's Arguments), so high-rate dispatch does not re-serialize the
+whole workflow every time.
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import threading
+
+import aws_clients
+
+# Transport size limits in bytes; 'auto' offloads payloads above these
+TRANSPORT_LIMITS = {
+    'githubactions': 65535,    # workflow_dispatch input value
+    'lambda': 262144,          # asynchronous (Event) invocation payload
+    'openwhisk': 1048576,      # default action payload limit
+}
+
+OFFLOAD_MODES = ('auto', 'always', 'never')
+
+# DataStore folder holding offloaded payloads
+OFFLOAD_PREFIX = 'FaaSrPayloads'
+
+# Fields kept inline in the pointer instead of the stored object
+INLINE_FIELDS = ('ComputeServers', 'DataStores', 'FunctionInvoke', 'InvocationID')
+
+ENCODINGS = ('none', 'gzip', 'zstd')
+
+ENCODING_VERSION = 1
+
+_uploaded = set()
+_uploaded_lock = threading.Lock()
+
+def _dumps(value):
+    return json.dumps(value, separators=(',', ':'))
+
+class PayloadTemplate:
+    """
+    A payload dict pre-serialized to compact JSON fragments: one per top-level
+    field and one per ActionList entry. Rendering joins the cached fragments and
+    serializes only the fields and actions that are overridden.
+    """
+
+    __slots__ = ('_fields', '_actions', '_action_index', '_action_fragments', '_action_list')
+
+    def __init__(self, payload):
+        self._fields = {key: f"{_dumps(key)}:{_dumps(value)}"
+                        for key, value in payload.items() if key != 'ActionList'}
+        self._actions = payload.get('ActionList')
+        if self._actions is None:
+            self._action_index = {}
+            self._action_fragments = []
+            self._action_list = None
+            return
+        self._action_index = {name: i for i, name in enumerate(self._actions)}
+        self._action_fragments = [f"{_dumps(name)}:{_dumps(action)}" for name, action in self._actions.items()]
+        self._action_list = '{' + ','.join(self._action_fragments) + '}'
+
+    def render(self, fields=None, arguments=None):
+        """
+        Returns the payload as a compact JSON string
+
+        Arguments:
+            fields: top-level fields to add or replace, e.g. FunctionInvoke
+            arguments: {action_name: {...}} merged over those actions' Arguments
+        """
+        fields = fields or {}
+        parts = [f"{_dumps(key)}:{_dumps(value)}" for key, value in fields.items()]
+        parts.extend(fragment for key, fragment in self._fields.items() if key not in fields)
+        if self._action_list is not None and 'ActionList' not in fields:
+            action_list = self._action_list
+            if arguments:
+                fragments = list(self._action_fragments)
+                for name, action_arguments in arguments.items():
+                    action = dict(self._actions[name])
+                    action['Arguments'] = {**(action.get('Arguments') or {}), **action_arguments}
+                    fragments[self._action_index[name]] = f"{_dumps(name)}:{_dumps(action)}"
+                action_list = '{' + ','.join(fragments) + '}'
+            parts.append(f'"ActionList":{action_list}')
+        return '{' + ','.join(parts) + '}'
+
+# Top-level tables keyed by action name
+ACTION_KEYED_FIELDS = ('ActionContainers', 'PredecessorIndex')
+
+# Top-level tables keyed by FunctionName
+FUNCTION_KEYED_FIELDS = ('FunctionGitRepo', 'FunctionCRANPackage', 'FunctionGitHubPackage',
+                         'PyPIPackageDownloads')
+
+def _referenced_datastores(workflow_data, actions):
+    names = {workflow_data.get('DefaultDataStore'), workflow_data.get('LoggingDataStore')}
+    data_stores = workflow_data.get('DataStores', {})
+    for action in actions.values():
+        for value in (action.get('Arguments') or {}).values():
+            if isinstance(value, str) and value in data_stores:
+                names.add(value)
+    return {name: data_stores[name] for name in data_stores if name in names}
+
+def slice_workflow(workflow_data, graph, action_name):
+    """
+    Returns a copy of workflow_data reduced to what invoking action_name needs
+
+    Arguments:
+        workflow_data: workflow dict
+        graph: WorkflowGraph compiled from workflow_data
+        action_name: action being invoked
+    Returns:
+        dict -- sliced workflow with a PayloadSlice marker
+    """
+    reachable = graph.reachable(action_name)
+    actions = {name: workflow_data['ActionList'][name] for name in reachable}
+    function_names = {action.get('FunctionName') for action in actions.values()}
+    servers = {action.get('FaaSServer') for action in actions.values()}
+
+    sliced = {}
+    for key, value in workflow_data.items():
+        if key == 'ActionList':
+            sliced[key] = actions
+        elif key == 'ComputeServers':
+            sliced[key] = {name: config for name, config in value.items() if name in servers}
+        elif key == 'DataStores':
+            sliced[key] = _referenced_datastores(workflow_data, actions)
+        elif key in ACTION_KEYED_FIELDS and isinstance(value, dict):
+            sliced[key] = {name: entry for name, entry in value.items() if name in actions}
+        elif key in FUNCTION_KEYED_FIELDS and isinstance(value, dict):
+            sliced[key] = {name: entry for name, entry in value.items() if name in function_names}
+        else:
+            sliced[key] = value
+
+    sliced['FunctionInvoke'] = action_name
+    sliced['PayloadSlice'] = {
+        'Action': action_name,
+        'Actions': len(actions),
+        'TotalActions': len(graph),
+        'WorkflowHash': graph.workflow_hash,
+    }
+    return sliced
+
+def offload_payload(payload, workflow_data, arguments=None):
+    """
+    Stores payload (minus INLINE_FIELDS and per-invocation Arguments) in the
+    DefaultDataStore under its sha256 and returns the pointer that replaces it.
+    Objects already uploaded by this process, or already present in the bucket,
+    are not uploaded again.
+
+    Arguments:
+        payload: payload dict that would have been sent
+        workflow_data: workflow dict, used to locate the DefaultDataStore and
+                       the Arguments the overridden actions are registered with
+        arguments: {action_name: {...}} merged over those actions' Arguments in
+                   payload; they go to the pointer's ActionArguments
+    Returns:
+        dict -- pointer payload
+    """
+    from botocore.exceptions import ClientError
+    
+    body = {key: value for key, value in payload.items() if key not in INLINE_FIELDS}
+    if arguments and 'ActionList' in body:
+        # Put back the registered Arguments so the object does not vary per invocation
+        actions = dict(body['ActionList'])
+        for name in arguments:
+            action = dict(actions[name])
+            registered = workflow_data['ActionList'][name]
+            if 'Arguments' in registered:
+                action['Arguments'] = registered['Arguments']
+            else:
+                action.pop('Arguments', None)
+            actions[name] = action
+        body['ActionList'] = actions
+    encoded = json.dumps(body, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    digest = hashlib.sha256(encoded).hexdigest()
+    key = f"{OFFLOAD_PREFIX}/{digest}.json"
+
+    store_name = workflow_data.get('DefaultDataStore')
+    s3_client, bucket = aws_clients.get_datastore_client(workflow_data, store_name)
+    cache_key = (store_name, bucket, key)
+    with _uploaded_lock:
+        uploaded = cache_key in _uploaded
+    if not uploaded:
+        try:
+            s3_client.head_object(Bucket=bucket, Key=key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey', 'NotFound'):
+                raise
+            s3_client.put_object(Bucket=bucket, Key=key, Body=encoded, ContentType='application/json')
+        with _uploaded_lock:
+            _uploaded.add(cache_key)
+
+    pointer = {field: payload[field] for field in INLINE_FIELDS if field in payload}
+    if arguments:
+        pointer['ActionArguments'] = arguments
+    pointer['FaaSrPayloadRef'] = {
+        'Version': 1,
+        'DataStore': store_name,
+        'Bucket': bucket,
+        'Key': key,
+        'SHA256': digest,
+        'Size': len(encoded),
+    }
+    return pointer
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("zstd payload encoding requires the zstandard package (pip install zstandard)")
+    return zstandard
+
+def encode_payload(payload, codec='gzip'):
+    """
+    Returns payload as a compressed, base64-encoded envelope
+
+    Arguments:
+        payload: payload dict
+        codec: 'gzip' or 'zstd'
+    """
+    return _encode(_dumps(payload).encode('utf-8'), codec)
+
+def _encode(raw, codec):
+    if codec == 'gzip':
+        compressed = gzip.compress(raw, compresslevel=6, mtime=0)
+    elif codec == 'zstd':
+        compressed = _zstandard().ZstdCompressor(level=10).compress(raw)
+    else:
+        raise ValueError(f"Unknown payload encoding: {codec}")
+    return {
+        'FaaSrEncoding': {'Version': ENCODING_VERSION, 'Codec': codec},
+        'Data': base64.b64encode(compressed).decode('ascii'),
+    }
+
+def decode_payload(payload):
+    """Returns the payload inside an encode_payload() envelope; other payloads are returned unchanged."""
+    if not isinstance(payload, dict) or 'FaaSrEncoding' not in payload:
+        return payload
+    encoding = payload['FaaSrEncoding']
+    if encoding.get('Version') != ENCODING_VERSION:
+        raise ValueError(f"Unsupported payload encoding version: {encoding.get('Version')}")
+    compressed = base64.b64decode(payload['Data'])
+    if encoding.get('Codec') == 'gzip':
+        raw = gzip.decompress(compressed)
+    elif encoding.get('Codec') == 'zstd':
+        raw = _zstandard().ZstdDecompressor().decompress(compressed)
+    else:
+        raise ValueError(f"Unknown payload encoding: {encoding.get('Codec')}")
+    return json.loads(raw)
+
+def prepare_transport_body(body, workflow_data, platform, mode='auto', encoding='none', arguments=None):
+    """
+    Returns the JSON body to send over a platform's transport: body itself
+    (encoded if encoding is not 'none'), or a DataStore pointer if mode is
+    'always', or 'auto' and the (encoded) body exceeds TRANSPORT_LIMITS[platform]
+
+    Arguments:
+        body: payload as a compact JSON string (e.g. PayloadTemplate.render())
+        workflow_data: workflow dict
+        platform: 'githubactions', 'lambda' or 'openwhisk'
+        mode: one of OFFLOAD_MODES
+        encoding: one of ENCODINGS
+        arguments: the per-invocation Arguments overrides body was rendered with,
+                   as passed to PayloadTemplate.render()
+    Returns:
+        (str, dict) -- body to send and its FaaSrPayloadRef, None unless offloaded
+    """
+    if mode != 'always':
+        sent = body if encoding == 'none' else _dumps(_encode(body.encode('utf-8'), encoding))
+        # json.dumps escapes non-ASCII characters, so the length is the size in bytes
+        if mode == 'never' or len(sent) <= TRANSPORT_LIMITS[platform]:
+            return sent, None
+    # The stored object is always built from the plain payload so credentials stay inline
+    pointer = offload_payload(json.loads(body), workflow_data, arguments)
+    return _dumps(pointer), pointer['FaaSrPayloadRef']
@@ -0,0 +1,348 @@
+"""
+Rate-limit-aware access to the GitHub REST API for the FaaSr scripts
+
+Requests go through http_pool's pooled sessions. The X-RateLimit-Remaining and
+X-RateLimit-Reset headers of every response update a per-token budget: while
+plenty remains, requests go out immediately; below FAASR_GITHUB_RESERVE
+(default 100) they are spaced so the rest of the budget lasts until the reset;
+at zero they wait for the reset.
+
+Secondary rate limits (403/429 with Retry-After, an exhausted budget, or a
+"secondary rate limit" message) are waited out and the request is sent again.
+GitHub rejects those requests without processing them, so even a
+workflow_dispatch POST is safe to resend. Waits longer than
+FAASR_GITHUB_MAX_WAIT seconds (default 900), or past a request's deadline
+argument, are not attempted; the limited response is returned to the caller
+instead.
+
+GET requests are conditional: the ETag of each response is cached and sent
+back as If-None-Match, and a 304 (which GitHub does not count against the
+rate limit) is answered from the cache. Set FAASR_GITHUB_CACHE to a file path
+to keep the cache between runs.
+
+workflow_dispatch POSTs are content-creating requests, which GitHub limits to
+80 per minute and 500 per hour. dispatch() queues them and sends them at a
+steady FAASR_GITHUB_DISPATCH_PER_MINUTE (default 60) after an initial burst of
+FAASR_GITHUB_DISPATCH_BURST (default 10), never exceeding those limits, so
+bursts of bulk invocations do not trip the secondary limit. Setting
+FAASR_GITHUB_DISPATCH_PER_MINUTE to 0 turns pacing off (e.g. for a local
+stand-in of the API).
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+import http_pool
+
+API_VERSION = '2022-11-28'
+
+# GitHub asks clients to wait at least a minute after a secondary rate limit
+# that comes without a Retry-After header
+SECONDARY_LIMIT_WAIT = 60
+
+# GitHub's documented limits on content-creating requests such as
+# workflow_dispatch: (seconds, requests allowed in any window that long)
+DISPATCH_WINDOWS = ((60, 80), (3600, 500))
+
+# Seconds added to every dispatch window: GitHub counts arrival times, and a
+# request scheduled early in a window can arrive later than the ones after it
+DISPATCH_WINDOW_MARGIN = 1.0
+
+# Entries kept in the ETag cache
+CACHE_SIZE = 512
+
+CACHE_PATH = os.getenv('FAASR_GITHUB_CACHE')
+
+_settings = {
+    'dispatch_per_minute': float(os.getenv('FAASR_GITHUB_DISPATCH_PER_MINUTE', '60')),
+    'dispatch_burst': int(os.getenv('FAASR_GITHUB_DISPATCH_BURST', '10')),
+    'dispatch_windows': DISPATCH_WINDOWS,
+    'reserve': int(os.getenv('FAASR_GITHUB_RESERVE', '100')),
+    'max_wait': float(os.getenv('FAASR_GITHUB_MAX_WAIT', '900')),
+    'retries': 5,
+}
+_budgets = {}
+_schedulers = {}
+_counters = {'requests': 0, 'not_modified': 0, 'rate_limited': 0, 'throttled_seconds': 0.0}
+_lock = threading.Lock()
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_state = {'loaded': False, 'dirty': False}
+
+class RateLimitBudget:
+    """Primary and secondary rate-limit state of one token."""
+
+    def __init__(self):
+        self.remaining = None
+        self.reset = None
+        self.blocked_until = 0.0
+        self.next_at = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self, reserve):
+        """Takes one request from the budget and returns the seconds to wait before sending it."""
+        with self.lock:
+            now = time.time()
+            start = max(now, self.blocked_until, self.next_at)
+            if self.remaining is not None and self.reset is not None and self.reset > start:
+                if self.remaining <= 0:
+                    # Everyone waits for the next window, which starts with a full budget
+                    self.blocked_until = start = self.reset + 1
+                    self.remaining = None
+                    return start - now
+                if self.remaining < reserve:
+                    self.next_at = start + (self.reset - start) / self.remaining
+                self.remaining -= 1
+            return start - now
+
+    def update(self, response):
+        """Reads the rate-limit headers of a response."""
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return
+        try:
+            remaining, reset = int(remaining), int(reset)
+        except ValueError:
+            return
+        with self.lock:
+            if reset != self.reset or self.remaining is None:
+                self.reset, self.remaining = reset, remaining
+            else:
+                # Responses of concurrent requests can arrive out of order
+                self.remaining = min(self.remaining, remaining)
+
+    def block(self, until):
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, until)
+
+class DispatchScheduler:
+    """
+    Assigns each dispatch a send time: spaced per_minute apart after an initial
+    burst (GCRA), and never more than limit sends in any window of seconds for
+    each (seconds, limit) in windows. Send times are handed out in call order,
+    so waiting dispatches form a queue.
+    """
+
+    def __init__(self, per_minute, burst, windows):
+        self.interval = 60 / per_minute
+        self.tolerance = self.interval * (max(1, burst) - 1)
+        self.arrival = 0.0
+        self.windows = [(seconds, deque(maxlen=limit)) for seconds, limit in windows]
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Takes the next send slot and returns the seconds to wait for it."""
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.arrival - self.tolerance)
+            for seconds, sent in self.windows:
+                if len(sent) == sent.maxlen:
+                    start = max(start, sent[0] + seconds + DISPATCH_WINDOW_MARGIN)
+            for _, sent in self.windows:
+                sent.append(start)
+            self.arrival = max(self.arrival, start) + self.interval
+            return start - now
+
+def configure(dispatch_per_minute=None, dispatch_burst=None, dispatch_windows=None,
+              reserve=None, max_wait=None, retries=None):
+    """Changes throttling settings; rate-limit state and dispatch schedules start over."""
+    with _lock:
+        for name, value in (('dispatch_per_minute', dispatch_per_minute), ('dispatch_burst', dispatch_burst),
+                            ('dispatch_windows', dispatch_windows), ('reserve', reserve),
+                            ('max_wait', max_wait), ('retries', retries)):
+            if value is not None:
+                _settings[name] = value
+        _budgets.clear()
+        _schedulers.clear()
+
+def stats():
+    """Returns request, 304, rate-limit and throttling counters of this process."""
+    with _lock:
+        return dict(_counters)
+
+def _count(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+
+def _token_key(token):
+    # Rate-limit state and cache entries are keyed by a digest so the cache file holds no tokens
+    return hashlib.sha256((token or '').encode('utf-8')).hexdigest()[:16]
+
+def _get_budget(token_key):
+    with _lock:
+        budget = _budgets.get(token_key)
+        if budget is None:
+            budget = _budgets[token_key] = RateLimitBudget()
+        return budget
+
+def _get_scheduler(token_key):
+    if _settings['dispatch_per_minute'] <= 0:
+        return None
+    with _lock:
+        scheduler = _schedulers.get(token_key)
+        if scheduler is None:
+            scheduler = _schedulers[token_key] = DispatchScheduler(
+                _settings['dispatch_per_minute'], _settings['dispatch_burst'], _settings['dispatch_windows'])
+        return scheduler
+
+def _sleep(seconds):
+    if seconds > 0:
+        _count('throttled_seconds', seconds)
+        time.sleep(seconds)
+
+def _load_cache():
+    _cache_state['loaded'] = True
+    if not CACHE_PATH:
+        return
+    atexit.register(save_cache)
+    try:
+        with open(CACHE_PATH, 'r') as f:
+            _cache.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+
+def save_cache():
+    """Writes the ETag cache to FAASR_GITHUB_CACHE if it is set and changed."""
+    with _cache_lock:
+        if not CACHE_PATH or not _cache_state['dirty']:
+            return
+        with open(CACHE_PATH, 'w') as f:
+            json.dump(_cache, f)
+        _cache_state['dirty'] = False
+
+def _cache_get(key):
+    with _cache_lock:
+        if not _cache_state['loaded']:
+            _load_cache()
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+        return entry
+
+def _cache_put(key, response):
+    entry = {
+        'ETag': response.headers['ETag'],
+        'Status': response.status_code,
+        'Headers': {'Content-Type': response.headers.get('Content-Type', 'application/json')},
+        'Body': response.text,
+    }
+    with _cache_lock:
+        _cache[key] = entry
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+        _cache_state['dirty'] = True
+
+def _cached_response(url, entry):
+    import requests
+
+    response = requests.Response()
+    response.status_code = entry['Status']
+    response.headers.update(entry['Headers'])
+    response._content = entry['Body'].encode('utf-8')
+    response.encoding = 'utf-8'
+    response.url = url
+    return response
+
+def rate_limit_wait(response, attempt):
+    """
+    Returns the seconds to wait before resending a request that hit a rate limit,
+    or None if the response is not a rate-limit rejection
+    """
+    if response.status_code not in (403, 429):
+        return None
+    retry_after = response.headers.get('Retry-After')
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+    reset = response.headers.get('X-RateLimit-Reset')
+    if response.headers.get('X-RateLimit-Remaining') == '0' and reset and reset.isdigit():
+        return max(0.0, int(reset) - time.time()) + 1
+    if response.status_code == 429 or 'rate limit' in response.text.lower():
+        return SECONDARY_LIMIT_WAIT * 2 ** (attempt - 1)
+    return None
+
+def request(method, url, token, deadline=None, **kwargs):
+    """
+    Sends a GitHub API request authenticated with token, pacing it to the token's
+    rate-limit budget and resending it after a rate-limit rejection
+
+    Arguments:
+        method: HTTP method
+        url: full API URL
+        token: GitHub token
+        deadline: seconds from now after which rate limits are no longer waited
+            out (e.g. the time left of a resilience.call)
+        kwargs: passed to requests (json, params, headers, ...)
+    Returns:
+        requests.Response -- for a GET answered 304, the cached response
+    """
+    return _request(method, url, token, None, deadline, kwargs)
+
+def get(url, token, deadline=None, **kwargs):
+    return request('GET', url, token, deadline, **kwargs)
+
+def dispatch(url, token, deadline=None, **kwargs):
+    """
+    POSTs a content-creating request (e.g. workflow_dispatch) at the smoothed
+    dispatch rate; a resend after a rate-limit rejection waits for a new slot
+    """
+    return _request('POST', url, token, _get_scheduler(_token_key(token)), deadline, kwargs)
+
+def _request(method, url, token, scheduler, deadline, kwargs):
+    ends_at = None if deadline is None else time.monotonic() + deadline
+    token_key = _token_key(token)
+    budget = _get_budget(token_key)
+    headers = {
+        'Authorization': f"Bearer {token}",
+        'Accept': 'application/vnd.github+json',
+        'X-GitHub-Api-Version': API_VERSION,
+    }
+    headers.update(kwargs.pop('headers', None) or {})
+
+    cache_key = entry = None
+    if method == 'GET':
+        cache_key = json.dumps([token_key, url, sorted((kwargs.get('params') or {}).items())])
+        entry = _cache_get(cache_key)
+        if entry is not None:
+            headers['If-None-Match'] = entry['ETag']
+
+    attempt = 1
+    while True:
+        held_since = time.monotonic()
+        if scheduler is not None:
+            _sleep(scheduler.reserve())
+        _sleep(budget.reserve(_settings['reserve']))
+        if ends_at is not None and attempt == 1:
+            # Pacing before the first send is queueing, not part of the deadline;
+            # waits after a rejection are
+            ends_at += time.monotonic() - held_since
+        response = http_pool.request(method, url, headers=headers, **kwargs)
+        _count('requests')
+        budget.update(response)
+        wait = rate_limit_wait(response, attempt)
+        if wait is None:
+            break
+        _count('rate_limited')
+        if (attempt > _settings['retries'] or wait > _settings['max_wait'] or
+                (ends_at is not None and time.monotonic() + wait > ends_at)):
+            return response
+        print(f"GitHub rate limit hit, retrying in {wait:.0f}s ({attempt}/{_settings['retries']})")
+        budget.block(time.time() + wait)
+        attempt += 1
+
+    if entry is not None and response.status_code == 304:
+        _count('not_modified')
+        return _cached_response(url, entry)
+    if cache_key is not None and response.status_code == 200 and response.headers.get('ETag'):
+        _cache_put(cache_key, response)
+    return response
@@ -0,0 +1,116 @@
+"""
+Shared, pooled HTTP sessions for the FaaSr scripts
+
+A bare requests.post()/requests.patch() opens a new TCP+TLS connection for every
+call. The helpers here keep one requests.Session per host, so calls to the same
+GitHub or OpenWhisk endpoint reuse kept-alive connections, and mount an adapter
+that retries idempotent requests on transient failures.
+
+Pool sizes, retries and timeouts can be tuned with configure() or the environment:
+    FAASR_HTTP_POOL_MAXSIZE  connections kept per host (default 10)
+    FAASR_HTTP_RETRIES       retries for idempotent requests (default 3)
+    FAASR_HTTP_TIMEOUT       seconds to wait for a response (default 60); the
+                             connection itself must be made within 10 seconds
+
+requests is imported when the first session is created, so scripts that only
+talk to Lambda never load it.
+"""
+
+import os
+import threading
+from urllib.parse import urlsplit
+
+# Status codes worth retrying: the request was not processed or the server is overloaded.
+# 429 is left to the callers: github_client waits for the reset its rate-limit
+# budget tracks, and resilience.call backs off per endpoint, neither of which
+# would see a 429 that urllib3 had already slept on and resent
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+# POST is left out on purpose: retrying a workflow_dispatch or an OpenWhisk
+# invocation after an ambiguous failure could start the action twice
+RETRY_METHODS = frozenset(['HEAD', 'GET', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'])
+
+_settings = {
+    'pool_maxsize': int(os.getenv('FAASR_HTTP_POOL_MAXSIZE', '10')),
+    'retries': int(os.getenv('FAASR_HTTP_RETRIES', '3')),
+    'backoff_factor': 0.5,
+    'timeout': (10, float(os.getenv('FAASR_HTTP_TIMEOUT', '60'))),
+}
+_sessions = {}
+_lock = threading.Lock()
+
+def configure(pool_maxsize=None, retries=None, backoff_factor=None, timeout=None):
+    """
+    Changes the pool size and retry policy of sessions created from now on;
+    existing sessions are closed so the next call picks up the new settings
+    """
+    with _lock:
+        if timeout is not None:
+            _settings['timeout'] = timeout
+        if pool_maxsize is not None:
+            _settings['pool_maxsize'] = pool_maxsize
+        if retries is not None:
+            _settings['retries'] = retries
+        if backoff_factor is not None:
+            _settings['backoff_factor'] = backoff_factor
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+def _new_session():
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    retry = Retry(
+        total=_settings['retries'],
+        backoff_factor=_settings['backoff_factor'],
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=RETRY_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=_settings['pool_maxsize'],
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def pool_maxsize():
+    """Returns the number of connections kept per host."""
+    return _settings['pool_maxsize']
+
+def get_session(url):
+    """Returns the shared session for the scheme and host of url."""
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.netloc)
+    session = _sessions.get(key)
+    if session is None:
+        with _lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = _new_session()
+                _sessions[key] = session
+    return session
+
+def request(method, url, **kwargs):
+    """Sends a request through the pooled session of the url's host, with the default timeout unless given."""
+    kwargs.setdefault('timeout', _settings['timeout'])
+    return get_session(url).request(method, url, **kwargs)
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+def patch(url, **kwargs):
+    return request('PATCH', url, **kwargs)
+
+def close_all():
+    """Closes every pooled session."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
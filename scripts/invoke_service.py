@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Resident FaaSr invoke service
+
+Keeps parsed workflows, compiled graphs, rendered payload templates, boto3
+clients and pooled HTTP sessions warm in one process and dispatches the
+invocations it receives over HTTP, on a TCP port or a Unix socket:
+
+    POST /invoke         {"workflow_file": "project1.json", "action": "add_operation",
+                          "arguments": {"num1": 1}, "invocation_id": "run-0001"}
+    GET  /admin/stats    loaded workflows, dispatch counts and latency percentiles
+    POST /admin/reload   drops every loaded workflow
+    GET  /healthz
+
+Invocation specs are the ones of invoke_workflow.py --bulk. Workflow files are
+resolved under --workflow-dir and reloaded when they change on disk. If a token
+is configured (--token or FAASR_SERVICE_TOKEN), every request must carry
+"Authorization: Bearer <token>".
+
+Usage:
+    python scripts/invoke_service.py --port 8787 --preload project1.json
+    python scripts/invoke_service.py --unix-socket /tmp/faasr-invoke.sock
+"""
+
+import argparse
+import hmac
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+
+import aws_clients
+import github_client
+import http_pool
+import invoke_workflow
+import resilience
+import tracing
+from faasr_payload import ENCODINGS, OFFLOAD_MODES
+from invoke_workflow import InvocationError, get_platform, percentile, prepare_invocation, trigger_action
+
+logger = logging.getLogger('faasr.invoke_service')
+
+# Dispatch latencies kept per platform for the stats percentiles
+LATENCY_WINDOW = 1000
+
+# Largest accepted request body in bytes
+MAX_REQUEST_BYTES = 1048576
+
+# Seconds between exports of the timing spans when tracing is on
+TRACE_FLUSH_INTERVAL = 10
+
+
+class ServiceError(Exception):
+    """A request that cannot be served, with the HTTP status to answer it with"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class WorkflowRegistry:
+    """
+    Workflows loaded by the service, keyed by real path. A workflow is dropped
+    (with its slices and payload templates) when the modification time or size
+    of its file changes, and loaded again by the next invocation.
+    """
+
+    def __init__(self, workflow_dir, slice_payload=False):
+        self.workflow_dir = os.path.realpath(workflow_dir)
+        self.slice_payload = slice_payload
+        self._workflows = {}
+        self._stamps = {}
+        self._info = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, workflow_file):
+        """Returns the real path of a workflow file, which must be inside workflow_dir."""
+        path = os.path.realpath(os.path.join(self.workflow_dir, workflow_file))
+        if os.path.commonpath([path, self.workflow_dir]) != self.workflow_dir:
+            raise ServiceError(403, f"Workflow file {workflow_file} is outside {self.workflow_dir}")
+        return path
+
+    def prepare(self, spec):
+        """
+        Resolves an invocation spec against the loaded workflows
+
+        Returns:
+            (dict, str, dict) -- workflow data, action and invocation fields
+        """
+        if not isinstance(spec, dict) or not spec.get('workflow_file'):
+            raise ServiceError(400, "Invocation spec must be a JSON object with a workflow_file")
+        path = self.resolve(spec['workflow_file'])
+        with self._lock:
+            self._refresh(path)
+            loaded = path in self._workflows
+            try:
+                prepared = prepare_invocation(dict(spec, workflow_file=path), self._workflows, self.slice_payload)
+            except InvocationError as e:
+                raise ServiceError(404 if not os.path.exists(path) else 400, str(e)) from e
+            if not loaded:
+                info = self._info.setdefault(path, {'Loads': 0})
+                info['Loads'] += 1
+                info['LoadedAt'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+                info['Actions'] = len(self._workflows[path][1])
+        return prepared
+
+    def _refresh(self, path):
+        try:
+            stat = os.stat(path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+        if self._stamps.get(path) != stamp:
+            if path in self._workflows:
+                logger.info(f"Workflow file {path} changed, reloading")
+            self._evict(path)
+            self._stamps[path] = stamp
+
+    def _evict(self, path):
+        for key in [key for key in self._workflows if key == path or (isinstance(key, tuple) and key[0] == path)]:
+            entry = self._workflows.pop(key)
+            invoke_workflow.discard_payload_templates(entry[0] if isinstance(entry, tuple) else entry)
+
+    def reload(self):
+        """Drops every loaded workflow; they are loaded again on their next invocation."""
+        with self._lock:
+            for path in list(self._stamps):
+                self._evict(path)
+            self._stamps.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                os.path.relpath(path, self.workflow_dir): dict(info, Loaded=path in self._workflows)
+                for path, info in self._info.items()
+            }
+
+
+class DispatchStats:
+    """Per-platform dispatch counters and a window of recent latencies"""
+
+    def __init__(self):
+        self.started = time.time()
+        self._counts = {}
+        self._latencies = {}
+        self._lock = threading.Lock()
+
+    def record(self, platform, latency, error=None):
+        with self._lock:
+            counts = self._counts.setdefault(platform, {'Dispatched': 0, 'Failed': 0})
+            counts['Dispatched'] += 1
+            if error:
+                counts['Failed'] += 1
+            self._latencies.setdefault(platform, deque(maxlen=LATENCY_WINDOW)).append(latency)
+
+    def snapshot(self):
+        with self._lock:
+            platforms = {}
+            for platform, counts in self._counts.items():
+                values = sorted(self._latencies[platform])
+                platforms[platform] = dict(counts, **{
+                    f"P{pct}Ms": round(percentile(values, pct) * 1000, 2) for pct in (50, 95, 99)
+                })
+        return {'UptimeSeconds': round(time.time() - self.started, 1), 'Platforms': platforms}
+
+
+class InvokeService:
+    """State shared by the request handlers"""
+
+    def __init__(self, registry, token=None):
+        self.registry = registry
+        self.stats = DispatchStats()
+        self.token = token
+
+    def invoke(self, spec):
+        workflow_data, action_name, invocation = self.registry.prepare(spec)
+        try:
+            platform = get_platform(workflow_data, action_name)
+        except (InvocationError, KeyError) as e:
+            raise ServiceError(400, f"Cannot resolve the platform of {action_name}: {str(e)}") from e
+
+        start = time.perf_counter()
+        try:
+            trigger_action(workflow_data, action_name, invocation)
+            error = None
+        except InvocationError as e:
+            error = str(e)
+        latency = time.perf_counter() - start
+        self.stats.record(platform, latency, error)
+        if error:
+            raise ServiceError(502, error)
+        return {
+            'Action': action_name,
+            'Platform': platform,
+            'InvocationID': invocation.get('InvocationID'),
+            'LatencyMs': round(latency * 1000, 2),
+        }
+
+    def warm(self, workflow_file):
+        """Loads a workflow and prepares the payload template and client of its entry action."""
+        workflow_data, action_name, _ = self.registry.prepare({'workflow_file': workflow_file})
+        platform = get_platform(workflow_data, action_name)
+        server_config = workflow_data['ComputeServers'][workflow_data['ActionList'][action_name]['FaaSServer']]
+        invoke_workflow.get_payload_template(workflow_data, platform, server_config.get('UseSecretStore'))
+        if platform == 'lambda':
+            aws_clients.preload('lambda')
+        elif platform == 'githubactions':
+            http_pool.get_session(invoke_workflow.GITHUB_API_URL)
+        logger.info(f"Preloaded {workflow_file} ({len(workflow_data['ActionList'])} actions, entry {action_name} on {platform})")
+
+    def stats_report(self):
+        report = self.stats.snapshot()
+        report['Workflows'] = self.registry.stats()
+        report['PayloadTemplates'] = invoke_workflow.payload_template_count()
+        report['GitHubAPI'] = github_client.stats()
+        report['Endpoints'] = resilience.stats()
+        return report
+
+
+class InvokeRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FaaSrInvokeService'
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def _handle(self, method):
+        service = self.server.service
+        try:
+            # Consume the body first so an early error leaves the connection usable
+            body = self._read_body()
+            if service.token and not hmac.compare_digest(self.headers.get('Authorization', ''),
+                                                         f"Bearer {service.token}"):
+                raise ServiceError(401, "Missing or invalid bearer token")
+            route = (method, self.path.split('?', 1)[0])
+            if route == ('POST', '/invoke'):
+                self._send_json(202, service.invoke(self._parse_json(body)))
+            elif route == ('GET', '/admin/stats'):
+                self._send_json(200, service.stats_report())
+            elif route == ('POST', '/admin/reload'):
+                service.registry.reload()
+                self._send_json(200, {'Reloaded': True})
+            elif route == ('GET', '/healthz'):
+                self._send_json(200, {'Status': 'ok'})
+            else:
+                raise ServiceError(404, f"No route for {method} {route[1]}")
+        except ServiceError as e:
+            self._send_json(e.status, {'Error': str(e)})
+        except Exception as e:
+            logger.exception(f"Unexpected error serving {method} {self.path}")
+            self._send_json(500, {'Error': str(e)})
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_REQUEST_BYTES:
+            self.close_connection = True
+            raise ServiceError(413, f"Request body exceeds {MAX_REQUEST_BYTES} bytes")
+        return self.rfile.read(length)
+
+    def _parse_json(self, body):
+        try:
+            return json.loads(body or b'null')
+        except json.JSONDecodeError as e:
+            raise ServiceError(400, f"Invalid JSON request body: {str(e)}") from e
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Unix socket peers have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Resident FaaSr invoke service')
+    parser.add_argument('--host', default='127.0.0.1',
+                      help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8787,
+                      help='TCP port to listen on')
+    parser.add_argument('--unix-socket',
+                      help='Listen on this Unix socket instead of a TCP port')
+    parser.add_argument('--workflow-dir', default='.',
+                      help='Directory workflow files are resolved in')
+    parser.add_argument('--preload', nargs='*', default=[],
+                      help='Workflow files to load and warm up at startup')
+    parser.add_argument('--slice-payload', action='store_true',
+                      help='Only send the invoked action, its successors and the servers/stores they use')
+    parser.add_argument('--offload', choices=OFFLOAD_MODES, default=invoke_workflow.PAYLOAD_OFFLOAD,
+                      help='Send a DataStore pointer instead of the payload: when it exceeds the '
+                           'transport limit (auto), always, or never')
+    parser.add_argument('--encoding', choices=ENCODINGS, default=invoke_workflow.PAYLOAD_ENCODING,
+                      help='Send payloads as compact, compressed, base64-encoded envelopes')
+    parser.add_argument('--trace',
+                      help='Append a JSON timing span per phase and remote call to this file')
+    parser.add_argument('--otlp-endpoint',
+                      help=f"Export the timing spans as OTLP/HTTP JSON to this collector every "
+                           f"{TRACE_FLUSH_INTERVAL}s")
+    parser.add_argument('--token', default=os.getenv('FAASR_SERVICE_TOKEN'),
+                      help='Bearer token required on every request (default: FAASR_SERVICE_TOKEN)')
+    parser.add_argument('--verbose', action='store_true',
+                      help='Log requests and show the output of every dispatch')
+    return parser.parse_args()
+
+def create_server(service, host='127.0.0.1', port=8787, unix_socket=None):
+    """Creates the HTTP server of a service on a TCP port or a Unix socket."""
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        server = ThreadingUnixHTTPServer(unix_socket, InvokeRequestHandler)
+        # The service dispatches with its own credentials; only its user may connect
+        os.chmod(unix_socket, 0o600)
+    else:
+        server = ThreadingHTTPServer((host, port), InvokeRequestHandler)
+    server.service = service
+    return server
+
+def export_traces(interval=TRACE_FLUSH_INTERVAL):
+    """Exports the finished spans every interval seconds, which also keeps them from piling up in memory."""
+    while True:
+        time.sleep(interval)
+        tracing.flush()
+
+def main():
+    args = parse_arguments()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(asctime)s %(levelname)s %(message)s')
+    invoke_workflow.PAYLOAD_OFFLOAD = args.offload
+    invoke_workflow.PAYLOAD_ENCODING = args.encoding
+    if tracing.configure(args.trace, args.otlp_endpoint, service_name='faasr-invoke-service'):
+        threading.Thread(target=export_traces, name='trace-export', daemon=True).start()
+    if not args.verbose:
+        # The trigger functions report on stdout; keep it quiet unless asked
+        sys.stdout = open(os.devnull, 'w')
+
+    service = InvokeService(WorkflowRegistry(args.workflow_dir, args.slice_payload), args.token)
+    for workflow_file in args.preload:
+        try:
+            service.warm(workflow_file)
+        except (ServiceError, InvocationError, KeyError) as e:
+            logger.error(f"Cannot preload {workflow_file}: {str(e)}")
+            sys.exit(1)
+
+    server = create_server(service, args.host, args.port, args.unix_socket)
+    logger.info(f"FaaSr invoke service listening on {args.unix_socket or f'http://{args.host}:{args.port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        http_pool.close_all()
+        if args.unix_socket and os.path.exists(args.unix_socket):
+            os.unlink(args.unix_socket)
+
+if __name__ == '__main__':
+    main()
@@ -2,24 +2,77 @@
 
 import argparse
 import json
+import math
 import os
 import sys
-import requests
-import boto3
-import subprocess
+import time
+import http_pool
+import aws_clients
+import github_client
+import resilience
+import tracing
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from faasr_payload import ENCODINGS, OFFLOAD_MODES, PayloadTemplate, prepare_transport_body, slice_workflow
+from workflow_graph import load_workflow_graph
 
 
+class InvocationError(Exception):
+    """Raised by a trigger function when the platform did not accept the invocation."""
+
+
+# Default number of concurrent dispatches per platform in bulk mode
+BULK_CONCURRENCY = {
+    'githubactions': 4,
+    'lambda': 16,
+    'openwhisk': 8,
+}
+
+# How payloads that are too large for their transport are handled (see faasr_payload.py)
+PAYLOAD_OFFLOAD = os.getenv('FAASR_PAYLOAD_OFFLOAD', 'auto')
+
+# Opt-in compressed payload encoding (see faasr_payload.encode_payload)
+PAYLOAD_ENCODING = os.getenv('FAASR_PAYLOAD_ENCODING', 'none')
+
+# GitHub REST API root; GitHub Actions runners set GITHUB_API_URL (e.g. for GitHub Enterprise)
+GITHUB_API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+
+# Pre-rendered payload templates, keyed by (id(workflow_data), variant). The
+# cached value keeps a reference to the workflow so its id cannot be reused.
+_payload_templates = {}
+_payload_templates_lock = threading.Lock()
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description='Trigger FaaSr function from JSON file')
-    parser.add_argument('--workflow-file', required=True,
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--workflow-file',
                       help='Path to the workflow JSON file')
+    source.add_argument('--bulk',
+                      help='Path to a JSONL file of invocation specs to dispatch concurrently')
+    parser.add_argument('--concurrency', default='',
+                      help='Bulk mode: per-platform concurrency, e.g. githubactions=4,lambda=32,openwhisk=8')
+    parser.add_argument('--verbose', action='store_true',
+                      help='Bulk mode: show the output of every dispatch')
+    parser.add_argument('--slice-payload', action='store_true',
+                      help='Only send the invoked action, its successors and the servers/stores they use')
+    parser.add_argument('--offload', choices=OFFLOAD_MODES, default=PAYLOAD_OFFLOAD,
+                      help='Send a DataStore pointer instead of the payload: when it exceeds the '
+                           'transport limit (auto), always, or never')
+    parser.add_argument('--encoding', choices=ENCODINGS, default=PAYLOAD_ENCODING,
+                      help='Send payloads as compact, compressed, base64-encoded envelopes')
+    parser.add_argument('--trace',
+                      help='Append a JSON timing span per phase and remote call to this file')
+    parser.add_argument('--otlp-endpoint',
+                      help='Export the timing spans as OTLP/HTTP JSON to this collector')
+    parser.add_argument('--trace-summary', action='store_true',
+                      help='Print where the time went, per action, when the run ends')
     return parser.parse_args()
 
 def read_workflow_file(file_path):
     """Read and parse the workflow JSON file."""
     try:
-        with open(file_path, 'r') as f:
+        with tracing.span('read_workflow', file=file_path), open(file_path, 'r') as f:
             return json.load(f)
     except FileNotFoundError:
         print(f"Error: Workflow file {file_path} not found")
@@ -50,6 +103,11 @@ def build_faasr_payload(workflow_data, mask_secrets_for_github=False):
     # payload.update(workflow_copy)
     payload = workflow_copy
     
+    # Copy the server and store configs so substitution does not alter workflow_data
+    for field in ('ComputeServers', 'DataStores'):
+        if field in payload:
+            payload[field] = {name: dict(config) for name, config in payload[field].items()}
+    
     # Get environment credentials
     credentials = get_credentials()
     
@@ -99,7 +157,108 @@ def build_faasr_payload(workflow_data, mask_secrets_for_github=False):
     
     return payload
 
-def trigger_github_actions(workflow_data, action_name):
+def build_github_overwritten(workflow_data, use_secret_store):
+    """Builds the OVERWRITTEN fields sent to a GitHub Actions workflow."""
+    # Create overwritten fields structure matching reference invoke_gh implementation
+    # Start with basic workflow fields (excluding secrets initially)
+    overwritten_fields = {
+        "FunctionInvoke": workflow_data.get('FunctionInvoke')
+    }
+    
+    # Add other workflow fields but exclude ComputeServers and DataStores initially
+    for key, value in workflow_data.items():
+        if key not in ["ComputeServers", "DataStores", "_workflow_file"]:
+            overwritten_fields[key] = value
+    
+    # If UseSecretStore == False, include secrets in overwritten fields
+    # If UseSecretStore == True, don't send secrets to next action
+    if not use_secret_store:
+        # Build payload with credential replacement to get processed ComputeServers and DataStores
+        processed_payload = build_faasr_payload(workflow_data, mask_secrets_for_github=False)
+        overwritten_fields["ComputeServers"] = processed_payload.get("ComputeServers", {})
+        overwritten_fields["DataStores"] = processed_payload.get("DataStores", {})
+    return overwritten_fields
+
+def get_payload_template(workflow_data, platform, use_secret_store=False):
+    """
+    Returns the PayloadTemplate of a workflow for a platform, rendering it on first use
+
+    Arguments:
+        workflow_data: workflow dict; it must not be modified after the first call
+        platform: 'githubactions', 'lambda' or 'openwhisk'
+        use_secret_store: UseSecretStore of the GitHub Actions server (ignored elsewhere)
+    """
+    variant = ('githubactions', bool(use_secret_store)) if platform == 'githubactions' else ('faasr',)
+    key = (id(workflow_data),) + variant
+    cached = _payload_templates.get(key)
+    if cached is None:
+        with _payload_templates_lock:
+            cached = _payload_templates.get(key)
+            if cached is None:
+                if platform == 'githubactions':
+                    payload = build_github_overwritten(workflow_data, use_secret_store)
+                else:
+                    payload = build_faasr_payload(workflow_data)
+                cached = (workflow_data, PayloadTemplate(payload))
+                _payload_templates[key] = cached
+    return cached[1]
+
+def discard_payload_templates(workflow_data):
+    """Drops the cached templates of a workflow, e.g. after its file was reloaded."""
+    with _payload_templates_lock:
+        for key in [key for key in _payload_templates if key[0] == id(workflow_data)]:
+            del _payload_templates[key]
+
+def payload_template_count():
+    """Returns the number of cached payload templates."""
+    return len(_payload_templates)
+
+def render_payload(workflow_data, action_name, platform, invocation=None, use_secret_store=False):
+    """
+    Renders the payload of one dispatch from the workflow's cached template
+
+    Arguments:
+        workflow_data: workflow dict
+        action_name: action being invoked
+        platform: 'githubactions', 'lambda' or 'openwhisk'
+        invocation: per-invocation fields, e.g. {"InvocationID": "...", "Arguments": {...}};
+                    Arguments are merged over the invoked action's Arguments
+    Returns:
+        str -- payload JSON
+    """
+    invocation = invocation or {}
+    fields = {'FunctionInvoke': action_name}
+    fields.update((key, value) for key, value in invocation.items() if key != 'Arguments')
+    arguments = invocation_arguments(action_name, invocation)
+    with tracing.span('build_payload', platform=platform, action=action_name) as span:
+        template = get_payload_template(workflow_data, platform, use_secret_store)
+        body = template.render(fields, arguments)
+        span.set(bytes=len(body))
+    return body
+
+def invocation_arguments(action_name, invocation):
+    """Returns the Arguments overrides of an invocation as {action_name: {...}}, None without any."""
+    if invocation and invocation.get('Arguments'):
+        return {action_name: invocation['Arguments']}
+    return None
+
+def transport_payload(body, workflow_data, platform, arguments=None):
+    """
+    Returns body (encoded if --encoding is set), or its DataStore pointer if it
+    has to be offloaded; arguments are the overrides body was rendered with
+    """
+    try:
+        with tracing.span('prepare_transport', platform=platform, encoding=PAYLOAD_ENCODING) as span:
+            sent, ref = prepare_transport_body(body, workflow_data, platform, PAYLOAD_OFFLOAD, PAYLOAD_ENCODING,
+                                               arguments)
+            span.set(bytes=len(sent), offloaded=ref is not None)
+    except Exception as e:
+        raise InvocationError(f"Error preparing payload for {platform}: {str(e)}") from e
+    if ref:
+        print(f"Debug: Payload offloaded to {ref['Bucket']}/{ref['Key']} ({ref['Size']} bytes)")
+    return sent
+
+def trigger_github_actions(workflow_data, action_name, invocation=None):
     """Trigger a GitHub Actions workflow."""
     # Get action data
     action_data = workflow_data['ActionList'][action_name]
@@ -120,30 +279,11 @@ def trigger_github_actions(workflow_data, action_name):
     else:
         workflow_name = f"{workflow_name_prefix}-{action_name}"
 
-    # Create overwritten fields structure matching reference invoke_gh implementation
-    # Start with basic workflow fields (excluding secrets initially)
-    overwritten_fields = {
-        "FunctionInvoke": action_name
-    }
-    
-    # Add other workflow fields but exclude ComputeServers and DataStores initially
-    for key, value in workflow_data.items():
-        if key not in ["ComputeServers", "DataStores", "_workflow_file"]:
-            overwritten_fields[key] = value
-    
-    # If UseSecretStore == False, include secrets in overwritten fields
-    # If UseSecretStore == True, don't send secrets to next action
-    if not server_config.get("UseSecretStore"):
-        # Build payload with credential replacement to get processed ComputeServers and DataStores
-        processed_payload = build_faasr_payload(workflow_data, mask_secrets_for_github=False)
-        overwritten_fields["ComputeServers"] = processed_payload.get("ComputeServers", {})
-        overwritten_fields["DataStores"] = processed_payload.get("DataStores", {})
-
-    # Ensure we have valid JSON content
-    if not overwritten_fields:
-        overwritten_fields = {}
-    
-    json_overwritten = json.dumps(overwritten_fields)
+    # Splice this dispatch's fields into the pre-rendered OVERWRITTEN template
+    overwritten = render_payload(workflow_data, action_name, 'githubactions', invocation,
+                                 use_secret_store=server_config.get("UseSecretStore"))
+    json_overwritten = transport_payload(overwritten, workflow_data, 'githubactions',
+                                         invocation_arguments(action_name, invocation))
 
     # Create payload URL following the structure: {username}/{repo}/{branch}/{workflow_file}
     # Extract workflow file name from the stored path
@@ -159,14 +299,7 @@ def trigger_github_actions(workflow_data, action_name):
     }
     
     # Create URL for GitHub API
-    url = f"https://api.github.com/repos/{repo}/actions/workflows/{workflow_name}/dispatches"
-    
-    # Create headers for POST request
-    headers = {
-        "Authorization": f"token {pat}",
-        "Accept": "application/vnd.github.v3+json",
-        "X-GitHub-Api-Version": "2022-11-28"
-    }
+    url = f"{GITHUB_API_URL}/repos/{repo}/actions/workflows/{workflow_name}/dispatches"
     
     # Create body for POST request
     body = {
@@ -177,49 +310,40 @@ def trigger_github_actions(workflow_data, action_name):
         }
     }
     
-    # Send request
+    # Send request; github_client smooths dispatch bursts and waits out rate limits
     try:
-        response = requests.post(url, headers=headers, json=body)
-        
-        # Enhanced error handling based on invoke_gh method
-        if response.status_code == 204:
-            print(f"✓ Successfully triggered GitHub Actions workflow: {workflow_name}")
-        elif response.status_code == 401:
-            print("✗ GitHub Action: Authentication failed, check the credentials")
-            sys.exit(1)
-        elif response.status_code == 404:
-            print(f"✗ GitHub Action: Cannot find the destination: "
-                  f"check repo: {repo}, workflow: {workflow_name}, "
-                  f"and branch: {git_ref}")
-            sys.exit(1)
-        elif response.status_code == 422:
-            try:
-                message = response.json().get("message")
-                if message:
-                    print(f"✗ GitHub Action: {message}")
-                else:
-                    print(f"✗ GitHub Action: Cannot find the destination; check ref {git_ref}")
-            except json.JSONDecodeError:
-                print(f"✗ GitHub Action: Cannot find the destination; check ref {git_ref}")
-            sys.exit(1)
-        else:
-            try:
-                if response.text:
-                    response_data = response.json()
-                    message = response_data.get("message")
-                    if message:
-                        print(f"✗ GitHub Action: {message}")
-                    else:
-                        print("✗ GitHub Action: Unknown error happens when invoke next function")
-                else:
-                    print("✗ GitHub Action: No response from GitHub")
-            except json.JSONDecodeError:
-                print(f"✗ GitHub Action: Error {response.status_code} - {response.text}")
-            sys.exit(1)
-            
+        with tracing.span('github.dispatch', platform='githubactions', action=action_name,
+                          bytes=len(json_overwritten)) as span:
+            response = resilience.call(resilience.endpoint_name('github', url), github_client.dispatch,
+                                       url, pat, json=body, idempotent=False, deadline_arg='deadline')
+            span.set(status=response.status_code)
     except Exception as e:
-        print(f"✗ Error triggering GitHub Actions workflow: {str(e)}")
-        sys.exit(1)
+        raise InvocationError(f"Error triggering GitHub Actions workflow: {str(e)}") from e
+    
+    # Enhanced error handling based on invoke_gh method
+    if response.status_code == 204:
+        print(f"✓ Successfully triggered GitHub Actions workflow: {workflow_name}")
+    elif response.status_code == 401:
+        raise InvocationError("GitHub Action: Authentication failed, check the credentials")
+    elif response.status_code == 404:
+        raise InvocationError(f"GitHub Action: Cannot find the destination: "
+                              f"check repo: {repo}, workflow: {workflow_name}, "
+                              f"and branch: {git_ref}")
+    elif response.status_code == 422:
+        try:
+            message = response.json().get("message")
+        except json.JSONDecodeError:
+            message = None
+        raise InvocationError(f"GitHub Action: {message or f'Cannot find the destination; check ref {git_ref}'}")
+    else:
+        try:
+            if response.text:
+                message = response.json().get("message") or "Unknown error happens when invoke next function"
+            else:
+                message = "No response from GitHub"
+        except json.JSONDecodeError:
+            message = f"Error {response.status_code} - {response.text}"
+        raise InvocationError(f"GitHub Action: {message}")
 
 
 
@@ -227,11 +351,10 @@ def get_github_token():
     # Get GitHub PAT from environment variable
     token = os.getenv('GITHUB_TOKEN')
     if not token:
-        print("Error: GITHUB_TOKEN environment variable not set")
-        sys.exit(1)
+        raise InvocationError("GITHUB_TOKEN environment variable not set")
     return token
 
-def trigger_lambda(workflow_data, action_name):
+def trigger_lambda(workflow_data, action_name, invocation=None):
     """Trigger an AWS Lambda function."""
     # Get action data
     action_data = workflow_data['ActionList'][action_name]
@@ -248,30 +371,30 @@ def trigger_lambda(workflow_data, action_name):
     lambda_function_name = f"{workflow_name_prefix}-{action_name}"
     
     # Create payload with credentials
-    payload = build_faasr_payload(workflow_data)
+    payload = transport_payload(render_payload(workflow_data, action_name, 'lambda', invocation),
+                                workflow_data, 'lambda', invocation_arguments(action_name, invocation))
     
-    # Create Lambda client
+    # Reuse the process-wide client for this region and credentials
     try:
-        lambda_client = boto3.client(
-            'lambda',
-            aws_access_key_id=aws_access_key,
-            aws_secret_access_key=aws_secret_key,
-            region_name=aws_region
-        )
+        lambda_client = aws_clients.get_lambda_client(aws_region, aws_access_key, aws_secret_key)
     except Exception as e:
-        print(f"Error creating Lambda client: {str(e)}")
-        sys.exit(1)
+        raise InvocationError(f"Error creating Lambda client: {str(e)}") from e
     
     # Invoke function synchronously
     try:
         print(f"Debug: Invoking Lambda function synchronously: {lambda_function_name}")
         
         # Asynchronous invocation (commented out)
-        response = lambda_client.invoke(
-            FunctionName=lambda_function_name,
-            InvocationType='Event',  # Asynchronous invocation
-            Payload=json.dumps(payload)
-        )
+        with tracing.span('lambda.invoke', platform='lambda', action=action_name, bytes=len(payload)) as span:
+            response = resilience.call(
+                f"lambda:{aws_region}",
+                lambda_client.invoke,
+                FunctionName=lambda_function_name,
+                InvocationType='Event',  # Asynchronous invocation
+                Payload=payload,
+                idempotent=False
+            )
+            span.set(status=response['StatusCode'])
         if response['StatusCode'] == 202:
             print(f"✓ Successfully triggered Lambda function: {lambda_function_name}")
             print("Function is running asynchronously - check CloudWatch logs for execution details")
@@ -286,13 +409,12 @@ def trigger_lambda(workflow_data, action_name):
         # print(f"Debug: Lambda response status: {response.get('StatusCode')}")
         
         # For synchronous invocations, check status and handle errors
-        if response['StatusCode'] == 200:
+        elif response['StatusCode'] == 200:
             # Check if there was a function error
             if 'FunctionError' in response:
                 error_type = response['FunctionError']
                 payload_response = json.loads(response['Payload'].read())
-                print(f"Lambda function error ({error_type}): {payload_response}")
-                sys.exit(1)
+                raise InvocationError(f"Lambda function error ({error_type}): {payload_response}")
             else:
                 print(f"✓ Successfully executed Lambda function: {lambda_function_name}")
                 # Print the response payload
@@ -303,21 +425,20 @@ def trigger_lambda(workflow_data, action_name):
                 else:
                     print("Function completed successfully (no response payload)")
         else:
-            print(f"✗ Lambda function invocation failed with status: {response['StatusCode']}")
             if 'Payload' in response:
                 payload_content = response['Payload'].read()
                 if payload_content:
                     print(f"Response payload: {payload_content.decode('utf-8')}")
-            sys.exit(1)
+            raise InvocationError(f"Lambda function invocation failed with status: {response['StatusCode']}")
             
-    except lambda_client.exceptions.ResourceNotFoundException:
-        print(f"✗ Error: Lambda function '{lambda_function_name}' not found")
-        sys.exit(1)
+    except InvocationError:
+        raise
+    except lambda_client.exceptions.ResourceNotFoundException as e:
+        raise InvocationError(f"Error: Lambda function '{lambda_function_name}' not found") from e
     except Exception as e:
-        print(f"✗ Error triggering Lambda function: {str(e)}")
-        sys.exit(1)
+        raise InvocationError(f"Error triggering Lambda function: {str(e)}") from e
 
-def trigger_openwhisk(workflow_data, action_name):
+def trigger_openwhisk(workflow_data, action_name, invocation=None):
     """Trigger an OpenWhisk action."""
     # Get action data
     action_data = workflow_data['ActionList'][action_name]
@@ -332,13 +453,11 @@ def trigger_openwhisk(workflow_data, action_name):
     # Get API key and split it
     ow_api_key = os.getenv('OW_API_KEY')
     if not ow_api_key:
-        print("Error: OW_API_KEY environment variable not set")
-        sys.exit(1)
+        raise InvocationError("OW_API_KEY environment variable not set")
     
     api_key_parts = ow_api_key.split(':')
     if len(api_key_parts) != 2:
-        print("Error: OW_API_KEY should be in format 'username:password'")
-        sys.exit(1)
+        raise InvocationError("OW_API_KEY should be in format 'username:password'")
     
     # Add protocol to endpoint if not present
     # Force HTTPS since the server seems to require it regardless of SSL setting
@@ -355,12 +474,11 @@ def trigger_openwhisk(workflow_data, action_name):
     url = f"{endpoint}/api/v1/namespaces/{namespace}/actions/{openwhisk_action_name}?blocking=false&result=false"
     
   
-    payload = build_faasr_payload(workflow_data)
+    payload = transport_payload(render_payload(workflow_data, action_name, 'openwhisk', invocation),
+                                workflow_data, 'openwhisk', invocation_arguments(action_name, invocation))
     
-    # Debug: print the payload being sent to OpenWhisk
-    print("\n===== OpenWhisk Payload Debug =====")
-    print(json.dumps(payload, indent=2))
-    print("===== End Payload Debug =====\n")
+    # Debug: summarize the payload being sent to OpenWhisk (it carries credentials, so it is not printed)
+    print(f"Debug: OpenWhisk payload: {len(payload)} bytes")
     
     # Set headers
     headers = {
@@ -373,28 +491,244 @@ def trigger_openwhisk(workflow_data, action_name):
         print(f"Debug: Using namespace: {namespace}")
         print(f"Debug: URL: {url}")
         
-        response = requests.post(
-            url=url,
-            auth=(api_key_parts[0], api_key_parts[1]),  # HTTP Basic Auth
-            headers=headers,
-            json=payload,
-            verify=ssl  # SSL verification based on config
-        )
-        
-        if response.status_code in [200, 202]:
-            print(f"✓ Successfully invoked OpenWhisk action: {openwhisk_action_name}")
-            if response.text:
-                print(f"Response: {response.text}")
+        with tracing.span('openwhisk.invoke', platform='openwhisk', action=action_name,
+                          bytes=len(payload)) as span:
+            response = resilience.call(
+                resilience.endpoint_name('openwhisk', url),
+                http_pool.post,
+                url,
+                auth=(api_key_parts[0], api_key_parts[1]),  # HTTP Basic Auth
+                headers=headers,
+                data=payload,
+                verify=ssl,  # SSL verification based on config
+                idempotent=False
+            )
+            span.set(status=response.status_code)
+    except Exception as e:
+        raise InvocationError(f"Error triggering OpenWhisk action: {str(e)}") from e
+    
+    if response.status_code in [200, 202]:
+        print(f"✓ Successfully invoked OpenWhisk action: {openwhisk_action_name}")
+        if response.text:
+            print(f"Response: {response.text}")
+    else:
+        raise InvocationError(f"Error invoking OpenWhisk action: {response.status_code} - {response.text}")
+
+def get_platform(workflow_data, action_name):
+    """Returns the canonical platform name of the ComputeServer an action runs on."""
+    server_name = workflow_data['ActionList'][action_name]['FaaSServer']
+    faas_type = workflow_data['ComputeServers'][server_name]['FaaSType'].lower()
+    if faas_type in ['githubactions', 'github_actions', 'github']:
+        return 'githubactions'
+    elif faas_type in ['lambda', 'aws_lambda', 'aws']:
+        return 'lambda'
+    elif faas_type in ['openwhisk', 'open_whisk', 'ow']:
+        return 'openwhisk'
+    raise InvocationError(f"Unsupported FaaS type: {faas_type}")
+
+def trigger_action(workflow_data, action_name, invocation=None):
+    """
+    Trigger an action on the platform of its ComputeServer
+
+    Arguments:
+        workflow_data: workflow dict
+        action_name: action to invoke
+        invocation: per-invocation fields spliced into the payload (see render_payload)
+    """
+    platform = get_platform(workflow_data, action_name)
+    with tracing.span('invoke', platform=platform, action=action_name):
+        if platform == 'githubactions':
+            trigger_github_actions(workflow_data, action_name, invocation)
+        elif platform == 'lambda':
+            trigger_lambda(workflow_data, action_name, invocation)
         else:
-            print(f"✗ Error invoking OpenWhisk action: {response.status_code} - {response.text}")
+            trigger_openwhisk(workflow_data, action_name, invocation)
+
+def parse_concurrency(value):
+    """Parses 'platform=N,...' into a dict, starting from BULK_CONCURRENCY."""
+    concurrency = dict(BULK_CONCURRENCY)
+    for item in filter(None, value.split(',')):
+        platform, _, count = item.partition('=')
+        if platform not in concurrency or not count.isdigit() or int(count) < 1:
+            print(f"Error: invalid concurrency setting '{item}', expected one of "
+                  f"{', '.join(concurrency)} with a positive count")
             sys.exit(1)
-            
-    except Exception as e:
-        print(f"✗ Error triggering OpenWhisk action: {str(e)}")
+        concurrency[platform] = int(count)
+    return concurrency
+
+def read_bulk_specs(file_path):
+    """
+    Reads invocation specs, one JSON object per line:
+        {"workflow_file": "project1.json", "action": "add_operation",
+         "arguments": {"num1": 1}, "invocation_id": "run-0001"}
+    Only workflow_file is required; action defaults to the workflow's FunctionInvoke
+    and arguments are merged over the action's Arguments
+    """
+    specs = []
+    try:
+        with open(file_path, 'r') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                spec = json.loads(line)
+                if 'workflow_file' not in spec:
+                    print(f"Error: spec on line {line_number} of {file_path} has no workflow_file")
+                    sys.exit(1)
+                specs.append(spec)
+    except FileNotFoundError:
+        print(f"Error: Bulk spec file {file_path} not found")
+        sys.exit(1)
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON in bulk spec file {file_path}: {str(e)}")
         sys.exit(1)
+    return specs
+
+def load_workflow(workflow_file):
+    """
+    Parses a workflow file and loads its graph, publishing the predecessor index
+
+    Returns:
+        (dict, WorkflowGraph) -- workflow data and graph
+    """
+    try:
+        with tracing.span('read_workflow', file=workflow_file), open(workflow_file, 'r') as f:
+            workflow_data = json.load(f)
+    except FileNotFoundError:
+        raise InvocationError(f"Workflow file {workflow_file} not found")
+    except json.JSONDecodeError:
+        raise InvocationError(f"Invalid JSON in workflow file {workflow_file}")
+    workflow_data['_workflow_file'] = workflow_file
+    try:
+        with tracing.span('load_graph', file=workflow_file):
+            graph, _ = load_workflow_graph(workflow_file, workflow_data)
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        raise InvocationError(f"Invalid workflow in {workflow_file}: {str(e)}") from e
+    workflow_data['PredecessorIndex'] = graph.predecessor_index()
+    return workflow_data, graph
+
+def prepare_invocation(spec, workflows, slice_payload=False):
+    """
+    Resolves one bulk invocation. Workflow files are parsed and their graphs
+    loaded once, in workflows (a cache keyed by file path, and by (file path,
+    action) for slices); the returned workflow data is shared between
+    invocations, which differ only by their invocation fields
+
+    Returns:
+        (dict, str, dict) -- workflow data, the action to invoke and its invocation fields
+    """
+    workflow_file = spec['workflow_file']
+    if workflow_file not in workflows:
+        workflows[workflow_file] = load_workflow(workflow_file)
+
+    base_data, graph = workflows[workflow_file]
+    action_name = spec.get('action') or base_data.get('FunctionInvoke')
+    if action_name not in graph:
+        raise InvocationError(f"Action '{action_name}' not found in ActionList of {workflow_file}")
+    if slice_payload:
+        slice_key = (workflow_file, action_name)
+        if slice_key not in workflows:
+            workflows[slice_key] = slice_workflow(base_data, graph, action_name)
+        base_data = workflows[slice_key]
+    invocation = {}
+    if spec.get('arguments'):
+        invocation['Arguments'] = spec['arguments']
+    if spec.get('invocation_id'):
+        invocation['InvocationID'] = spec['invocation_id']
+    return base_data, action_name, invocation
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+def run_bulk(spec_file, concurrency, verbose=False, slice_payload=False):
+    """
+    Dispatches every invocation spec of a JSONL file concurrently, with a
+    separate thread pool (sized by concurrency) per platform, and reports
+    throughput and dispatch latency percentiles
+
+    Returns:
+        bool -- True if every invocation was accepted
+    """
+    specs = read_bulk_specs(spec_file)
+    workflows = {}
+    invocations = {platform: [] for platform in concurrency}
+    failures = []
+    for number, spec in enumerate(specs, 1):
+        try:
+            workflow_data, action_name, invocation = prepare_invocation(spec, workflows, slice_payload)
+            platform = get_platform(workflow_data, action_name)
+            invocations[platform].append((number, workflow_data, action_name, invocation))
+        except (InvocationError, KeyError) as e:
+            failures.append((number, None, str(e)))
+
+    def dispatch(workflow_data, action_name, invocation):
+        start = time.perf_counter()
+        try:
+            trigger_action(workflow_data, action_name, invocation)
+            error = None
+        except Exception as e:
+            error = str(e)
+        return error, time.perf_counter() - start
+
+    print(f"Dispatching {len(specs)} invocations "
+          f"({', '.join(f'{p}: {len(i)} x{concurrency[p]}' for p, i in invocations.items() if i)})...")
+    # Load the botocore Lambda model before the clock starts; clients are then built once per region
+    if invocations['lambda']:
+        aws_clients.preload('lambda')
+    
+    latencies = {platform: [] for platform in concurrency}
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(sys.stdout if verbose else devnull):
+        executors = {platform: ThreadPoolExecutor(max_workers=concurrency[platform])
+                     for platform in invocations if invocations[platform]}
+        try:
+            futures = [(platform, number,
+                        executors[platform].submit(dispatch, workflow_data, action_name, invocation))
+                       for platform, items in invocations.items()
+                       for number, workflow_data, action_name, invocation in items]
+            for platform, number, future in futures:
+                error, latency = future.result()
+                latencies[platform].append(latency)
+                if error:
+                    failures.append((number, platform, error))
+        finally:
+            for executor in executors.values():
+                executor.shutdown()
+    elapsed = time.perf_counter() - start
+
+    dispatched = sum(len(values) for values in latencies.values())
+    succeeded = len(specs) - len(failures)
+    print("\nBulk invocation summary:")
+    print(f"  {len(specs)} invocations, {succeeded} accepted, {len(failures)} failed in {elapsed:.2f}s "
+          f"({dispatched / elapsed if elapsed else 0:.1f} dispatches/s)")
+    print(f"  {'platform':<14} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    all_latencies = sorted(latency for values in latencies.values() for latency in values)
+    for platform, values in list(latencies.items()) + [('all', all_latencies)]:
+        if not values:
+            continue
+        values = sorted(values)
+        print(f"  {platform:<14} {len(values):>6} {percentile(values, 50) * 1000:>9.1f} "
+              f"{percentile(values, 95) * 1000:>9.1f} {percentile(values, 99) * 1000:>9.1f}")
+    for line in resilience.summary():
+        print(f"  {line}")
+    for number, platform, error in sorted(failures, key=lambda failure: failure[0]):
+        print(f"  ✗ spec {number}{f' ({platform})' if platform else ''}: {error}")
+    return not failures
 
 def main():
+    global PAYLOAD_OFFLOAD, PAYLOAD_ENCODING
     args = parse_arguments()
+    PAYLOAD_OFFLOAD = args.offload
+    PAYLOAD_ENCODING = args.encoding
+    tracing.configure(args.trace, args.otlp_endpoint, args.trace_summary, service_name='faasr-invoke')
+    if args.bulk:
+        if not run_bulk(args.bulk, parse_concurrency(args.concurrency), verbose=args.verbose,
+                        slice_payload=args.slice_payload):
+            sys.exit(1)
+        return
+    
     workflow_data = read_workflow_file(args.workflow_file)
     
     # Store the workflow file path
@@ -406,27 +740,40 @@ def main():
         print("Error: No FunctionInvoke specified in workflow file")
         sys.exit(1)
     
-    if function_invoke not in workflow_data['ActionList']:
+    # Load the graph compiled at registration time (or compile it if the workflow changed since)
+    with tracing.span('load_graph', file=args.workflow_file):
+        graph, from_artifact = load_workflow_graph(args.workflow_file, workflow_data)
+    if from_artifact:
+        print(f"Debug: Loaded compiled workflow graph ({len(graph)} actions)")
+    
+    if function_invoke not in graph:
         print(f"Error: FunctionInvoke '{function_invoke}' not found in ActionList")
         sys.exit(1)
     
+    # Publish the predecessor index of every action with the payload (OVERWRITTEN for
+    # GitHub Actions, the invocation payload for Lambda and OpenWhisk)
+    workflow_data['PredecessorIndex'] = graph.predecessor_index()
+    
+    if args.slice_payload:
+        with tracing.span('slice_payload', action=function_invoke):
+            workflow_data = slice_workflow(workflow_data, graph, function_invoke)
+        print(f"Debug: Sliced payload to {len(workflow_data['ActionList'])} of {len(graph)} actions")
+    
     # Get action data
-    action_data = workflow_data['ActionList'][function_invoke]
-    server_name = action_data['FaaSServer']
+    action_node = graph.node(function_invoke)
+    if action_node.id not in graph.entry_points:
+        print(f"Warning: '{function_invoke}' is not an entry point; it normally waits for {', '.join(action_node.predecessors)}")
+    server_name = action_node.server
     server_config = workflow_data['ComputeServers'][server_name]
     faas_type = server_config['FaaSType'].lower()
     
     print(f"Triggering action '{function_invoke}' on {faas_type}...")
     
     # Trigger based on FaaS type
-    if faas_type in ['githubactions', 'github_actions', 'github']:
-        trigger_github_actions(workflow_data, function_invoke)
-    elif faas_type in ['lambda', 'aws_lambda', 'aws']:
-        trigger_lambda(workflow_data, function_invoke)
-    elif faas_type in ['openwhisk', 'open_whisk', 'ow']:
-        trigger_openwhisk(workflow_data, function_invoke)
-    else:
-        print(f"Error: Unsupported FaaS type: {faas_type}")
+    try:
+        trigger_action(workflow_data, function_invoke)
+    except InvocationError as e:
+        print(f"✗ {str(e)}")
         sys.exit(1)
     
     print("Action trigger completed successfully!")
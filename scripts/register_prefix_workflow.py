@@ -1,33 +1,65 @@
 #!/usr/bin/env python3
 
 import argparse
+import copy
+import hashlib
+import hmac
 import json
 import os
 import sys
-import boto3
-from github import Github
-import base64
-import tempfile
-import shutil
-import subprocess
-import requests
+import aws_clients
+import github_client
+import http_pool
+import resilience
+import threading
+import tracing
 import time
 import logging
-from collections import defaultdict
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from workflow_graph import (
+    WorkflowGraph,
+    build_adjacency_graph,
+    graph_artifact_path,
+    predecessors_list,
+    save_workflow_graph,
+    validate_dag,
+    workflow_file_hash,
+)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+
+class DeploymentError(Exception):
+    """Raised by a deploy backend when it cannot finish registering its actions."""
+
+
 def parse_arguments():
     parser = argparse.ArgumentParser(description='Deploy FaaSr functions to specified platform')
     parser.add_argument('--workflow-file', required=True,
                       help='Path to the workflow JSON file')
+    parser.add_argument('--sequential', action='store_true',
+                      help='Deploy one platform at a time instead of concurrently')
+    parser.add_argument('--incremental', action='store_true',
+                      help='Only redeploy artifacts that changed since the last recorded deployment')
+    parser.add_argument('--manifest',
+                      help='Local path of the deployment manifest (default: object in the DefaultDataStore)')
+    parser.add_argument('--ow-verify-tls', action='store_true', default=OW_VERIFY_TLS,
+                      help="Verify the OpenWhisk controller's TLS certificate (default: FAASR_OW_VERIFY_TLS, off)")
+    parser.add_argument('--trace',
+                      help='Append a JSON timing span per phase and remote call to this file')
+    parser.add_argument('--otlp-endpoint',
+                      help='Export the timing spans as OTLP/HTTP JSON to this collector')
+    parser.add_argument('--trace-summary', action='store_true',
+                      help='Print where the time went, per action, when the run ends')
     return parser.parse_args()
 
 def read_workflow_file(file_path):
     try:
-        with open(file_path, 'r') as f:
+        with tracing.span('read_workflow', file=file_path), open(file_path, 'r') as f:
             return json.load(f)
     except FileNotFoundError:
         print(f"Error: Workflow file {file_path} not found")
@@ -36,115 +68,6 @@ def read_workflow_file(file_path):
         print(f"Error: Invalid JSON in workflow file {file_path}")
         sys.exit(1)
 
-def extract_rank(str_input):
-    """
-    Returns action name and rank of an action with rank (e.g func(7) returns (func, 7))
-
-    Arguments:
-        str_input: function name with rank
-    Returns:
-        (str, int) -- action name and rank
-    """
-    parts = str_input.split("(")
-    if len(parts) != 2 or not parts[1].endswith(")"):
-        return str_input, 1
-    rank = int(parts[1][:-1])
-    action_name = parts[0]
-    return (action_name, rank)
-
-def is_cyclic(adj_graph, curr, visited, stack):
-    """
-    Recursive function that if there is a cycle in a directed
-    graph defined by an adjacency list
-
-    Arguments:
-        adj_graph: adjacency list for graph (dict)
-        curr: current node
-        visited: set of visited nodes (set)
-        stack: list of nodes in recursion call stack (list)
-
-    Returns:
-        bool: True if cycle exists, False otherwise
-    """
-    # if the current node is in the recursion call
-    # stack then there must be a cycle in the graph
-    if curr in stack:
-        return True
-
-    # add current node to recursion call stack and visited set
-    visited.add(curr)
-    stack.append(curr)
-
-    # check each successor for cycles, recursively calling is_cyclic()
-    for child in adj_graph[curr]:
-        if child not in visited and is_cyclic(adj_graph, child, visited, stack):
-            logger.error(f"Function loop found from node {curr} to {child}")
-            sys.exit(1)
-        elif child in stack:
-            logger.error(f"Function loop found from node {curr} to {child}")
-            sys.exit(1)
-
-    # no more successors to visit for this branch and no cycles found
-    # remove current node from recursion call stack
-    stack.pop()
-    return False
-
-def build_adjacency_graph(payload):
-    """
-    This function builds an adjacency list for the FaaSr workflow graph and determines
-    the ranks of each action
-
-    Arguments:
-        payload: FaaSr payload dict
-    Returns:
-        adj_graph: dict of predecessor: successor pairs
-        rank: dict of each action's rank
-    """
-    adj_graph = defaultdict(list)
-    ranks = dict()
-
-    # Build adjacency list from ActionList
-    for func in payload["ActionList"].keys():
-        invoke_next = payload["ActionList"][func]["InvokeNext"]
-        if isinstance(invoke_next, str):
-            invoke_next = [invoke_next]
-        for child in invoke_next:
-
-            def process_action(action):
-                action_name, action_rank = extract_rank(action)
-                if action_name in ranks and ranks[action_name] > 1:
-                    err_msg = "Function with rank cannot have multiple predecessors"
-                    logger.error(err_msg)
-                    sys.exit(1)
-                else:
-                    adj_graph[func].append(action_name)
-                    ranks[action_name] = action_rank
-
-            if isinstance(child, dict):
-                for conditional_branch in child.values():
-                    for action in conditional_branch:
-                        process_action(action)
-            else:
-                process_action(child)
-
-    for func in adj_graph:
-        if func not in ranks:
-            ranks[func] = 0
-
-    return (adj_graph, ranks)
-
-def predecessors_list(adj_graph):
-    """This function returns a map of action predecessor pairs
-
-    Arguments:
-        adj_graph: adjacency list for graph -- dict(function: successor)
-    """
-    pre = defaultdict(list)
-    for func1 in adj_graph:
-        for func2 in adj_graph[func1]:
-            pre[func2].append(func1)
-    return pre
-
 def check_dag(faasr_payload):
     """
     This method checks for cycles, repeated function names,
@@ -162,37 +85,32 @@ def check_dag(faasr_payload):
 
     adj_graph, ranks = build_adjacency_graph(faasr_payload)
 
-    # Initialize empty recursion call stack
-    stack = []
-
-    # Initialize empty visited set
-    visited = set()
-
-    # Find initial function in the graph
-    start = False
-    for func in faasr_payload["ActionList"]:
-        if ranks[func] == 0:
-            start = True
-            # This function stores the first function with no predecessors
-            # In the cases where there is multiple functions with no
-            # predecessors, an unreachable state error will occur later
-            first_func = func
-            break
-
-    # Ensure there is an initial action
-    if start is False:
+    report = validate_dag(faasr_payload["ActionList"], adj_graph)
+    valid = True
+
+    # Ensure there is exactly one initial action
+    if not report.roots:
         logger.error("Function loop found: no initial action")
-        sys.exit(1)
+        valid = False
+    elif len(report.roots) > 1:
+        logger.error(f"Multiple initial actions found: {', '.join(report.roots)}")
+        valid = False
+
+    for func, child in report.undefined:
+        logger.error(f"Function {func} invokes undefined action {child}")
+        valid = False
 
-    # Check for cycles
-    is_cyclic(adj_graph, first_func, visited, stack)
+    for cycle in report.cycles:
+        logger.error(f"Function loop found: {' -> '.join(cycle)}")
+        valid = False
 
-    # Check if all of the functions have been visited by the DFS
-    # If not, then there is an unreachable state in the graph
-    for func in faasr_payload["ActionList"]:
-        if func.split(".")[0] not in visited:
-            logger.error(f"Unreachable state found: {func}")
-            sys.exit(1)
+    # Actions never visited by the DFS are unreachable from every initial action
+    for func in report.unreachable:
+        logger.error(f"Unreachable state found: {func}")
+        valid = False
+
+    if not valid:
+        sys.exit(1)
 
     # Initialize predecessor list
     pre = predecessors_list(adj_graph)
@@ -211,8 +129,7 @@ def get_github_token():
     # Get GitHub PAT from environment variable
     token = os.getenv('GITHUB_TOKEN')
     if not token:
-        print("Error: GITHUB_TOKEN environment variable not set")
-        sys.exit(1)
+        raise DeploymentError("GITHUB_TOKEN environment variable not set")
     return token
 
 def get_aws_credentials():
@@ -223,41 +140,126 @@ def get_aws_credentials():
     role_arn = os.getenv('AWS_LAMBDA_ROLE_ARN')
     
     if not all([aws_access_key, aws_secret_key, role_arn]):
-        print("Error: AWS credentials or role ARN not set in environment variables")
-        sys.exit(1)
+        raise DeploymentError("AWS credentials or role ARN not set in environment variables")
     
     return aws_access_key, aws_secret_key, aws_region, role_arn
 
-def set_github_variable(repo_full_name, var_name, var_value, github_token):
-    url = f"https://api.github.com/repos/{repo_full_name}/actions/variables/{var_name}"
-    headers = {
-        "Authorization": f"Bearer {github_token}",
-        "Accept": "application/vnd.github+json"
-    }
+GITHUB_API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+
+# Upper bound on repository variables written at the same time
+VARIABLE_WRITE_WORKERS = 4
+
+def list_github_variables(repo_full_name, github_token, per_page=30):
+    """
+    Returns {name: value} of every Actions variable of the repository, or None
+    if they cannot be listed (e.g. the token may write but not read variables)
+    """
+    url = f"{GITHUB_API_URL}/repos/{repo_full_name}/actions/variables"
+    variables = {}
+    page = 1
+    while True:
+        with tracing.span('github.list_variables', platform='githubactions', page=page) as span:
+            r = resilience.call(resilience.endpoint_name('github', url), github_client.get,
+                                url, github_token, params={'per_page': per_page, 'page': page},
+                                deadline_arg='deadline')
+            span.set(status=r.status_code)
+        if not r.ok:
+            print(f"Could not list variables of {repo_full_name}: {r.text}")
+            return None
+        body = r.json()
+        variables.update((v['name'], v['value']) for v in body.get('variables', []))
+        if len(variables) >= body.get('total_count', 0) or not body.get('variables'):
+            return variables
+        page += 1
+
+def set_github_variable(repo_full_name, var_name, var_value, github_token, exists=None):
+    """
+    Creates or updates a repository variable. exists (from list_github_variables)
+    picks PATCH or POST directly; if None, PATCH is tried first and POST on 404
+    """
+    url = f"{GITHUB_API_URL}/repos/{repo_full_name}/actions/variables"
     data = {"name": var_name, "value": var_value}
-    # Try to update, if not found, create
-    r = requests.patch(url, headers=headers, json=data)
-    if r.status_code == 404:
-        r = requests.post(f"https://api.github.com/repos/{repo_full_name}/actions/variables", headers=headers, json=data)
+    endpoint = resilience.endpoint_name('github', url)
+    with tracing.span('github.set_variable', platform='githubactions', variable=var_name) as span:
+        if exists is False:
+            r = resilience.call(endpoint, github_client.request, 'POST', url, github_token, json=data,
+                                idempotent=False, deadline_arg='deadline')
+        else:
+            r = resilience.call(endpoint, github_client.request, 'PATCH', f"{url}/{var_name}", github_token, json=data,
+                                deadline_arg='deadline')
+            if exists is None and r.status_code == 404:
+                r = resilience.call(endpoint, github_client.request, 'POST', url, github_token, json=data,
+                                    idempotent=False, deadline_arg='deadline')
+        span.set(status=r.status_code)
     if not r.ok:
         print(f"Failed to set variable {var_name}: {r.text}")
     else:
         print(f"Set variable {var_name} for {repo_full_name}")
 
+def set_github_variables(repo_full_name, variables, github_token, existing, max_workers=VARIABLE_WRITE_WORKERS):
+    """
+    Writes every variable whose value differs from existing (the result of
+    list_github_variables), several at a time. If existing is None every
+    variable is written.
+    """
+    known = existing or {}
+    pending = {name: value for name, value in variables.items() if known.get(name) != value}
+    for name in variables:
+        if name not in pending:
+            print(f"Variable {name} already up to date")
+    if not pending:
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+        futures = [executor.submit(set_github_variable, repo_full_name, name, value, github_token,
+                                   None if existing is None else name in existing)
+                   for name, value in pending.items()]
+        for future in futures:
+            future.result()
+
+def secret_fingerprint_variable(secret_name):
+    return f"{secret_name}_FINGERPRINT"
+
+def secret_fingerprint(secret_value, salt=None):
+    """
+    Returns "{salt}:{HMAC-SHA256(salt, secret_value)}". A fresh random salt keeps
+    the fingerprint from matching precomputed tables or the fingerprint of the
+    same secret elsewhere. The salt is stored with the digest, though, so anyone
+    who can read the fingerprint can still test guesses of the secret against it
+    """
+    salt = salt or os.urandom(16).hex()
+    digest = hmac.new(salt.encode('utf-8'), secret_value.encode('utf-8'), hashlib.sha256).hexdigest()
+    return f"{salt}:{digest}"
+
+def fingerprint_matches(fingerprint, secret_value):
+    """Returns True if fingerprint was computed by secret_fingerprint() from secret_value."""
+    salt, _, digest = (fingerprint or '').partition(':')
+    if not salt or not digest:
+        return False
+    return hmac.compare_digest(secret_fingerprint(secret_value, salt), fingerprint)
+
 def ensure_github_secrets_and_vars(repo, required_secrets, required_vars, github_token):
-    """Set GitHub secrets and variables for the repository."""
-    # Check and set secrets
-    existing_secrets = {s.name for s in repo.get_secrets()}
+    """
+    Set GitHub secrets and variables for the repository.
+
+    Each uploaded secret gets a {name}_FINGERPRINT variable holding a salted hash
+    of its value; a secret whose fingerprint matches is not encrypted and uploaded
+    again. Variables already holding the wanted value are not written.
+    """
+    existing_vars = list_github_variables(repo.full_name, github_token)
+    variables = dict(required_vars)
     for secret_name, secret_value in required_secrets.items():
-        if secret_name not in existing_secrets:
-            print(f"Setting secret: {secret_name}")
-        else:
-            print(f"Secret {secret_name} already exists, updating it.")
-        repo.create_secret(secret_name, secret_value)
+        fingerprint_name = secret_fingerprint_variable(secret_name)
+        if fingerprint_matches((existing_vars or {}).get(fingerprint_name), secret_value):
+            print(f"Secret {secret_name} unchanged, skipping upload")
+            continue
+        print(f"Setting secret: {secret_name}")
+        with tracing.span('github.create_secret', platform='githubactions', secret=secret_name,
+                          bytes=len(secret_value)):
+            repo.create_secret(secret_name, secret_value)
+        # Recorded only after the upload succeeded
+        variables[fingerprint_name] = secret_fingerprint(secret_value)
 
-    # Set variables using REST API
-    for var_name, var_value in required_vars.items():
-        set_github_variable(repo.full_name, var_name, var_value, github_token)
+    set_github_variables(repo.full_name, variables, github_token, existing_vars)
 
 def create_secret_payload(workflow_data):
     """
@@ -265,6 +267,12 @@ def create_secret_payload(workflow_data):
     This payload will be stored as a GitHub secret and used by the deployed functions.
     This function matches the logic from build_faasr_payload in trigger_function.py
     """
+    with tracing.span('build_secret_payload') as span:
+        payload = _build_secret_payload(workflow_data)
+        span.set(bytes=len(payload))
+    return payload
+
+def _build_secret_payload(workflow_data):
     # Start with credentials at the top
     credentials = {
         "My_GitHub_Account_TOKEN": get_github_token(),
@@ -277,8 +285,9 @@ def create_secret_payload(workflow_data):
     
     payload = credentials.copy()
 
-    # Add workflow data (excluding _workflow_file)
-    workflow_copy = workflow_data.copy()
+    # Add workflow data (excluding _workflow_file). Deep copy so that credential
+    # substitution never leaks into the shared workflow_data used by other backends
+    workflow_copy = copy.deepcopy(workflow_data)
     if '_workflow_file' in workflow_copy:
         del workflow_copy['_workflow_file']
     payload.update(workflow_copy)
@@ -321,10 +330,235 @@ def create_secret_payload(workflow_data):
     
     return json.dumps(payload)
 
-def deploy_to_github(workflow_data):
+def canonical_json(*parts):
+    """Returns a stable JSON encoding of JSON-serializable parts."""
+    return json.dumps(parts, sort_keys=True, separators=(',', ':'))
+
+def content_hash(*parts):
+    """Returns a stable sha256 hex digest of JSON-serializable parts."""
+    return hashlib.sha256(canonical_json(*parts).encode('utf-8')).hexdigest()
+
+class DeploymentManifest:
+    """
+    Content hashes of the GitHub Actions and OpenWhisk artifacts deployed for a
+    workflow, keyed by "{platform}/{artifact}". Backends consult it in incremental
+    mode to skip remote calls for artifacts whose hash matches the last successful
+    deployment, and record the new hash only once the deployment of that artifact
+    succeeded. Lambda functions are not recorded: their faasr:code and
+    faasr:config tags are the record, read back with the inventory.
+
+    SECRET_PAYLOAD is recorded as a salted secret_fingerprint() instead of a plain
+    sha256, so the manifest cannot be matched against precomputed hashes of
+    common secrets.
+
+    Note that image URIs are hashed as strings: pushing a new image under the
+    same mutable tag (e.g. :latest) is not detected.
+    """
+    VERSION = 1
+
+    def __init__(self, entries=None):
+        self.entries = dict(entries or {})
+        self._lock = threading.Lock()
+
+    def unchanged(self, platform, artifact, digest):
+        with self._lock:
+            return self.entries.get(f"{platform}/{artifact}") == digest
+
+    def get(self, platform, artifact):
+        with self._lock:
+            return self.entries.get(f"{platform}/{artifact}")
+
+    def record(self, platform, artifact, digest):
+        with self._lock:
+            self.entries[f"{platform}/{artifact}"] = digest
+
+    def to_json(self):
+        with self._lock:
+            return json.dumps({"Version": self.VERSION, "Entries": self.entries}, indent=2, sort_keys=True)
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        if data.get("Version") != cls.VERSION:
+            return cls()
+        return cls(data.get("Entries", {}))
+
+def is_unchanged(manifest, platform, artifact, digest):
+    """True if incremental mode is on and the artifact matches the manifest."""
+    return manifest is not None and manifest.unchanged(platform, artifact, digest)
+
+def is_secret_unchanged(manifest, platform, artifact, *parts):
+    """True if incremental mode is on and the artifact's fingerprint matches parts."""
+    return (manifest is not None and
+            fingerprint_matches(manifest.get(platform, artifact), canonical_json(*parts)))
+
+def manifest_key(workflow_data):
+    """DataStore object key of the deployment manifest of a workflow."""
+    return f"FaaSrDeployments/{workflow_data.get('WorkflowName', 'default')}.json"
+
+def load_manifest(workflow_data, manifest_path=None):
+    """
+    Loads the deployment manifest from manifest_path, or from the workflow's
+    DefaultDataStore if no path is given. A missing or unreadable manifest yields
+    an empty one, which makes every artifact deploy.
+    """
+    with tracing.span('load_manifest', file=manifest_path):
+        return _load_manifest(workflow_data, manifest_path)
+
+def _load_manifest(workflow_data, manifest_path):
+    try:
+        if manifest_path:
+            if not os.path.exists(manifest_path):
+                return DeploymentManifest()
+            with open(manifest_path, 'r') as f:
+                return DeploymentManifest.from_json(f.read())
+        s3_client, bucket = aws_clients.get_datastore_client(workflow_data)
+        try:
+            response = s3_client.get_object(Bucket=bucket, Key=manifest_key(workflow_data))
+        except s3_client.exceptions.NoSuchKey:
+            return DeploymentManifest()
+        return DeploymentManifest.from_json(response['Body'].read().decode('utf-8'))
+    except Exception as e:
+        print(f"Warning: could not load deployment manifest, deploying everything: {str(e)}")
+        return DeploymentManifest()
+
+def save_manifest(workflow_data, manifest, manifest_path=None):
+    """Stores the deployment manifest where load_manifest looks for it."""
+    try:
+        with tracing.span('save_manifest', file=manifest_path):
+            if manifest_path:
+                with open(manifest_path, 'w') as f:
+                    f.write(manifest.to_json())
+                print(f"Saved deployment manifest to {manifest_path}")
+            else:
+                s3_client, bucket = aws_clients.get_datastore_client(workflow_data)
+                key = manifest_key(workflow_data)
+                s3_client.put_object(Bucket=bucket, Key=key, Body=manifest.to_json().encode('utf-8'))
+                print(f"Saved deployment manifest to {bucket}/{key}")
+    except Exception as e:
+        print(f"Warning: could not save deployment manifest: {str(e)}")
+
+def render_github_workflow(prefixed_action_name, container_image):
+    """Returns the GitHub Actions workflow YAML that runs one FaaSr action."""
+    return f"""name: {prefixed_action_name}
+
+on:
+  workflow_dispatch:
+    inputs:
+      OVERWRITTEN:
+        description: 'overwritten fields'
+        required: true
+      PAYLOAD_URL:
+        description: 'url to payload'
+        required: true
+jobs:
+  run_docker_image:
+    runs-on: ubuntu-latest
+    container: {container_image}
+    env:
+      TOKEN: ${{{{ secrets.PAT }}}}
+      SECRET_PAYLOAD: ${{{{ secrets.SECRET_PAYLOAD }}}}
+      OVERWRITTEN: ${{{{ github.event.inputs.OVERWRITTEN }}}}
+      PAYLOAD_URL: ${{{{ github.event.inputs.PAYLOAD_URL }}}}
+    steps:
+    - name: run Python
+      run: |
+        cd /action
+        python3 faasr_entry.py
+"""
+
+def git_blob_sha(content):
+    """Returns the sha git gives a file holding content (as git hash-object computes it)"""
+    data = content.encode('utf-8')
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+def list_remote_blobs(repo, branch, paths):
+    """
+    Returns {path: blob sha} of the files at the head of branch from a single
+    recursive tree listing. If GitHub truncates the listing (very large
+    repositories), only the directories holding paths are listed, one request each
+
+    Arguments:
+        repo: PyGithub Repository
+        branch: branch to read
+        paths: repository paths the caller wants to compare
+    Returns:
+        dict -- path: blob sha, empty if the branch has no commits yet
+    """
+    from github import GithubException
+    
+    try:
+        with tracing.span('github.get_tree', platform='githubactions', branch=branch) as span:
+            tree = repo.get_git_tree(branch, recursive=True)
+            span.set(entries=len(tree.tree), truncated=tree.truncated)
+    except GithubException as e:
+        # 409: the repository is empty
+        if e.status in (404, 409):
+            return {}
+        raise
+    if not tree.truncated:
+        return {element.path: element.sha for element in tree.tree if element.type == 'blob'}
+
+    blobs = {}
+    for directory in sorted({os.path.dirname(path) for path in paths}):
+        try:
+            with tracing.span('github.get_tree', platform='githubactions', branch=branch, directory=directory):
+                subtree = repo.get_git_tree(f"{branch}:{directory}" if directory else branch)
+        except GithubException as e:
+            if e.status == 404:
+                continue
+            raise
+        for element in subtree.tree:
+            if element.type == 'blob':
+                blobs[f"{directory}/{element.path}" if directory else element.path] = element.sha
+    return blobs
+
+def publish_workflow_files(repo, branch, files, message, max_attempts=5):
+    """
+    Publishes a set of files to a branch as a single commit using the Git Data API.
+    The tree is built on top of the branch head; if the head moves before the ref
+    update (non fast-forward), the commit is rebuilt on the new head and retried
+
+    Arguments:
+        repo: PyGithub Repository
+        branch: branch to commit to
+        files: dict of path: file content
+        message: commit message
+        max_attempts: number of tries before giving up on fast-forward conflicts
+    Returns:
+        str or None -- sha of the new commit, None if nothing changed
+    """
+    from github import GithubException, InputGitTreeElement
+    
+    elements = [InputGitTreeElement(path, '100644', 'blob', content=content)
+                for path, content in sorted(files.items())]
+
+    for attempt in range(1, max_attempts + 1):
+        ref = repo.get_git_ref(f"heads/{branch}")
+        head = repo.get_git_commit(ref.object.sha)
+        tree = repo.create_git_tree(elements, base_tree=head.tree)
+
+        # Git trees are content addressed: an identical tree means no file changed
+        if tree.sha == head.tree.sha:
+            return None
+
+        commit = repo.create_git_commit(message, tree, [head])
+        try:
+            ref.edit(commit.sha, force=False)
+            return commit.sha
+        except GithubException as e:
+            if e.status != 422 or attempt == max_attempts:
+                raise
+            print(f"Branch {branch} moved while publishing, retrying ({attempt}/{max_attempts})...")
+            time.sleep(min(2 ** (attempt - 1), 10))
+
+def deploy_to_github(workflow_data, manifest=None):
     """Deploy functions to GitHub Actions."""
+    # Platform SDKs are imported on first use so other platforms do not pay for them
+    from github import Github
+    
     github_token = get_github_token()
-    g = Github(github_token)
+    g = Github(github_token, base_url=GITHUB_API_URL)
     
     # Get the workflow name for prefixing
     workflow_name = workflow_data.get('WorkflowName', 'default')
@@ -333,8 +567,7 @@ def deploy_to_github(workflow_data):
     # Get the current repository
     repo_name = os.getenv('GITHUB_REPOSITORY')
     if not repo_name:
-        print("Error: GITHUB_REPOSITORY environment variable not set")
-        sys.exit(1)
+        raise DeploymentError("GITHUB_REPOSITORY environment variable not set")
     
     # Filter actions that should be deployed to GitHub Actions
     github_actions = {}
@@ -349,116 +582,292 @@ def deploy_to_github(workflow_data):
         print("No actions found for GitHub Actions deployment")
         return
     
+    # Create secret payload and the variables that go with it
+    secret_payload = create_secret_payload(workflow_data)
+    required_secrets = {"SECRET_PAYLOAD": secret_payload}
+    vars = {f"{json_prefix.upper()}_PAYLOAD_REPO": f"{repo_name}/{workflow_data['_workflow_file']}"}
+    secrets_changed = not is_secret_unchanged(manifest, 'githubactions', 'SECRET_PAYLOAD',
+                                              repo_name, required_secrets, vars)
+    
+    # Render every workflow file up front so they can be published in one commit
+    workflow_files = {}
+    for action_name in github_actions:
+        # Create prefixed action name using workflow_name-action_name format
+        prefixed_action_name = f"{json_prefix}-{action_name}"
+        
+        # Get container image, with fallback to default
+        container_image = workflow_data.get('ActionContainers', {}).get(action_name, 'ghcr.io/faasr/github-actions-tidyverse')
+        
+        workflow_path = f".github/workflows/{prefixed_action_name}.yml"
+        workflow_files[workflow_path] = render_github_workflow(prefixed_action_name, container_image)
+    
+    # Publish the compiled workflow graph with the workflow files so that
+    # invoke_workflow.py can load it from a checkout of this repository
+    artifact_path = graph_artifact_path(workflow_data['_workflow_file'])
+    if not os.path.isabs(artifact_path) and os.path.exists(artifact_path):
+        with open(artifact_path, 'r') as f:
+            workflow_files[os.path.normpath(artifact_path)] = f.read()
+    
+    file_digests = {path: content_hash(repo_name, content) for path, content in workflow_files.items()}
+    changed_files = {path: content for path, content in workflow_files.items()
+                     if not is_unchanged(manifest, 'githubactions', path, file_digests[path])}
+    
+    if not secrets_changed and not changed_files:
+        print(f"All {len(workflow_files)} GitHub Actions artifacts unchanged since last deployment, skipping")
+        return
+    
     try:
-        repo = g.get_repo(repo_name)
+        with tracing.span('github.get_repo', platform='githubactions'):
+            repo = g.get_repo(repo_name)
         
         # Get the default branch name
         default_branch = repo.default_branch
         print(f"Using branch: {default_branch}")
         
-        # Create secret payload and set up secrets/variables
-        secret_payload = create_secret_payload(workflow_data)
-        required_secrets = {"SECRET_PAYLOAD": secret_payload}
-        vars = {f"{json_prefix.upper()}_PAYLOAD_REPO": f"{repo_name}/{workflow_data['_workflow_file']}"}
+        if secrets_changed:
+            with tracing.span('github.secrets_and_vars', platform='githubactions'):
+                ensure_github_secrets_and_vars(repo, required_secrets, vars, github_token)
+            if manifest is not None:
+                manifest.record('githubactions', 'SECRET_PAYLOAD',
+                                secret_fingerprint(canonical_json(repo_name, required_secrets, vars)))
+        else:
+            print("SECRET_PAYLOAD and variables unchanged, skipping upload")
         
-        ensure_github_secrets_and_vars(repo, required_secrets, vars, github_token)
+        # Compare git blob shas of the rendered files with the branch's tree, so
+        # only files whose content really differs are uploaded
+        published_files = {}
+        if changed_files:
+            remote_blobs = list_remote_blobs(repo, default_branch, changed_files)
+            published_files = {path: content for path, content in changed_files.items()
+                               if remote_blobs.get(path) != git_blob_sha(content)}
         
-        # Deploy each action
-        for action_name, action_data in github_actions.items():
-            actual_func_name = action_data['FunctionName']
-            
-            # Create prefixed action name using workflow_name-action_name format
-            prefixed_action_name = f"{json_prefix}-{action_name}"
-            
-            # Create workflow file
-            # Get container image, with fallback to default
-            container_image = workflow_data.get('ActionContainers', {}).get(action_name, 'ghcr.io/faasr/github-actions-tidyverse')
+        if published_files:
+            with tracing.span('github.publish', platform='githubactions', files=len(published_files),
+                              bytes=sum(len(content) for content in published_files.values())):
+                commit_sha = publish_workflow_files(
+                    repo,
+                    default_branch,
+                    published_files,
+                    message=f"Register {json_prefix} workflow ({len(published_files)} actions)"
+                )
+            if commit_sha is None:
+                print(f"All {len(published_files)} workflow files are already up to date, skipping commit")
+            else:
+                print(f"Published {len(published_files)} workflow files in commit {commit_sha[:7]}")
+        elif changed_files:
+            print(f"All {len(changed_files)} workflow files are already up to date, skipping commit")
+        
+        for workflow_path in workflow_files:
+            if workflow_path in changed_files and manifest is not None:
+                manifest.record('githubactions', workflow_path, file_digests[workflow_path])
+            if not workflow_path.startswith('.github/workflows/'):
+                continue
+            action_label = os.path.basename(workflow_path)[:-len('.yml')]
+            if workflow_path not in changed_files:
+                print(f"{action_label} unchanged since last deployment, skipped")
+            elif workflow_path not in published_files:
+                print(f"{action_label} already up to date on {default_branch}, skipped")
+            else:
+                print(f"Successfully deployed {action_label} to GitHub")
             
-            workflow_content = f"""name: {prefixed_action_name}
+    except Exception as e:
+        if hasattr(e, 'data'):
+            print(f"Error details: {e.data}")
+        raise DeploymentError(f"Error deploying to GitHub: {str(e)}") from e
 
-on:
-  workflow_dispatch:
-    inputs:
-      OVERWRITTEN:
-        description: 'overwritten fields'
-        required: true
-      PAYLOAD_URL:
-        description: 'url to payload'
-        required: true
-jobs:
-  run_docker_image:
-    runs-on: ubuntu-latest
-    container: {container_image}
-    env:
-      TOKEN: ${{{{ secrets.PAT }}}}
-      SECRET_PAYLOAD: ${{{{ secrets.SECRET_PAYLOAD }}}}
-      OVERWRITTEN: ${{{{ github.event.inputs.OVERWRITTEN }}}}
-      PAYLOAD_URL: ${{{{ github.event.inputs.PAYLOAD_URL }}}}
-    steps:
-    - name: run Python
-      run: |
-        cd /action
-        python3 faasr_entry.py
-"""
-            
-            # Create or update the workflow file
-            workflow_path = f".github/workflows/{prefixed_action_name}.yml"
+# Upper bound on Lambda functions created/updated at the same time; the Lambda
+# control plane throttles bursts well before this becomes a bottleneck
+LAMBDA_DEPLOY_WORKERS = 8
+
+# Full Lambda configuration applied to every FaaSr function
+LAMBDA_TIMEOUT = 900
+LAMBDA_MEMORY_SIZE = 1024
+
+# Tags of every deployed function: the workflow it belongs to, the content hash
+# of its image and a secret_fingerprint() of its configuration (role, timeout,
+# memory, environment), so an inventory can decide what to update from tags alone
+LAMBDA_WORKFLOW_TAG = 'faasr:workflow'
+LAMBDA_CODE_TAG = 'faasr:code'
+LAMBDA_CONFIG_TAG = 'faasr:config'
+
+# Error codes of an AWS call the credentials are not allowed to make
+AWS_ACCESS_DENIED_CODES = ('AccessDenied', 'AccessDeniedException')
+
+def is_access_denied(error):
+    """True if error is an AWS error raised because the IAM policy does not allow the call."""
+    response = getattr(error, 'response', None)
+    return isinstance(response, dict) and response.get('Error', {}).get('Code') in AWS_ACCESS_DENIED_CODES
+
+def wait_for_lambda_ready(lambda_client, function_name, timeout=300,
+                          initial_delay=0.5, max_delay=8):
+    """
+    Waits until a Lambda function is Active and its last update has finished,
+    polling with jittered exponential backoff instead of a fixed sleep
+
+    Arguments:
+        lambda_client: boto3 Lambda client
+        function_name: name of the Lambda function
+        timeout: seconds to wait before giving up
+        initial_delay: first polling interval in seconds
+        max_delay: upper bound for the polling interval
+    """
+    with tracing.span('lambda.wait_ready', platform='lambda', function=function_name) as span:
+        _wait_for_lambda_ready(lambda_client, function_name, timeout, initial_delay, max_delay, span)
+
+def _wait_for_lambda_ready(lambda_client, function_name, timeout, initial_delay, max_delay, span):
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    polls = 0
+    while True:
+        polls += 1
+        span.set(polls=polls)
+        try:
+            configuration = lambda_client.get_function_configuration(FunctionName=function_name)
+        except Exception as e:
+            # Keep polling through throttling and server errors, give up on anything else
+            if not resilience.is_transient(e):
+                raise
+            print(f"Error checking state of {function_name}: {str(e)}")
+            configuration = {}
+
+        state = configuration.get('State')
+        last_update_status = configuration.get('LastUpdateStatus', 'Successful')
+        if state == 'Active' and last_update_status == 'Successful':
+            return
+        if state == 'Failed' or last_update_status == 'Failed':
+            reason = configuration.get('StateReason') or configuration.get('LastUpdateStatusReason', '')
+            raise DeploymentError(f"Lambda function {function_name} failed: {reason}")
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeploymentError(f"Timeout waiting for {function_name} to become ready")
+        time.sleep(min(resilience.jitter(delay), remaining))
+        delay = min(delay * 2, max_delay)
+
+def list_lambda_functions(tagging_client, workflow_name, prefix):
+    """
+    Lists the Lambda functions tagged with workflow_name whose name starts with
+    prefix. The Resource Groups Tagging API returns only ARNs and tags, 100 per
+    page, where list_functions would return every function's full environment
+
+    Returns:
+        dict -- function name: {tag key: value}
+    """
+    functions = {}
+    for page in tagging_client.get_paginator('get_resources').paginate(
+            TagFilters=[{'Key': LAMBDA_WORKFLOW_TAG, 'Values': [workflow_name]}],
+            ResourceTypeFilters=['lambda:function']):
+        for resource in page['ResourceTagMappingList']:
+            function_name = resource['ResourceARN'].split(':')[6]
+            if function_name.startswith(prefix):
+                functions[function_name] = {tag['Key']: tag['Value'] for tag in resource.get('Tags', [])}
+    return functions
+
+def list_lambda_function_names(lambda_client, prefix):
+    """
+    Lists the Lambda functions whose name starts with prefix, tagged or not.
+    list_functions cannot filter by name and returns every function's full
+    configuration, so it is only used when the tag inventory is not enough
+
+    Returns:
+        set -- function names
+    """
+    names = set()
+    for page in lambda_client.get_paginator('list_functions').paginate():
+        names.update(function['FunctionName'] for function in page['Functions']
+                     if function['FunctionName'].startswith(prefix))
+    return names
+
+def deploy_lambda_action(lambda_client, function_name, container_image, role_arn, environment_vars,
+                         update_code=True, update_config=True, exists=None, tags=None):
+    """
+    Creates or updates a single Lambda function from a container image
+
+    Arguments:
+        lambda_client: boto3 Lambda client
+        function_name: prefixed Lambda function name
+        container_image: ECR image URI
+        role_arn: Lambda execution role ARN
+        environment_vars: dict of environment variables for the function
+        update_code: push the image when the function already exists
+        update_config: push Role/Timeout/MemorySize/Environment when the function already exists
+        exists: whether the function exists (e.g. from list_lambda_functions); None probes it
+        tags: tags set on the function once it is created or updated, None to keep its tags
+    """
+    endpoint = f"lambda:{lambda_client.meta.region_name}"
+    if exists is None:
+        try:
+            with tracing.span('lambda.get_function', platform='lambda', function=function_name):
+                resilience.call(endpoint, lambda_client.get_function, FunctionName=function_name)
+            exists = True
+        except lambda_client.exceptions.ResourceNotFoundException:
+            exists = False
+
+    if not exists:
+        # Create with the full configuration in one call, no follow-up update needed
+        print(f"Creating new Lambda function: {function_name}")
+        function = dict(
+            FunctionName=function_name,
+            PackageType='Image',
+            Code={'ImageUri': container_image},
+            Role=role_arn,
+            Timeout=LAMBDA_TIMEOUT,
+            MemorySize=LAMBDA_MEMORY_SIZE,
+            Environment={'Variables': environment_vars},
+        )
+        with tracing.span('lambda.create_function', platform='lambda', function=function_name):
             try:
-                # Try to get the file first
-                contents = repo.get_contents(workflow_path)
-                existing_content = contents.decoded_content.decode('utf-8')
-                
-                # Check if content has changed
-                if existing_content.strip() == workflow_content.strip():
-                    print(f"File {workflow_path} content is already up to date, skipping update")
-                else:
-                    # If file exists and content is different, update it
-                    print(f"File {workflow_path} exists, updating...")
-                    repo.update_file(
-                        path=workflow_path,
-                        message=f"Update workflow for {prefixed_action_name}",
-                        content=workflow_content,
-                        sha=contents.sha,
-                        branch=default_branch
-                    )
-                    print(f"Successfully updated {workflow_path}")
+                resilience.call(endpoint, lambda_client.create_function, Tags=tags or {}, idempotent=False,
+                                **function)
             except Exception as e:
-                if "Not Found" in str(e) or "404" in str(e):
-                    # If file doesn't exist, create it
-                    print(f"File {workflow_path} doesn't exist, creating...")
-                    repo.create_file(
-                        path=workflow_path,
-                        message=f"Add workflow for {prefixed_action_name}",
-                        content=workflow_content,
-                        branch=default_branch
-                    )
-                    print(f"Successfully created {workflow_path}")
-                else:
-                    print(f"Error updating/creating {workflow_path}: {str(e)}")
-                    # Try to get more details about the error
-                    if hasattr(e, 'data'):
-                        print(f"Error details: {e.data}")
-                    if hasattr(e, 'status'):
-                        print(f"HTTP status: {e.status}")
-                    raise e
-                    
-            print(f"Successfully deployed {prefixed_action_name} to GitHub")
-            
-    except Exception as e:
-        print(f"Error deploying to GitHub: {str(e)}")
-        sys.exit(1)
+                if not (tags and is_access_denied(e)):
+                    raise
+                print(f"Warning: creating {function_name} without tags, lambda:TagResource not allowed")
+                resilience.call(endpoint, lambda_client.create_function, idempotent=False, **function)
+        wait_for_lambda_ready(lambda_client, function_name)
+        print(f"Successfully created {function_name} on AWS Lambda")
+        return
+
+    print(f"Function {function_name} already exists, updating...")
+    function_arn = None
+    if update_code:
+        with tracing.span('lambda.update_function_code', platform='lambda', function=function_name):
+            response = resilience.call(
+                endpoint,
+                lambda_client.update_function_code,
+                FunctionName=function_name,
+                ImageUri=container_image
+            )
+            function_arn = response['FunctionArn']
+        wait_for_lambda_ready(lambda_client, function_name)
+    if update_config:
+        # Retried while a previous update of the function is still in progress
+        with tracing.span('lambda.update_function_configuration', platform='lambda', function=function_name):
+            response = resilience.call(
+                endpoint,
+                lambda_client.update_function_configuration,
+                FunctionName=function_name,
+                Role=role_arn,
+                Timeout=LAMBDA_TIMEOUT,
+                MemorySize=LAMBDA_MEMORY_SIZE,
+                Environment={'Variables': environment_vars}
+            )
+            function_arn = response['FunctionArn']
+    if tags and function_arn:
+        # Tagged last, so a failed update is retried by the next deployment
+        with tracing.span('lambda.tag_resource', platform='lambda', function=function_name):
+            try:
+                resilience.call(endpoint, lambda_client.tag_resource, Resource=function_arn, Tags=tags)
+            except Exception as e:
+                if not is_access_denied(e):
+                    raise
+                print(f"Warning: {function_name} left untagged, lambda:TagResource not allowed")
+    print(f"Successfully updated {function_name} on AWS Lambda")
 
-def deploy_to_aws(workflow_data):
+def deploy_to_aws(workflow_data, manifest=None, max_workers=LAMBDA_DEPLOY_WORKERS):
     # Get AWS credentials
     aws_access_key, aws_secret_key, aws_region, role_arn = get_aws_credentials()
     
-    lambda_client = boto3.client(
-        'lambda',
-        aws_access_key_id=aws_access_key,
-        aws_secret_access_key=aws_secret_key,
-        region_name=aws_region
-    )
-    
     # Get the workflow name for function naming
     workflow_name = workflow_data.get('WorkflowName', 'default')
     json_prefix = workflow_name
@@ -479,129 +888,98 @@ def deploy_to_aws(workflow_data):
         print("No actions found for AWS Lambda deployment")
         return
     
-    # Process each action in the workflow
-    for action_name, action_data in lambda_actions.items():
+    # Check payload size before deployment
+    payload_size = len(secret_payload.encode('utf-8'))
+    if payload_size > 4000:  # Lambda env var limit is ~4KB
+        print(f"Warning: SECRET_PAYLOAD size ({payload_size} bytes) may exceed Lambda environment variable limits")
+        print("Consider using Parameter Store or S3 for large payloads")
+    
+    # Environment variables for Lambda function
+    environment_vars = {
+        'SECRET_PAYLOAD': secret_payload
+    }
+    
+    # boto3 clients are thread-safe; size the connection pool to the worker count
+    lambda_client = aws_clients.get_lambda_client(
+        aws_region, aws_access_key, aws_secret_key,
+        max_pool_connections=max(max_workers, 10)
+    )
+    
+    # One inventory of the workflow's functions and their tags decides create,
+    # update or skip locally
+    prefixed_names = {f"{json_prefix}-{action_name}" for action_name in lambda_actions}
+    tagging_client = aws_clients.get_client('resourcegroupstaggingapi', aws_region, aws_access_key, aws_secret_key)
+    tagged = True
+    try:
+        with tracing.span('tagging.get_resources', platform='lambda') as span:
+            inventory = resilience.call(f"tagging:{aws_region}", list_lambda_functions,
+                                        tagging_client, workflow_name, f"{json_prefix}-")
+            span.set(functions=len(inventory))
+    except Exception as e:
+        if not is_access_denied(e):
+            raise DeploymentError(f"Error listing Lambda functions: {str(e)}") from e
+        print("Warning: tag:GetResources not allowed, listing functions by name and updating every existing one")
+        inventory = {}
+        tagged = False
+    
+    # Functions deployed before tagging (or without tag permissions) are missing from
+    # the tag inventory; a listing by name tells them apart from missing functions
+    if not prefixed_names <= set(inventory):
         try:
-            actual_func_name = action_data['FunctionName']
-            
-            # Create prefixed function name using workflow_name-action_name format
-            prefixed_func_name = f"{json_prefix}-{action_name}"
-            
-            # Get container image, with fallback to default Lambda image
-            container_image = workflow_data.get('ActionContainers', {}).get(action_name, '145342739029.dkr.ecr.us-east-1.amazonaws.com/aws-lambda-tidyverse:latest')
-            
-            # Check payload size before deployment
-            payload_size = len(secret_payload.encode('utf-8'))
-            if payload_size > 4000:  # Lambda env var limit is ~4KB
-                print(f"Warning: SECRET_PAYLOAD size ({payload_size} bytes) may exceed Lambda environment variable limits")
-                print("Consider using Parameter Store or S3 for large payloads")
-            
-            # Environment variables for Lambda function
-            environment_vars = {
-                'SECRET_PAYLOAD': secret_payload
-            }
-            
-            # Check if function already exists first
-            try:
-                existing_func = lambda_client.get_function(FunctionName=prefixed_func_name)
-                print(f"Function {prefixed_func_name} already exists, updating...")
-                # Update existing function
-                lambda_client.update_function_code(
-                    FunctionName=prefixed_func_name,
-                    ImageUri=container_image
-                )
-                
-                # Wait for the function update to complete
-                print(f"Waiting for {prefixed_func_name} code update to complete...")
-                max_attempts = 60  # Wait up to 5 minutes
-                attempt = 0
-                while attempt < max_attempts:
-                    try:
-                        response = lambda_client.get_function(FunctionName=prefixed_func_name)
-                        state = response['Configuration']['State']
-                        last_update_status = response['Configuration']['LastUpdateStatus']
-                        
-                        if state == 'Active' and last_update_status == 'Successful':
-                            break
-                        elif state == 'Failed' or last_update_status == 'Failed':
-                            sys.exit(1)
-                        else:
-                            time.sleep(5)
-                            attempt += 1
-                    except Exception as e:
-                        print(f"Error checking function state: {str(e)}")
-                        time.sleep(5)
-                        attempt += 1
-                
-                if attempt >= max_attempts:
-                    print(f"Timeout waiting for {prefixed_func_name} update to complete")
-                    sys.exit(1)
-                
-                # Now update environment variables
-                lambda_client.update_function_configuration(
-                    FunctionName=prefixed_func_name,
-                    Environment={'Variables': environment_vars}
-                )
-                print(f"Successfully updated {prefixed_func_name} on AWS Lambda")
-                
-            except lambda_client.exceptions.ResourceNotFoundException:
-                # Function doesn't exist, create it
-                print(f"Creating new Lambda function: {prefixed_func_name}")
-                
-                # Create function with minimal parameters first, then update
-                print("Creating with minimal parameters...")
-                try:
-                    lambda_client.create_function(
-                        FunctionName=prefixed_func_name,
-                        PackageType='Image',
-                        Code={'ImageUri': container_image},
-                        Role=role_arn,
-                        Timeout=300,  # Shorter timeout
-                        MemorySize=128,  # Minimal memory
-                    )
-                    print(f"Successfully created {prefixed_func_name} with minimal parameters")
-                    
-                    # Wait for the function to become active before updating
-                    print(f"Waiting for {prefixed_func_name} to become active...")
-                    max_attempts = 60  # Wait up to 5 minutes
-                    attempt = 0
-                    while attempt < max_attempts:
-                        try:
-                            response = lambda_client.get_function(FunctionName=prefixed_func_name)
-                            state = response['Configuration']['State']
-                            
-                            if state == 'Active':
-                                print(f"Function {prefixed_func_name} is now active")
-                                break
-                            elif state == 'Failed':
-                                print(f"Function {prefixed_func_name} creation failed")
-                                sys.exit(1)
-                            else:
-                                print(f"Function state: {state}, waiting...")
-                                time.sleep(5)
-                                attempt += 1
-                        except Exception as e:
-                            print(f"Error checking function state: {str(e)}")
-                            time.sleep(5)
-                            attempt += 1
-                    
-                    if attempt >= max_attempts:
-                        print(f"Timeout waiting for {prefixed_func_name} to become active")
-                        sys.exit(1)
-                    
-                    # Now update with full configuration
-                    lambda_client.update_function_configuration(
-                        FunctionName=prefixed_func_name,
-                        Timeout=900,
-                        MemorySize=1024,
-                        Environment={'Variables': environment_vars}
-                    )
-                    print(f"Updated {prefixed_func_name} with full configuration")
-                    
-                except Exception as minimal_error:
-                    print(f"Minimal creation failed: {minimal_error}")
-                    raise minimal_error
-            
+            with tracing.span('lambda.list_functions', platform='lambda') as span:
+                names = resilience.call(f"lambda:{aws_region}", list_lambda_function_names,
+                                        lambda_client, f"{json_prefix}-")
+                span.set(functions=len(names))
+        except Exception as e:
+            raise DeploymentError(f"Error listing Lambda functions: {str(e)}") from e
+        for name in names:
+            inventory.setdefault(name, {})
+    
+    # Hash code (image) and configuration separately so an environment-only change
+    # costs a single update_function_configuration call
+    pending = {}
+    for action_name in lambda_actions:
+        # Create prefixed function name using workflow_name-action_name format
+        prefixed_func_name = f"{json_prefix}-{action_name}"
+        
+        # Get container image, with fallback to default Lambda image
+        container_image = workflow_data.get('ActionContainers', {}).get(action_name, '145342739029.dkr.ecr.us-east-1.amazonaws.com/aws-lambda-tidyverse:latest')
+        
+        code_digest = content_hash(aws_region, container_image)
+        config = canonical_json(aws_region, role_arn, LAMBDA_TIMEOUT, LAMBDA_MEMORY_SIZE, environment_vars)
+        config_digest = secret_fingerprint(config)
+        live = inventory.get(prefixed_func_name)
+        if live is None:
+            update_code = update_config = True
+        else:
+            # The live tags decide; the manifest only says whether the run is incremental.
+            # An image is pushed again unless incremental, as its tag (e.g. :latest) may
+            # point to a new image; a configuration only if its fingerprint differs.
+            # An untagged function matches neither, so both are pushed and it is tagged
+            update_code = manifest is None or live.get(LAMBDA_CODE_TAG) != code_digest
+            update_config = not fingerprint_matches(live.get(LAMBDA_CONFIG_TAG), config)
+        if not update_code and not update_config:
+            print(f"{prefixed_func_name} unchanged since last deployment, skipped")
+            continue
+        tags = {LAMBDA_WORKFLOW_TAG: workflow_name, LAMBDA_CODE_TAG: code_digest,
+                LAMBDA_CONFIG_TAG: config_digest if update_config else live[LAMBDA_CONFIG_TAG]}
+        if not tagged or (live is not None and all(live.get(key) == value for key, value in tags.items())):
+            tags = None
+        pending[action_name] = (prefixed_func_name, container_image, update_code, update_config,
+                                live is not None, tags)
+    
+    if not pending:
+        print(f"All {len(lambda_actions)} Lambda actions unchanged since last deployment, skipping")
+        return
+    
+    def deploy_action(action_name):
+        prefixed_func_name, container_image, update_code, update_config, exists, tags = pending[action_name]
+        
+        try:
+            with tracing.span('deploy_action', platform='lambda', action=action_name):
+                deploy_lambda_action(lambda_client, prefixed_func_name, container_image, role_arn, environment_vars,
+                                     update_code=update_code, update_config=update_config, exists=exists,
+                                     tags=tags)
         except Exception as e:
             print(f"Error deploying {prefixed_func_name} to AWS: {str(e)}")
             # Print additional debugging information
@@ -610,7 +988,19 @@ def deploy_to_aws(workflow_data):
                 print("Consider reducing workflow complexity or using external storage")
             elif "InvalidParameterValueException" in str(e):
                 print("Check Lambda configuration parameters (memory, timeout, role)")
-            sys.exit(1)
+            raise
+    
+    # Deploy actions in parallel; every action runs to completion before failures are reported
+    failed = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(deploy_action, action_name): action_name
+                   for action_name in pending}
+        for future, action_name in futures.items():
+            if future.exception() is not None:
+                failed.append(action_name)
+    
+    if failed:
+        raise DeploymentError(f"Failed to deploy {len(failed)} Lambda action(s): {', '.join(failed)}")
 
 
 def get_openwhisk_credentials(workflow_data):
@@ -623,12 +1013,82 @@ def get_openwhisk_credentials(workflow_data):
                 server_config['SSL'].lower() == 'true'
             )
     
-    print("Error: No OpenWhisk server configuration found in workflow data")
-    sys.exit(1)
+    raise DeploymentError("No OpenWhisk server configuration found in workflow data")
+
+# Concurrent action upserts per OpenWhisk deployment
+OW_DEPLOY_WORKERS = 8
+
+# Largest page the OpenWhisk controller returns for a collection listing
+OW_LIST_LIMIT = 200
+
+# Whether to verify the controller's TLS certificate. Off by default: controllers
+# commonly use self-signed certificates, and the wsk CLI this backend replaced
+# always ran with --insecure
+OW_VERIFY_TLS = os.getenv('FAASR_OW_VERIFY_TLS', 'false').lower() == 'true'
+
+def openwhisk_actions_url(api_host, namespace):
+    """Returns the REST URL of a namespace's actions; an api_host without a scheme is reached over HTTPS."""
+    if not api_host.startswith(('http://', 'https://')):
+        api_host = f"https://{api_host}"
+    return f"{api_host.rstrip('/')}/api/v1/namespaces/{quote(namespace, safe='')}/actions"
+
+def list_ow_actions(actions_url, auth=None, verify=True):
+    """
+    Lists the action names of a namespace, one GET per OW_LIST_LIMIT actions
 
-def deploy_to_ow(workflow_data):
+    Returns:
+        set -- action names
+    """
+    names = set()
+    skip = 0
+    while True:
+        with tracing.span('openwhisk.list_actions', platform='openwhisk', skip=skip) as span:
+            response = resilience.call(resilience.endpoint_name('openwhisk', actions_url), http_pool.request,
+                                       'GET', actions_url, params={'limit': OW_LIST_LIMIT, 'skip': skip},
+                                       auth=auth, verify=verify)
+            span.set(status=response.status_code)
+        if response.status_code != 200:
+            raise DeploymentError(f"OpenWhisk returned {response.status_code} listing actions: {response.text}")
+        page = response.json()
+        names.update(action['name'] for action in page)
+        if len(page) < OW_LIST_LIMIT:
+            return names
+        skip += OW_LIST_LIMIT
+
+def deploy_ow_action(actions_url, action_name, container_image, auth=None, verify=True):
+    """
+    Creates or updates a docker (blackbox) action with a single PUT. overwrite=true
+    makes the call an idempotent upsert: the controller keeps the limits,
+    parameters and annotations of an existing action, like `wsk action update`
+
+    Arguments:
+        actions_url: URL returned by openwhisk_actions_url
+        action_name: action name
+        container_image: docker image to run
+        auth: (username, password) for HTTP Basic Auth, None without authentication
+        verify: whether to verify the controller's TLS certificate
+    """
+    with tracing.span('openwhisk.put_action', platform='openwhisk', function=action_name) as span:
+        response = resilience.call(
+            resilience.endpoint_name('openwhisk', actions_url),
+            http_pool.request,
+            'PUT', f"{actions_url}/{quote(action_name, safe='')}",
+            params={'overwrite': 'true'},
+            json={'exec': {'kind': 'blackbox', 'image': container_image}},
+            auth=auth,
+            verify=verify
+        )
+        span.set(status=response.status_code)
+    if response.status_code != 200:
+        try:
+            message = response.json().get('error')
+        except ValueError:
+            message = None
+        raise DeploymentError(f"OpenWhisk returned {response.status_code}: {message or response.text}")
+
+def deploy_to_ow(workflow_data, manifest=None, max_workers=OW_DEPLOY_WORKERS):
     # Get OpenWhisk credentials
-    api_host, namespace, ssl = get_openwhisk_credentials(workflow_data)
+    api_host, namespace, _ = get_openwhisk_credentials(workflow_data)
     
     # Get the workflow name for prefixing
     workflow_name = workflow_data.get('WorkflowName', 'default')
@@ -646,67 +1106,211 @@ def deploy_to_ow(workflow_data):
     if not ow_actions:
         print("No actions found for OpenWhisk deployment")
         return
-
     
-    # Set up wsk properties
-    subprocess.run(f"wsk property set --apihost {api_host}", shell=True)
-    
-    # Set authentication using API key from environment variable
+    # Authenticate with the API key from the environment
     ow_api_key = os.getenv('OW_API_KEY')
     if ow_api_key:
-        subprocess.run(f"wsk property set --auth {ow_api_key}", shell=True)
+        username, separator, password = ow_api_key.partition(':')
+        if not separator:
+            raise DeploymentError("OW_API_KEY should be in format 'username:password'")
+        auth = (username, password)
         print("Using OpenWhisk with API key authentication")
     else:
+        auth = None
         print("Using OpenWhisk without authentication")
     
-    # Always use insecure flag to bypass certificate issues
-    subprocess.run("wsk property set --insecure", shell=True)
-    
-    # Set environment variable to handle certificate issue
-    env = os.environ.copy()
-    env['GODEBUG'] = 'x509ignoreCN=0'
+    actions_url = openwhisk_actions_url(api_host, namespace)
+    verify = OW_VERIFY_TLS
+    if not verify:
+        print(f"Not verifying the TLS certificate of {api_host} (--ow-verify-tls or FAASR_OW_VERIFY_TLS=true to verify)")
     
-    # Process each action in the workflow
-    for action_name, action_data in ow_actions.items():
+    # urllib3 warns on every unverified request. The filter is removed again when
+    # this backend returns, so unverified requests made later still warn; while it
+    # runs, the other backends only make verified requests
+    with warnings.catch_warnings():
+        if not verify:
+            warnings.filterwarnings('ignore', message='Unverified HTTPS request')
+        
+        # One listing of the namespace; an action the manifest knows but the controller
+        # does not (e.g. deleted by hand) is deployed again
         try:
-            actual_func_name = action_data['FunctionName']
-            
-            # Create prefixed function name using workflow_name-action_name format
+            inventory = list_ow_actions(actions_url, auth=auth, verify=verify)
+        except DeploymentError:
+            raise
+        except Exception as e:
+            raise DeploymentError(f"Error listing OpenWhisk actions: {str(e)}") from e
+        
+        # Skip actions whose image and target are unchanged since the last deployment
+        pending = {}
+        for action_name in ow_actions:
             prefixed_func_name = f"{json_prefix}-{action_name}"
-            
-            # Create or update OpenWhisk action using wsk CLI
+            container_image = workflow_data.get('ActionContainers', {}).get(action_name, 'ghcr.io/faasr/openwhisk-tidyverse')
+            digest = content_hash(api_host, namespace, container_image)
+            exists = prefixed_func_name in inventory
+            if exists and is_unchanged(manifest, 'openwhisk', prefixed_func_name, digest):
+                print(f"{prefixed_func_name} unchanged since last deployment, skipped")
+            else:
+                pending[action_name] = (prefixed_func_name, container_image, digest, exists)
+        
+        if not pending:
+            print("All OpenWhisk actions unchanged since last deployment, skipping")
+            return
+        
+        def deploy_action(action_name):
+            prefixed_func_name, container_image, digest, exists = pending[action_name]
+            print(f"{'Updating' if exists else 'Creating'} OpenWhisk action {prefixed_func_name}")
             try:
-                # First check if action exists (add --insecure flag)
-                check_cmd = f"wsk action get {prefixed_func_name} --insecure >/dev/null 2>&1"
-                exists = subprocess.run(check_cmd, shell=True, env=env).returncode == 0
-                
-                # Get container image, with fallback to default
-                container_image = workflow_data.get('ActionContainers', {}).get(action_name, 'ghcr.io/faasr/openwhisk-tidyverse')
-                
-                if exists:
-                    # Update existing action (add --insecure flag)
-                    cmd = f"wsk action update {prefixed_func_name} --docker {container_image} --insecure"
-                else:
-                    # Create new action (add --insecure flag)
-                    cmd = f"wsk action create {prefixed_func_name} --docker {container_image} --insecure"
-                
-                result = subprocess.run(cmd, shell=True, capture_output=True, text=True, env=env)
-                
-                if result.returncode != 0:
-                    raise Exception(f"Failed to {'update' if exists else 'create'} action: {result.stderr}")
-                
-                print(f"Successfully deployed {prefixed_func_name} to OpenWhisk")
-                
+                with tracing.span('deploy_action', platform='openwhisk', action=action_name):
+                    deploy_ow_action(actions_url, prefixed_func_name, container_image, auth=auth, verify=verify)
             except Exception as e:
                 print(f"Error deploying {prefixed_func_name} to OpenWhisk: {str(e)}")
-                sys.exit(1)
-                
+                raise
+            
+            print(f"Successfully deployed {prefixed_func_name} to OpenWhisk")
+            if manifest is not None:
+                manifest.record('openwhisk', prefixed_func_name, digest)
+        
+        # Upsert actions in parallel over the pooled session; every action runs to completion before failures are reported
+        failed = []
+        with ThreadPoolExecutor(max_workers=min(max_workers, http_pool.pool_maxsize())) as executor:
+            futures = {executor.submit(deploy_action, action_name): action_name
+                       for action_name in pending}
+            for future, action_name in futures.items():
+                if future.exception() is not None:
+                    failed.append(action_name)
+        
+        if failed:
+            raise DeploymentError(f"Failed to deploy {len(failed)} OpenWhisk action(s): {', '.join(failed)}")
+
+class PlatformOutput:
+    """
+    sys.stdout proxy that tags each line written by a deploy worker thread with
+    the platform it belongs to, so concurrent backends produce a readable log
+
+    Arguments:
+        stream: underlying text stream that receives the tagged lines
+    """
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def bind(self, platform):
+        self._local.platform = platform
+        self._local.pending = ""
+
+    def unbind(self):
+        pending = getattr(self._local, 'pending', "")
+        if pending:
+            self._emit(getattr(self._local, 'platform', None), pending)
+        self._local.platform = None
+        self._local.pending = ""
+
+    def _emit(self, platform, line):
+        with self._lock:
+            self._stream.write(f"[{platform}] {line}\n" if platform else f"{line}\n")
+            self._stream.flush()
+
+    def write(self, text):
+        # Buffer partial lines per thread so lines from concurrent workers never
+        # interleave; threads started by a backend's own pool are left untagged
+        platform = getattr(self._local, 'platform', None)
+        lines = (getattr(self._local, 'pending', "") + text).split("\n")
+        self._local.pending = lines.pop()
+        for line in lines:
+            self._emit(platform, line)
+        return len(text)
+
+    def flush(self):
+        self._stream.flush()
+
+
+# Canonical backend for each accepted FaaSType spelling
+PLATFORM_BACKENDS = {
+    'lambda': ('lambda', deploy_to_aws),
+    'aws_lambda': ('lambda', deploy_to_aws),
+    'aws': ('lambda', deploy_to_aws),
+    'githubactions': ('githubactions', deploy_to_github),
+    'github_actions': ('githubactions', deploy_to_github),
+    'github': ('githubactions', deploy_to_github),
+    'openwhisk': ('openwhisk', deploy_to_ow),
+    'open_whisk': ('openwhisk', deploy_to_ow),
+    'ow': ('openwhisk', deploy_to_ow),
+}
+
+def deploy_platforms(workflow_data, faas_types, sequential=False, manifest=None):
+    """
+    Runs the deploy backend of every platform in faas_types, concurrently unless
+    sequential is set. A failing backend never interrupts the others
+
+    Arguments:
+        workflow_data: workflow dict
+        faas_types: set of lowercase FaaSType names found in ComputeServers
+        sequential: deploy one platform at a time
+        manifest: DeploymentManifest for incremental deployment, or None
+    Returns:
+        dict -- platform: (error or None, elapsed seconds)
+    """
+    backends = {}
+    for faas_type in sorted(faas_types):
+        if faas_type not in PLATFORM_BACKENDS:
+            print(f"Warning: Unknown FaaSType '{faas_type}' - skipping")
+            continue
+        platform, deploy = PLATFORM_BACKENDS[faas_type]
+        backends[platform] = deploy
+
+    concurrent = not sequential and len(backends) > 1
+    output = PlatformOutput(sys.stdout) if concurrent else None
+
+    def run(platform, deploy):
+        start = time.monotonic()
+        if output:
+            output.bind(platform)
+        else:
+            print(f"\nDeploying to {platform}...")
+        try:
+            with tracing.span('deploy', platform=platform):
+                deploy(workflow_data, manifest=manifest)
+            error = None
         except Exception as e:
-            print(f"Error processing {prefixed_func_name}: {str(e)}")
-            sys.exit(1)
+            error = e
+            print(f"✗ {e}")
+        finally:
+            if output:
+                output.unbind()
+        return error, time.monotonic() - start
+
+    if not concurrent:
+        return {platform: run(platform, deploy) for platform, deploy in backends.items()}
+
+    print(f"Deploying to {', '.join(backends)} concurrently...")
+    saved_stdout = sys.stdout
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=len(backends)) as executor:
+            futures = {platform: executor.submit(run, platform, deploy)
+                       for platform, deploy in backends.items()}
+            return {platform: future.result() for platform, future in futures.items()}
+    finally:
+        sys.stdout = saved_stdout
+
+def print_deployment_report(results):
+    """Print one summary line per platform; returns True if every platform succeeded."""
+    print("\nDeployment summary:")
+    for platform, (error, elapsed) in results.items():
+        if error is None:
+            print(f"  ✓ {platform} ({elapsed:.1f}s)")
+        else:
+            print(f"  ✗ {platform} ({elapsed:.1f}s): {error}")
+    for line in resilience.summary():
+        print(f"  {line}")
+    return all(error is None for error, _ in results.values())
 
 def main():
+    global OW_VERIFY_TLS
     args = parse_arguments()
+    OW_VERIFY_TLS = args.ow_verify_tls
+    tracing.configure(args.trace, args.otlp_endpoint, args.trace_summary, service_name='faasr-register')
     workflow_data = read_workflow_file(args.workflow_file)
     
     # Store the workflow file path in the workflow data
@@ -715,12 +1319,27 @@ def main():
     # Validate workflow for cycles and unreachable states
     print("Validating workflow for cycles and unreachable states...")
     try:
-        check_dag(workflow_data)
+        with tracing.span('validate_dag', actions=len(workflow_data.get('ActionList', {}))):
+            check_dag(workflow_data)
         print("✓ Workflow validation passed - no cycles or unreachable states found")
     except SystemExit:
         print("✗ Workflow validation failed - check logs for details")
         sys.exit(1)
     
+    # Compile the workflow graph once and store it next to the workflow file,
+    # keyed by the file hash, so invoke_workflow.py can load it directly
+    with tracing.span('compile_graph', actions=len(workflow_data.get('ActionList', {}))):
+        graph = WorkflowGraph.compile(workflow_data, workflow_file_hash(args.workflow_file))
+    try:
+        with tracing.span('save_graph', file=args.workflow_file):
+            artifact_path = save_workflow_graph(graph, args.workflow_file)
+        print(f"Saved compiled workflow graph ({len(graph)} actions) to {artifact_path}")
+    except OSError as e:
+        print(f"Warning: could not save compiled workflow graph: {str(e)}")
+    
+    # Ship the predecessor index of every action in SECRET_PAYLOAD
+    workflow_data['PredecessorIndex'] = graph.predecessor_index()
+    
     # Get all unique FaaSTypes from workflow data
     faas_types = set()
     for server in workflow_data.get('ComputeServers', {}).values():
@@ -733,17 +1352,15 @@ def main():
     
     print(f"Found FaaS platforms: {', '.join(faas_types)}")
     
+    # Load the record of the previous deployment when only changes should be pushed
+    manifest = load_manifest(workflow_data, args.manifest) if args.incremental else None
+    
     # Deploy to each platform found
-    for faas_type in faas_types:
-        print(f"\nDeploying to {faas_type}...")
-        if faas_type in ['lambda', 'aws_lambda', 'aws']:
-            deploy_to_aws(workflow_data)
-        elif faas_type in ['githubactions', 'github_actions', 'github']:
-            deploy_to_github(workflow_data)
-        elif faas_type in ['openwhisk', 'open_whisk', 'ow']:
-            deploy_to_ow(workflow_data)
-        else:
-            print(f"Warning: Unknown FaaSType '{faas_type}' - skipping")
+    results = deploy_platforms(workflow_data, faas_types, sequential=args.sequential, manifest=manifest)
+    if manifest is not None:
+        save_manifest(workflow_data, manifest, args.manifest)
+    if not print_deployment_report(results):
+        sys.exit(1)
     
 
 if __name__ == '__main__':
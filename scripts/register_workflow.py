@@ -4,24 +4,25 @@ import argparse
 import json
 import os
 import sys
-import boto3
-from github import Github
-import base64
-import tempfile
-import shutil
-import subprocess
-import requests
+import github_client
 import time
+import tracing
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description='Deploy FaaSr functions to specified platform')
     parser.add_argument('--workflow-file', required=True,
                       help='Path to the workflow JSON file')
+    parser.add_argument('--trace',
+                      help='Append a JSON timing span per phase and remote call to this file')
+    parser.add_argument('--otlp-endpoint',
+                      help='Export the timing spans as OTLP/HTTP JSON to this collector')
+    parser.add_argument('--trace-summary', action='store_true',
+                      help='Print where the time went, per action, when the run ends')
     return parser.parse_args()
 
 def read_workflow_file(file_path):
     try:
-        with open(file_path, 'r') as f:
+        with tracing.span('read_workflow', file=file_path), open(file_path, 'r') as f:
             return json.load(f)
     except FileNotFoundError:
         print(f"Error: Workflow file {file_path} not found")
@@ -51,17 +52,17 @@ def get_aws_credentials():
     
     return aws_access_key, aws_secret_key, aws_region, role_arn
 
+GITHUB_API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+
 def set_github_variable(repo_full_name, var_name, var_value, github_token):
-    url = f"https://api.github.com/repos/{repo_full_name}/actions/variables/{var_name}"
-    headers = {
-        "Authorization": f"Bearer {github_token}",
-        "Accept": "application/vnd.github+json"
-    }
+    url = f"{GITHUB_API_URL}/repos/{repo_full_name}/actions/variables"
     data = {"name": var_name, "value": var_value}
-    # Try to update, if not found, create
-    r = requests.patch(url, headers=headers, json=data)
-    if r.status_code == 404:
-        r = requests.post(f"https://api.github.com/repos/{repo_full_name}/actions/variables", headers=headers, json=data)
+    # Try to update, if not found, create; github_client waits out rate limits
+    with tracing.span('github.set_variable', platform='githubactions', variable=var_name) as span:
+        r = github_client.request('PATCH', f"{url}/{var_name}", github_token, json=data)
+        if r.status_code == 404:
+            r = github_client.request('POST', url, github_token, json=data)
+        span.set(status=r.status_code)
     if not r.ok:
         print(f"Failed to set variable {var_name}: {r.text}")
     else:
@@ -70,13 +71,16 @@ def set_github_variable(repo_full_name, var_name, var_value, github_token):
 def ensure_github_secrets_and_vars(repo, required_secrets, required_vars, github_token):
     """Set GitHub secrets and variables for the repository."""
     # Check and set secrets
-    existing_secrets = {s.name for s in repo.get_secrets()}
+    with tracing.span('github.list_secrets', platform='githubactions'):
+        existing_secrets = {s.name for s in repo.get_secrets()}
     for secret_name, secret_value in required_secrets.items():
         if secret_name not in existing_secrets:
             print(f"Setting secret: {secret_name}")
         else:
             print(f"Secret {secret_name} already exists, updating it.")
-        repo.create_secret(secret_name, secret_value)
+        with tracing.span('github.create_secret', platform='githubactions', secret=secret_name,
+                          bytes=len(secret_value)):
+            repo.create_secret(secret_name, secret_value)
 
     # Set variables using REST API
     for var_name, var_value in required_vars.items():
@@ -146,8 +150,11 @@ def create_secret_payload(workflow_data):
 
 def deploy_to_github(workflow_data):
     """Deploy functions to GitHub Actions."""
+    # Platform SDKs are imported on first use so other platforms do not pay for them
+    from github import Github
+    
     github_token = get_github_token()
-    g = Github(github_token)
+    g = Github(github_token, base_url=GITHUB_API_URL)
     
     # Get the current repository name from the workflow file path
     workflow_file = workflow_data['_workflow_file']
@@ -173,14 +180,17 @@ def deploy_to_github(workflow_data):
         return
     
     try:
-        repo = g.get_repo(repo_name)
+        with tracing.span('github.get_repo', platform='githubactions'):
+            repo = g.get_repo(repo_name)
         
         # Get the default branch name
         default_branch = repo.default_branch
         print(f"Using branch: {default_branch}")
         
         # Create secret payload and set up secrets/variables
-        secret_payload = create_secret_payload(workflow_data)
+        with tracing.span('build_secret_payload') as span:
+            secret_payload = create_secret_payload(workflow_data)
+            span.set(bytes=len(secret_payload))
         required_secrets = {"SECRET_PAYLOAD": secret_payload}
         vars = {f"{json_prefix}_PAYLOAD_REPO": f"{repo_name}/{json_prefix}.json"}
         
@@ -222,7 +232,8 @@ jobs:
             workflow_path = f".github/workflows/{func_name}.yml"
             try:
                 # Try to get the file first
-                contents = repo.get_contents(workflow_path)
+                with tracing.span('github.get_contents', platform='githubactions', action=func_name):
+                    contents = repo.get_contents(workflow_path)
                 existing_content = contents.decoded_content.decode('utf-8')
                 
                 # Check if content has changed
@@ -231,24 +242,28 @@ jobs:
                 else:
                     # If file exists and content is different, update it
                     print(f"File {workflow_path} exists, updating...")
-                    repo.update_file(
-                        path=workflow_path,
-                        message=f"Update workflow for {func_name}",
-                        content=workflow_content,
-                        sha=contents.sha,
-                        branch=default_branch
-                    )
+                    with tracing.span('github.update_file', platform='githubactions', action=func_name,
+                                      bytes=len(workflow_content)):
+                        repo.update_file(
+                            path=workflow_path,
+                            message=f"Update workflow for {func_name}",
+                            content=workflow_content,
+                            sha=contents.sha,
+                            branch=default_branch
+                        )
                     print(f"Successfully updated {workflow_path}")
             except Exception as e:
                 if "Not Found" in str(e) or "404" in str(e):
                     # If file doesn't exist, create it
                     print(f"File {workflow_path} doesn't exist, creating...")
-                    repo.create_file(
-                        path=workflow_path,
-                        message=f"Add workflow for {func_name}",
-                        content=workflow_content,
-                        branch=default_branch
-                    )
+                    with tracing.span('github.create_file', platform='githubactions', action=func_name,
+                                      bytes=len(workflow_content)):
+                        repo.create_file(
+                            path=workflow_path,
+                            message=f"Add workflow for {func_name}",
+                            content=workflow_content,
+                            branch=default_branch
+                        )
                     print(f"Successfully created {workflow_path}")
                 else:
                     print(f"Error updating/creating {workflow_path}: {str(e)}")
@@ -266,6 +281,8 @@ jobs:
         sys.exit(1)
 
 def deploy_to_aws(workflow_data):
+    import boto3
+    
     # Get AWS credentials
     aws_access_key, aws_secret_key, aws_region, role_arn = get_aws_credentials()
     
@@ -277,7 +294,9 @@ def deploy_to_aws(workflow_data):
     )
     
     # Create secret payload (same as GitHub deployment)
-    secret_payload = create_secret_payload(workflow_data)
+    with tracing.span('build_secret_payload') as span:
+        secret_payload = create_secret_payload(workflow_data)
+        span.set(bytes=len(secret_payload))
     
     # Filter functions that should be deployed to AWS Lambda
     lambda_functions = {}
@@ -310,54 +329,59 @@ def deploy_to_aws(workflow_data):
             
             # Create or update Lambda function
             try:
-                lambda_client.create_function(
-                    FunctionName=func_name,
-                    PackageType='Image',
-                    Code={'ImageUri': '145342739029.dkr.ecr.us-east-1.amazonaws.com/aws-lambda-tidyverse:latest'},
-                    Role=role_arn,
-                    Timeout=900,  
-                    MemorySize=1024,  
-                    Environment={'Variables': environment_vars}
-                )
+                with tracing.span('lambda.create_function', platform='lambda', action=func_name):
+                    lambda_client.create_function(
+                        FunctionName=func_name,
+                        PackageType='Image',
+                        Code={'ImageUri': '145342739029.dkr.ecr.us-east-1.amazonaws.com/aws-lambda-tidyverse:latest'},
+                        Role=role_arn,
+                        Timeout=900,  
+                        MemorySize=1024,  
+                        Environment={'Variables': environment_vars}
+                    )
                 print(f"Successfully created {func_name} on AWS Lambda")
             except lambda_client.exceptions.ResourceConflictException:
                 # Update existing function
-                lambda_client.update_function_code(
-                    FunctionName=func_name,
-                    ImageUri='145342739029.dkr.ecr.us-east-1.amazonaws.com/aws-lambda-tidyverse:latest'
-                )
+                with tracing.span('lambda.update_function_code', platform='lambda', action=func_name):
+                    lambda_client.update_function_code(
+                        FunctionName=func_name,
+                        ImageUri='145342739029.dkr.ecr.us-east-1.amazonaws.com/aws-lambda-tidyverse:latest'
+                    )
                 
                 # Wait for the function update to complete
                 print(f"Waiting for {func_name} code update to complete...")
                 max_attempts = 60  # Wait up to 5 minutes
                 attempt = 0
-                while attempt < max_attempts:
-                    try:
-                        response = lambda_client.get_function(FunctionName=func_name)
-                        state = response['Configuration']['State']
-                        last_update_status = response['Configuration']['LastUpdateStatus']
-                        
-                        if state == 'Active' and last_update_status == 'Successful':
-                            break
-                        elif state == 'Failed' or last_update_status == 'Failed':
-                            sys.exit(1)
-                        else:
+                with tracing.span('lambda.wait_ready', platform='lambda', action=func_name) as span:
+                    while attempt < max_attempts:
+                        span.set(polls=attempt + 1)
+                        try:
+                            response = lambda_client.get_function(FunctionName=func_name)
+                            state = response['Configuration']['State']
+                            last_update_status = response['Configuration']['LastUpdateStatus']
+                            
+                            if state == 'Active' and last_update_status == 'Successful':
+                                break
+                            elif state == 'Failed' or last_update_status == 'Failed':
+                                sys.exit(1)
+                            else:
+                                time.sleep(5)
+                                attempt += 1
+                        except Exception as e:
+                            print(f"Error checking function state: {str(e)}")
                             time.sleep(5)
                             attempt += 1
-                    except Exception as e:
-                        print(f"Error checking function state: {str(e)}")
-                        time.sleep(5)
-                        attempt += 1
                 
                 if attempt >= max_attempts:
                     print(f"Timeout waiting for {func_name} update to complete")
                     sys.exit(1)
                 
                 # Now update environment variables
-                lambda_client.update_function_configuration(
-                    FunctionName=func_name,
-                    Environment={'Variables': environment_vars}
-                )
+                with tracing.span('lambda.update_function_configuration', platform='lambda', action=func_name):
+                    lambda_client.update_function_configuration(
+                        FunctionName=func_name,
+                        Environment={'Variables': environment_vars}
+                    )
                 print(f"Successfully updated {func_name} on AWS Lambda")
             
         except Exception as e:
@@ -385,6 +409,8 @@ def get_openwhisk_credentials(workflow_data):
     sys.exit(1)
 
 def deploy_to_ow(workflow_data):
+    import subprocess
+    
     # Get OpenWhisk credentials
     api_host, namespace, ssl = get_openwhisk_credentials(workflow_data)
     
@@ -433,7 +459,8 @@ def deploy_to_ow(workflow_data):
             try:
                 # First check if action exists (add --insecure flag)
                 check_cmd = f"wsk action get {func_name} --insecure >/dev/null 2>&1"
-                exists = subprocess.run(check_cmd, shell=True, env=env).returncode == 0
+                with tracing.span('openwhisk.get_action', platform='openwhisk', action=func_name):
+                    exists = subprocess.run(check_cmd, shell=True, env=env).returncode == 0
                 
                 # Get container image, with fallback to default
                 container_image = workflow_data.get('ActionContainers', {}).get(func_name, 'ghcr.io/faasr/openwhisk-tidyverse')
@@ -445,7 +472,9 @@ def deploy_to_ow(workflow_data):
                     # Create new action (add --insecure flag)
                     cmd = f"wsk action create {func_name} --docker {container_image} --insecure"
                 
-                result = subprocess.run(cmd, shell=True, capture_output=True, text=True, env=env)
+                with tracing.span('openwhisk.put_action', platform='openwhisk', action=func_name) as span:
+                    result = subprocess.run(cmd, shell=True, capture_output=True, text=True, env=env)
+                    span.set(status=result.returncode)
                 
                 if result.returncode != 0:
                     raise Exception(f"Failed to {'update' if exists else 'create'} action: {result.stderr}")
@@ -462,6 +491,7 @@ def deploy_to_ow(workflow_data):
 
 def main():
     args = parse_arguments()
+    tracing.configure(args.trace, args.otlp_endpoint, args.trace_summary, service_name='faasr-register')
     workflow_data = read_workflow_file(args.workflow_file)
     
     # Store the workflow file path in the workflow data
@@ -482,14 +512,15 @@ def main():
     # Deploy to each platform found
     for faas_type in faas_types:
         print(f"\nDeploying to {faas_type}...")
-        if faas_type in ['lambda', 'aws_lambda', 'aws']:
-            deploy_to_aws(workflow_data)
-        elif faas_type in ['githubactions', 'github_actions', 'github']:
-            deploy_to_github(workflow_data)
-        elif faas_type in ['openwhisk', 'open_whisk', 'ow']:
-            deploy_to_ow(workflow_data)
-        else:
-            print(f"Warning: Unknown FaaSType '{faas_type}' - skipping")
+        with tracing.span('deploy', platform=faas_type):
+            if faas_type in ['lambda', 'aws_lambda', 'aws']:
+                deploy_to_aws(workflow_data)
+            elif faas_type in ['githubactions', 'github_actions', 'github']:
+                deploy_to_github(workflow_data)
+            elif faas_type in ['openwhisk', 'open_whisk', 'ow']:
+                deploy_to_ow(workflow_data)
+            else:
+                print(f"Warning: Unknown FaaSType '{faas_type}' - skipping")
     
 
 if __name__ == '__main__':
@@ -0,0 +1,280 @@
+"""
+Retries, backoff with jitter, deadlines and circuit breaking for the remote
+calls of the FaaSr scripts
+
+call() runs one remote operation against a named endpoint, e.g.
+'lambda:us-east-1' or 'openwhisk:host:443':
+
+    response = resilience.call('openwhisk:' + host, http_pool.post, url, data=body,
+                               idempotent=False)
+
+A failure is retried when it is transient for its backend: HTTP 429/5xx,
+Lambda throttling (TooManyRequestsException, ...) or a function that is still
+being updated, and connection errors. Calls that are not idempotent (a
+workflow_dispatch, a Lambda or OpenWhisk invocation, create_function) are only
+retried when the failure shows the request was not processed: 429, 503,
+throttling, or no connection. A 502 or a read timeout after the request went
+out could otherwise start an action twice. The wait before attempt n is drawn
+uniformly from [0, min(max_delay, base_delay * 2**n)] ("full jitter").
+
+No retry starts after the call's deadline. An attempt in flight is not
+interrupted, so operations that wait inside an attempt are given the time
+left through deadline_arg: github_client then stops waiting out rate limits
+at the deadline. The deadline is still not a hard bound on latency: an attempt
+may take up to the HTTP timeout past it, and the time github_client holds a
+request back before sending it (dispatch pacing, or a spent rate-limit budget
+waiting for its reset; queueing by design, see github_client.py) is not
+counted against it.
+
+Each endpoint has a circuit breaker. After FAASR_BREAKER_THRESHOLD consecutive
+transient failures it opens, and calls fail immediately with CircuitOpenError
+for FAASR_BREAKER_RESET seconds; then one trial call is let through, and its
+outcome closes or reopens the breaker. A degraded platform thus sheds load
+instead of holding every worker in retries.
+
+Transport-level retries (urllib3 for idempotent HTTP requests in http_pool,
+botocore's own retry handler) still run underneath each attempt.
+
+Settings can be changed with configure() or the environment:
+    FAASR_RETRY_ATTEMPTS     attempts per call, including the first (default 4)
+    FAASR_RETRY_BASE_DELAY   seconds (default 0.5)
+    FAASR_RETRY_MAX_DELAY    seconds (default 20)
+    FAASR_CALL_DEADLINE      seconds a call may take across attempts (default 120)
+    FAASR_BREAKER_THRESHOLD  consecutive failures that open a breaker (default 5)
+    FAASR_BREAKER_RESET      seconds a breaker stays open (default 30)
+"""
+
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+# HTTP statuses worth retrying for idempotent calls
+RETRYABLE_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+# HTTP statuses that mean the request was rejected without being processed
+NOT_PROCESSED_STATUS_CODES = frozenset([429, 503])
+
+# AWS error codes of throttled (not processed) requests
+AWS_THROTTLING_CODES = frozenset([
+    'TooManyRequestsException', 'ThrottlingException', 'Throttling', 'ThrottledException',
+    'RequestLimitExceeded', 'EC2ThrottledException', 'SlowDown', 'RequestThrottledException',
+])
+
+# AWS error codes of server-side failures, retried for idempotent calls
+AWS_SERVER_ERROR_CODES = frozenset([
+    'ServiceException', 'ServiceUnavailableException', 'InternalFailure', 'InternalError',
+    'ServiceUnavailable',
+])
+
+# Connection errors raised before the request was sent
+CONNECT_ERRORS = frozenset(['ConnectTimeout', 'ConnectTimeoutError', 'EndpointConnectionError',
+                            'NewConnectionError'])
+
+# Connection errors that may happen after the request was sent
+TRANSPORT_ERRORS = frozenset(['ConnectionError', 'Timeout', 'ReadTimeout', 'ReadTimeoutError',
+                              'ConnectionClosedError', 'ChunkedEncodingError'])
+
+_settings = {
+    'attempts': int(os.getenv('FAASR_RETRY_ATTEMPTS', '4')),
+    'base_delay': float(os.getenv('FAASR_RETRY_BASE_DELAY', '0.5')),
+    'max_delay': float(os.getenv('FAASR_RETRY_MAX_DELAY', '20')),
+    'deadline': float(os.getenv('FAASR_CALL_DEADLINE', '120')),
+    'breaker_threshold': int(os.getenv('FAASR_BREAKER_THRESHOLD', '5')),
+    'breaker_reset': float(os.getenv('FAASR_BREAKER_RESET', '30')),
+}
+_breakers = {}
+_counters = {}
+_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """Raised by call() while the circuit breaker of its endpoint is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker of one endpoint."""
+
+    def __init__(self, endpoint, threshold, reset_timeout):
+        self.endpoint = endpoint
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """Returns True if a call may go out; while half-open only one trial call does."""
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if self.trial or time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.trial = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial = False
+
+    def record_failure(self):
+        """Counts a transient failure; returns True if it opened the breaker."""
+        with self.lock:
+            self.failures += 1
+            reopened = self.trial
+            self.trial = False
+            if reopened or (self.opened_at is None and self.failures >= self.threshold):
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+def configure(**settings):
+    """Changes retry and breaker settings (keys as in _settings); breakers start over."""
+    with _lock:
+        for name, value in settings.items():
+            if name not in _settings:
+                raise ValueError(f"Unknown resilience setting: {name}")
+            if value is not None:
+                _settings[name] = value
+        _breakers.clear()
+
+def stats():
+    """Returns {endpoint: {Calls, Retries, Failures, Trips, ShortCircuited}} of this process."""
+    with _lock:
+        return {endpoint: dict(counters) for endpoint, counters in _counters.items()}
+
+def summary():
+    """Returns one line per endpoint that had transient failures, for run summaries."""
+    return [f"{endpoint}: {counters['Calls']} calls, {counters['Failures']} transient failures, "
+            f"{counters['Retries']} retries, {counters['Trips']} breaker trips, "
+            f"{counters['ShortCircuited']} short-circuited"
+            for endpoint, counters in sorted(stats().items())
+            if counters['Failures'] or counters['ShortCircuited']]
+
+def endpoint_name(platform, url):
+    """Returns the endpoint name of a platform's URL, e.g. 'openwhisk:host:443'."""
+    return f"{platform}:{urlsplit(url).netloc}"
+
+def _count(endpoint, name):
+    with _lock:
+        counters = _counters.setdefault(endpoint, {'Calls': 0, 'Retries': 0, 'Failures': 0,
+                                                   'Trips': 0, 'ShortCircuited': 0})
+        counters[name] += 1
+
+def _get_breaker(endpoint):
+    with _lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker(
+                endpoint, _settings['breaker_threshold'], _settings['breaker_reset'])
+        return breaker
+
+def _aws_error(error):
+    response = getattr(error, 'response', None)
+    if not isinstance(response, dict):
+        return None, ''
+    details = response.get('Error', {})
+    return details.get('Code'), details.get('Message', '')
+
+def is_transient(outcome, idempotent=True):
+    """
+    Returns True if outcome (a response with a status_code, or an exception)
+    is a transient failure that is safe to retry
+    """
+    status = getattr(outcome, 'status_code', None)
+    if status is not None:
+        return status in NOT_PROCESSED_STATUS_CODES or (idempotent and status in RETRYABLE_STATUS_CODES)
+    if not isinstance(outcome, BaseException):
+        return False
+
+    code, message = _aws_error(outcome)
+    if code is not None:
+        if code in AWS_THROTTLING_CODES:
+            return True
+        if code == 'ResourceConflictException':
+            # Raised while a function is Pending or being updated, but also for "already exists"
+            return 'already exist' not in message
+        status = outcome.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0)
+        return idempotent and (code in AWS_SERVER_ERROR_CODES or status >= 500)
+
+    names = {cls.__name__ for cls in type(outcome).__mro__}
+    # requests reports a refused connection as a plain ConnectionError
+    if names & CONNECT_ERRORS or 'Failed to establish a new connection' in str(outcome):
+        return True
+    return idempotent and bool(names & TRANSPORT_ERRORS)
+
+def backoff(attempt, base_delay=None, max_delay=None):
+    """Returns a full-jitter backoff delay for a retry after the attempt-th failure."""
+    base_delay = _settings['base_delay'] if base_delay is None else base_delay
+    max_delay = _settings['max_delay'] if max_delay is None else max_delay
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+def jitter(delay):
+    """Returns delay spread over [delay/2, delay], for polling loops."""
+    return delay / 2 + random.uniform(0, delay / 2)
+
+def call(endpoint, fn, *args, idempotent=True, attempts=None, deadline=None, deadline_arg=None, **kwargs):
+    """
+    Calls fn(*args, **kwargs), retrying transient failures with backoff
+
+    Arguments:
+        endpoint: name of the remote endpoint, e.g. 'lambda:us-east-1'
+        fn: remote operation
+        idempotent: whether fn may run twice; if not, only failures that show
+            the request was not processed are retried
+        attempts: attempts including the first (default FAASR_RETRY_ATTEMPTS)
+        deadline: seconds across all attempts (default FAASR_CALL_DEADLINE)
+        deadline_arg: keyword argument of fn that receives the seconds left
+            before the deadline, for operations that wait internally
+    Returns:
+        the result of fn; a response with a transient status is returned once
+        attempts or time run out, so callers keep handling HTTP errors themselves
+    Raises:
+        CircuitOpenError: if the endpoint's breaker is open
+    """
+    attempts = attempts or _settings['attempts']
+    ends_at = time.monotonic() + (deadline or _settings['deadline'])
+    breaker = _get_breaker(endpoint)
+    attempt = 0
+    while True:
+        if not breaker.allow():
+            _count(endpoint, 'ShortCircuited')
+            raise CircuitOpenError(f"Circuit open for {endpoint}: too many consecutive failures, "
+                                   f"retry after {breaker.reset_timeout:.0f}s")
+        attempt += 1
+        _count(endpoint, 'Calls')
+        if deadline_arg:
+            kwargs[deadline_arg] = max(0.0, ends_at - time.monotonic())
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if not is_transient(e, idempotent):
+                # The endpoint answered; the error is the caller's to handle
+                breaker.record_success()
+                raise
+            outcome, error = e, e
+        else:
+            if not is_transient(result, idempotent):
+                breaker.record_success()
+                return result
+            outcome, error = result, None
+
+        _count(endpoint, 'Failures')
+        tripped = breaker.record_failure()
+        if tripped:
+            _count(endpoint, 'Trips')
+            print(f"Circuit opened for {endpoint}")
+        delay = backoff(attempt)
+        if tripped or attempt >= attempts or time.monotonic() + delay >= ends_at:
+            if error is not None:
+                raise error
+            return outcome
+        _count(endpoint, 'Retries')
+        reason = getattr(outcome, 'status_code', None) or type(outcome).__name__
+        print(f"Transient failure calling {endpoint} ({reason}), retrying in {delay:.1f}s "
+              f"({attempt}/{attempts - 1})")
+        time.sleep(delay)
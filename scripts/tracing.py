@@ -0,0 +1,252 @@
+"""
+Structured timing spans for the FaaSr scripts
+
+Every phase and remote call of registration and invocation runs inside a span:
+
+    with tracing.span('lambda.invoke', platform='lambda', action=action_name,
+                      bytes=len(payload)) as span:
+        response = lambda_client.invoke(...)
+        span.set(status=response['StatusCode'])
+
+A finished span records its name, attributes (platform, action, bytes, status,
+...), start time, duration and, within a thread, its parent span, whose
+platform and action it inherits. A span left by an exception gets status
+'error' and the exception type.
+
+Tracing is off unless configure() turns it on (the --trace, --otlp-endpoint and
+--trace-summary options of the scripts) or the environment does:
+    FAASR_TRACE_FILE      append one JSON object per span to this file
+    FAASR_OTLP_ENDPOINT   POST the spans as OTLP/HTTP JSON to this collector
+                          (e.g. http://localhost:4318) when the run ends
+When it is off, span() hands out a shared no-op span.
+
+print_summary() prints where the time went, per action and span name.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+
+_settings = {
+    'enabled': False,
+    'trace_file': None,
+    'otlp_endpoint': None,
+    'service_name': 'faasr',
+}
+# Attributes a span takes from its parent unless given
+INHERITED_ATTRIBUTES = ('platform', 'action')
+
+_spans = []
+_lock = threading.Lock()
+_local = threading.local()
+_trace_id = uuid.uuid4().hex
+
+
+class Span:
+    """A timed operation; attributes can be added until it ends."""
+
+    __slots__ = ('name', 'attributes', 'span_id', 'parent_id', 'start', 'duration', '_t0')
+
+    def __init__(self, name, attributes, parent_id):
+        self.name = name
+        self.attributes = attributes
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.duration = None
+        self._t0 = time.perf_counter()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        record = {
+            'Name': self.name,
+            'TraceID': _trace_id,
+            'SpanID': self.span_id,
+            'ParentID': self.parent_id,
+            'Start': round(self.start, 6),
+            'DurationMs': round(self.duration * 1000, 3),
+        }
+        record.update(self.attributes)
+        return record
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _ActiveSpan:
+    __slots__ = ('span',)
+
+    def __init__(self, span):
+        self.span = span
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, traceback):
+        span = self.span
+        span.duration = time.perf_counter() - span._t0
+        if exc_type is not None:
+            span.attributes.setdefault('status', 'error')
+            span.attributes.setdefault('error', exc_type.__name__)
+        _local.stack.pop()
+        _record(span)
+        return False
+
+
+def configure(trace_file=None, otlp_endpoint=None, summary=False, service_name=None):
+    """
+    Turns tracing on if any output is requested; arguments default to
+    FAASR_TRACE_FILE and FAASR_OTLP_ENDPOINT. With summary, print_summary()
+    runs when the process exits, including after sys.exit()
+    """
+    trace_file = trace_file or os.getenv('FAASR_TRACE_FILE')
+    otlp_endpoint = otlp_endpoint or os.getenv('FAASR_OTLP_ENDPOINT')
+    with _lock:
+        _settings['trace_file'] = trace_file
+        _settings['otlp_endpoint'] = otlp_endpoint
+        if service_name:
+            _settings['service_name'] = service_name
+        enabled = bool(trace_file or otlp_endpoint or summary)
+        if enabled and not _settings['enabled']:
+            atexit.register(flush)
+        _settings['enabled'] = enabled
+    # atexit runs handlers last-in first-out, so the summary comes before the export
+    if summary:
+        atexit.register(print_summary)
+    return enabled
+
+def enabled():
+    return _settings['enabled']
+
+def span(name, **attributes):
+    """
+    Returns a context manager timing name. None-valued attributes are dropped;
+    INHERITED_ATTRIBUTES missing from attributes are taken from the parent span
+    """
+    if not _settings['enabled']:
+        return _NOOP_SPAN
+    attributes = {key: value for key, value in attributes.items() if value is not None}
+    stack = getattr(_local, 'stack', None)
+    parent = stack[-1] if stack else None
+    if parent is not None:
+        for key in INHERITED_ATTRIBUTES:
+            if key not in attributes and key in parent.attributes:
+                attributes[key] = parent.attributes[key]
+    return _ActiveSpan(Span(name, attributes, parent.span_id if parent else None))
+
+def _record(span):
+    record = span.to_dict()
+    with _lock:
+        _spans.append(span)
+        if _settings['trace_file']:
+            with open(_settings['trace_file'], 'a') as f:
+                f.write(json.dumps(record, default=str) + '\n')
+
+def spans():
+    """Returns the finished spans of this process."""
+    with _lock:
+        return list(_spans)
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+def otlp_payload(finished):
+    """Returns finished spans as an OTLP/JSON ExportTraceServiceRequest."""
+    otlp_spans = []
+    for span in finished:
+        start = int(span.start * 1e9)
+        otlp_span = {
+            'traceId': _trace_id,
+            'spanId': span.span_id,
+            'name': span.name,
+            'kind': 3 if '.' in span.name else 1,   # remote calls are named platform.operation
+            'startTimeUnixNano': str(start),
+            'endTimeUnixNano': str(start + int(span.duration * 1e9)),
+            'attributes': [{'key': f"faasr.{key}", 'value': _otlp_value(value)}
+                           for key, value in span.attributes.items()],
+            'status': {'code': 2 if span.attributes.get('status') == 'error' else 1},
+        }
+        if span.parent_id:
+            otlp_span['parentSpanId'] = span.parent_id
+        otlp_spans.append(otlp_span)
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name',
+                                         'value': {'stringValue': _settings['service_name']}}]},
+            'scopeSpans': [{'scope': {'name': 'faasr'}, 'spans': otlp_spans}],
+        }]
+    }
+
+def flush():
+    """Exports the spans not exported yet to the OTLP endpoint, if one is set."""
+    endpoint = _settings['otlp_endpoint']
+    with _lock:
+        finished = [span for span in _spans if span.duration is not None]
+        _spans.clear()
+    if not endpoint or not finished:
+        return
+    import http_pool
+
+    url = endpoint.rstrip('/')
+    if not url.endswith('/v1/traces'):
+        url += '/v1/traces'
+    try:
+        response = http_pool.post(url, json=otlp_payload(finished))
+        if not response.ok:
+            print(f"Warning: OTLP export to {url} failed: {response.status_code} {response.text}")
+    except Exception as e:
+        print(f"Warning: OTLP export to {url} failed: {str(e)}")
+
+def summarize(finished):
+    """
+    Returns [(action, name, count, total_ms, max_ms)] sorted by action and
+    descending total time; spans without an action are grouped under '-'
+    """
+    rows = {}
+    for span in finished:
+        key = (str(span.attributes.get('action', '-')), span.name)
+        count, total, longest = rows.get(key, (0, 0.0, 0.0))
+        rows[key] = (count + 1, total + span.duration, max(longest, span.duration))
+    return [(action, name, count, total * 1000, longest * 1000)
+            for (action, name), (count, total, longest)
+            in sorted(rows.items(), key=lambda item: (item[0][0] != '-', item[0][0], -item[1][1]))]
+
+def print_summary():
+    """Prints the time spent per action and span name; nested spans are included in their parents."""
+    finished = spans()
+    if not finished:
+        return
+    wall = max(s.start + s.duration for s in finished) - min(s.start for s in finished)
+    print(f"\nTrace summary ({len(finished)} spans, {wall * 1000:.1f} ms):")
+    print(f"  {'action':<24} {'span':<36} {'count':>6} {'total ms':>10} {'max ms':>9} {'share':>6}")
+    for action, name, count, total, longest in summarize(finished):
+        share = total / (wall * 1000) * 100 if wall else 0
+        print(f"  {action:<24} {name:<36} {count:>6} {total:>10.1f} {longest:>9.1f} {share:>5.1f}%")
@@ -0,0 +1,347 @@
+"""
+Workflow graph helpers shared by register_prefix_workflow.py and invoke_workflow.py
+
+Parses the ActionList/InvokeNext structure of a FaaSr workflow, validates it, and
+compiles it into an immutable WorkflowGraph that registration stores next to the
+workflow file so invocation can load it instead of re-deriving the graph.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+from collections import defaultdict, namedtuple
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
+
+def extract_rank(str_input):
+    """
+    Returns action name and rank of an action with rank (e.g func(7) returns (func, 7))
+
+    Arguments:
+        str_input: function name with rank
+    Returns:
+        (str, int) -- action name and rank
+    """
+    parts = str_input.split("(")
+    if len(parts) != 2 or not parts[1].endswith(")"):
+        return str_input, 1
+    rank = int(parts[1][:-1])
+    action_name = parts[0]
+    return (action_name, rank)
+
+# Node colors for the iterative depth-first search in validate_dag
+WHITE, GRAY, BLACK = 0, 1, 2
+
+DagReport = namedtuple('DagReport', ['roots', 'cycles', 'unreachable', 'undefined', 'order'])
+
+def validate_dag(action_names, adj_graph):
+    """
+    Validates a workflow graph in a single iterative (colored) depth-first search,
+    so deep workflows cannot hit the recursion limit and every problem is reported
+    at once. Runs in O(V+E) plus the length of the reported cycle paths.
+
+    Arguments:
+        action_names: iterable of actions defined in the ActionList
+        adj_graph: adjacency list for graph -- dict(function: successors)
+    Returns:
+        DagReport -- roots: actions without predecessors
+                     cycles: one path per back edge, e.g. [a, b, a]
+                     unreachable: actions not reachable from any root
+                     undefined: (action, successor) pairs naming unknown actions
+                     order: every action in topological order (if there are no cycles)
+    """
+    actions = list(dict.fromkeys(action_names))
+    defined = set(actions)
+
+    has_predecessor = set()
+    undefined = []
+    for func in actions:
+        for child in adj_graph.get(func, ()):
+            if child in defined:
+                has_predecessor.add(child)
+            else:
+                undefined.append((func, child))
+    roots = [func for func in actions if func not in has_predecessor]
+
+    color = dict.fromkeys(actions, WHITE)
+    cycles = []
+    postorder = []
+
+    def visit(start):
+        # path holds the gray nodes of the current branch, path_index their position
+        path = [start]
+        path_index = {start: 0}
+        color[start] = GRAY
+        stack = [iter(adj_graph.get(start, ()))]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                node = path.pop()
+                del path_index[node]
+                color[node] = BLACK
+                postorder.append(node)
+                stack.pop()
+            elif child not in defined:
+                continue
+            elif color[child] == GRAY:
+                cycles.append(path[path_index[child]:] + [child])
+            elif color[child] == WHITE:
+                color[child] = GRAY
+                path_index[child] = len(path)
+                path.append(child)
+                stack.append(iter(adj_graph.get(child, ())))
+
+    for root in roots:
+        visit(root)
+    unreachable = [func for func in actions if color[func] == WHITE]
+
+    # Keep searching the unreachable part so cycles without an entry are reported too
+    for func in unreachable:
+        if color[func] == WHITE:
+            visit(func)
+
+    postorder.reverse()
+    return DagReport(roots, cycles, unreachable, undefined, postorder)
+
+def build_adjacency_graph(payload):
+    """
+    This function builds an adjacency list for the FaaSr workflow graph and determines
+    the ranks of each action
+
+    Arguments:
+        payload: FaaSr payload dict
+    Returns:
+        adj_graph: dict of predecessor: successor pairs
+        rank: dict of each action's rank
+    """
+    adj_graph = defaultdict(list)
+    ranks = dict()
+
+    # Build adjacency list from ActionList
+    for func in payload["ActionList"].keys():
+        invoke_next = payload["ActionList"][func]["InvokeNext"]
+        if isinstance(invoke_next, str):
+            invoke_next = [invoke_next]
+        for child in invoke_next:
+
+            def process_action(action):
+                action_name, action_rank = extract_rank(action)
+                if action_name in ranks and ranks[action_name] > 1:
+                    err_msg = "Function with rank cannot have multiple predecessors"
+                    logger.error(err_msg)
+                    sys.exit(1)
+                else:
+                    adj_graph[func].append(action_name)
+                    ranks[action_name] = action_rank
+
+            if isinstance(child, dict):
+                for conditional_branch in child.values():
+                    for action in conditional_branch:
+                        process_action(action)
+            else:
+                process_action(child)
+
+    for func in adj_graph:
+        if func not in ranks:
+            ranks[func] = 0
+
+    return (adj_graph, ranks)
+
+def predecessors_list(adj_graph):
+    """This function returns a map of action predecessor pairs
+
+    Arguments:
+        adj_graph: adjacency list for graph -- dict(function: successor)
+    """
+    pre = defaultdict(list)
+    for func1 in adj_graph:
+        for func2 in adj_graph[func1]:
+            pre[func2].append(func1)
+    return pre
+
+# Version of the serialized WorkflowGraph artifact; bump when its layout changes
+GRAPH_ARTIFACT_VERSION = 1
+
+# One compiled action. successors holds the ids invoked unconditionally,
+# conditional the (condition, ids) pairs of {"True": [...]} style branches and
+# predecessors the rank-expanded predecessor names (p.1 .. p.N for ranked p)
+ActionNode = namedtuple('ActionNode', ['id', 'name', 'rank', 'server', 'successors',
+                                       'conditional', 'predecessors'])
+
+class WorkflowGraph:
+    """
+    Immutable, compiled form of a workflow's ActionList: integer action ids,
+    precomputed successors, conditional-branch tables, rank-expanded predecessors
+    and entry points. Build it with WorkflowGraph.compile() or load the artifact
+    written at registration time with load_workflow_graph().
+    """
+    __slots__ = ('nodes', 'index', 'entry_points', 'workflow_hash')
+
+    def __init__(self, nodes, entry_points, workflow_hash=None):
+        object.__setattr__(self, 'nodes', tuple(nodes))
+        object.__setattr__(self, 'index', MappingProxyType({node.name: node.id for node in self.nodes}))
+        object.__setattr__(self, 'entry_points', tuple(entry_points))
+        object.__setattr__(self, 'workflow_hash', workflow_hash)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("WorkflowGraph is immutable")
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def node(self, name):
+        return self.nodes[self.index[name]]
+
+    def successor_ids(self, node_id):
+        """Ids of every action node_id may invoke, unconditional and conditional."""
+        node = self.nodes[node_id]
+        ids = list(node.successors)
+        for _, branch in node.conditional:
+            ids.extend(branch)
+        return ids
+
+    def reachable(self, name):
+        """Names of the actions reachable from name (itself included), in visit order."""
+        start = self.index[name]
+        seen = {start}
+        order = [start]
+        stack = [start]
+        while stack:
+            for child in self.successor_ids(stack.pop()):
+                if child not in seen:
+                    seen.add(child)
+                    order.append(child)
+                    stack.append(child)
+        return [self.nodes[node_id].name for node_id in order]
+
+    def predecessor_index(self):
+        """
+        Rank-expanded predecessors of every action, e.g. {"delete": ["r_func.1",
+        "r_func.2", "r_func.3"]}, so an action can tell whether all of its
+        predecessors are done with a lookup instead of re-deriving the graph
+        """
+        return {node.name: list(node.predecessors) for node in self.nodes}
+
+    @classmethod
+    def compile(cls, workflow_data, workflow_hash=None):
+        """
+        Compiles the ActionList of a workflow. InvokeNext entries that name
+        undefined actions are dropped; validate_dag reports them.
+
+        Arguments:
+            workflow_data: workflow dict
+            workflow_hash: hash of the workflow file the graph was compiled from
+        Returns:
+            WorkflowGraph
+        """
+        action_list = workflow_data["ActionList"]
+        names = list(action_list)
+        index = {name: i for i, name in enumerate(names)}
+        ranks = [1] * len(names)
+        successors = [[] for _ in names]
+        conditional = [{} for _ in names]
+        parents = [[] for _ in names]
+
+        for i, name in enumerate(names):
+            invoke_next = action_list[name].get("InvokeNext", [])
+            if isinstance(invoke_next, str):
+                invoke_next = [invoke_next]
+            for child in invoke_next:
+                if isinstance(child, dict):
+                    branches = child.items()
+                else:
+                    branches = [(None, [child])]
+                for condition, branch in branches:
+                    for action in branch:
+                        action_name, action_rank = extract_rank(action)
+                        if action_name not in index:
+                            continue
+                        child_id = index[action_name]
+                        ranks[child_id] = action_rank
+                        if condition is None:
+                            successors[i].append(child_id)
+                        else:
+                            conditional[i].setdefault(condition, []).append(child_id)
+                        if i not in parents[child_id]:
+                            parents[child_id].append(i)
+
+        nodes = []
+        for i, name in enumerate(names):
+            predecessors = []
+            for p in parents[i]:
+                if ranks[p] > 1:
+                    predecessors.extend(f"{names[p]}.{r}" for r in range(1, ranks[p] + 1))
+                else:
+                    predecessors.append(names[p])
+            nodes.append(ActionNode(
+                i, name, ranks[i], action_list[name].get("FaaSServer"),
+                tuple(successors[i]),
+                tuple((condition, tuple(ids)) for condition, ids in conditional[i].items()),
+                tuple(predecessors)
+            ))
+        entry_points = [i for i in range(len(names)) if not parents[i]]
+        return cls(nodes, entry_points, workflow_hash)
+
+    def to_json(self):
+        """Serializes the graph compactly; each action is a positional list."""
+        return json.dumps({
+            "Version": GRAPH_ARTIFACT_VERSION,
+            "WorkflowHash": self.workflow_hash,
+            "EntryPoints": list(self.entry_points),
+            "Actions": [[node.name, node.rank, node.server, list(node.successors),
+                         [[condition, list(ids)] for condition, ids in node.conditional],
+                         list(node.predecessors)] for node in self.nodes],
+        }, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        if data.get("Version") != GRAPH_ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported WorkflowGraph version: {data.get('Version')}")
+        nodes = [ActionNode(i, name, rank, server, tuple(successors),
+                            tuple((condition, tuple(ids)) for condition, ids in conditional),
+                            tuple(predecessors))
+                 for i, (name, rank, server, successors, conditional, predecessors)
+                 in enumerate(data["Actions"])]
+        return cls(nodes, data["EntryPoints"], data.get("WorkflowHash"))
+
+def workflow_file_hash(file_path):
+    """Returns the sha256 hex digest of a workflow file's bytes."""
+    with open(file_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def graph_artifact_path(workflow_file):
+    """Path of the compiled graph stored next to a workflow file (project1.json -> project1.graph.json)."""
+    return f"{os.path.splitext(workflow_file)[0]}.graph.json"
+
+def save_workflow_graph(graph, workflow_file):
+    """Writes the compiled graph next to its workflow file and returns the artifact path."""
+    artifact_path = graph_artifact_path(workflow_file)
+    with open(artifact_path, 'w') as f:
+        f.write(graph.to_json())
+    return artifact_path
+
+def load_workflow_graph(workflow_file, workflow_data):
+    """
+    Loads the graph artifact of a workflow file if it was compiled from the
+    current file contents, otherwise compiles workflow_data
+
+    Returns:
+        (WorkflowGraph, bool) -- graph and whether it came from the artifact
+    """
+    workflow_hash = workflow_file_hash(workflow_file)
+    artifact_path = graph_artifact_path(workflow_file)
+    try:
+        with open(artifact_path, 'r') as f:
+            graph = WorkflowGraph.from_json(f.read())
+        if graph.workflow_hash == workflow_hash:
+            return graph, True
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return WorkflowGraph.compile(workflow_data, workflow_hash), False